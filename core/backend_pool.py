@@ -0,0 +1,238 @@
+"""
+core/backend_pool.py — Several LLM endpoints, health-checked, chosen per request.
+
+CoreProcessor used to bind every request to the one backend picked at
+startup. A crashed or overloaded server then stalled every interface at
+once, and background work (memory summaries, history summaries) always
+queued on the same model as the live conversation.
+
+BackendPool holds the primary backend (backend: plus its ollama: or
+llama_server: block, slots and all) and any extra endpoints listed under
+backends.endpoints. For each request, candidates() orders the endpoints
+like this:
+
+  - class: an endpoint serves the request classes in its `serves` list
+    (voice, text, background). Endpoints with `fallback: true` also take
+    other classes, but only after every endpoint that serves the class.
+  - health: endpoints that failed their last request or health probe go
+    after healthy ones. A probe thread checks each endpoint every
+    probe_interval_s (GET /api/version for Ollama, /health for
+    llama-server) and puts it back once it answers.
+  - live latency: among the rest, the lowest expected wait goes first. That
+    is the moving average of time-to-first-token multiplied by
+    (1 + requests in flight). An endpoint with no samples yet counts as 0,
+    so it gets tried.
+
+If a request fails before anything has streamed (connection refused,
+timeout, 429/502/503/504), CoreProcessor marks the endpoint down and sends
+the same request to the next candidate. Once text has reached the user there is
+nothing safe to retry, and the error is handled as before.
+
+Each extra endpoint has its own admission queue (LLMScheduler,
+max_concurrent). The primary keeps the core's scheduler, so a background
+request routed to a separate endpoint isn't held back by a voice turn on
+the primary. llama-server slots (slot_map, dynamic_slots, prewarm, slot
+files) stay with the primary. Extra llama-server endpoints let the server
+pick a slot.
+
+Usage:
+    pool = BackendPool(config.backends, primary, make_client)
+    pool.start()                                   # probe thread, if enabled
+    for endpoint in pool.candidates('text'): ...   # best first
+    pool.observe_ttft(endpoint, 0.4)
+    pool.mark_failed(endpoint, error)
+"""
+
+import threading
+
+import requests
+
+from core.llm_scheduler import LLMScheduler
+from core.logger import get_logger
+
+log = get_logger('backend_pool')
+
+KINDS   = ('ollama', 'llama_server')
+CLASSES = ('voice', 'text', 'background')
+
+
+class BackendUnavailable(Exception):
+    """Raised by a send function when its endpoint failed before streaming anything."""
+
+
+# Statuses that mean the server (or a proxy in front of it) can't serve right
+# now. A plain 500 is left out: llama-server and Ollama answer a malformed
+# tool call with one, and CoreProcessor loops that back to the model.
+FAULT_STATUSES = (429, 502, 503, 504)
+
+
+def is_backend_fault(error: Exception) -> bool:
+    """True for errors that say the endpoint is down or overloaded, not that the request was bad."""
+    status = getattr(error, 'status_code', None)
+    if isinstance(status, int):
+        return status in FAULT_STATUSES
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    name = type(error).__name__
+    return any(word in name for word in ('Connect', 'Timeout', 'RemoteProtocol', 'ReadError'))
+
+
+class BackendEndpoint:
+    """One LLM server. The client is built by CoreProcessor, so it gets the stream hooks."""
+
+    def __init__(self, name: str, kind: str, host: str, model: str, client,
+                 serves=CLASSES, fallback: bool = False, scheduler=None,
+                 num_ctx: int = 0, primary: bool = False):
+        self.name      = name
+        self.kind      = kind
+        self.host      = host.rstrip('/')
+        self.model     = model
+        self.client    = client
+        self.serves    = frozenset(serves)
+        self.fallback  = fallback
+        self.scheduler = scheduler
+        self.num_ctx   = num_ctx
+        self.primary   = primary
+
+        self.healthy    = True
+        self.last_error = ''
+        self.in_flight  = 0
+        self.ttft_avg   = None   # seconds, exponential moving average
+
+    def expected_wait(self) -> float:
+        return (self.ttft_avg or 0.0) * (1 + self.in_flight)
+
+    def __repr__(self) -> str:
+        return f"<{self.name} {self.kind} {self.host} healthy={self.healthy}>"
+
+
+class BackendPool:
+    """The primary endpoint plus config.endpoints. Thread-safe."""
+
+    def __init__(self, config, primary: BackendEndpoint, make_client):
+        self.config    = config
+        self.primary   = primary
+        self.endpoints = [primary]
+        self._lock     = threading.Lock()
+        self._stop     = threading.Event()
+
+        primary.serves = frozenset(config.primary_serves)
+        primary.fallback = True
+        if not config.enabled:
+            return
+
+        names = {primary.name}
+        for raw in config.endpoints or []:
+            endpoint = self._endpoint_from_config(raw, make_client, names)
+            if endpoint is not None:
+                names.add(endpoint.name)
+                self.endpoints.append(endpoint)
+        log.info("Backend pool", extra={'data': ', '.join(
+            f"{e.name}={e.kind}:{e.host} serves={sorted(e.serves)}" for e in self.endpoints
+        )})
+
+    def _endpoint_from_config(self, raw: dict, make_client, names: set) -> BackendEndpoint | None:
+        name = str(raw.get('name') or '')
+        kind = raw.get('kind', 'ollama')
+        host = raw.get('host', '')
+        if not name or name in names or kind not in KINDS or not host:
+            log.error("Invalid backends endpoint — skipped", extra={'data': str(raw)})
+            return None
+        serves = [c for c in raw.get('serves', CLASSES) if c in CLASSES]
+        try:
+            client = make_client(kind, host)
+        except Exception as e:
+            log.error("Backend client failed", extra={'data': f"{name}: {e}"})
+            return None
+        return BackendEndpoint(
+            name      = name,
+            kind      = kind,
+            host      = host,
+            model     = raw.get('model', 'default'),
+            client    = client,
+            serves    = serves,
+            fallback  = bool(raw.get('fallback', False)),
+            scheduler = LLMScheduler(int(raw.get('max_concurrent', 1))),
+            num_ctx   = int(raw.get('num_ctx', 0) or 0),
+        )
+
+    # ── Routing ───────────────────────────────────────────────────────────────
+
+    def candidates(self, request_class: str) -> list:
+        """Endpoints that may take a request of this class, best first."""
+        if len(self.endpoints) == 1:
+            return self.endpoints
+        with self._lock:
+            usable = [e for e in self.endpoints if request_class in e.serves or e.fallback]
+            usable.sort(key=lambda e: (not e.healthy, request_class not in e.serves, e.expected_wait()))
+        return usable
+
+    def begin(self, endpoint: BackendEndpoint) -> None:
+        with self._lock:
+            endpoint.in_flight += 1
+
+    def end(self, endpoint: BackendEndpoint) -> None:
+        with self._lock:
+            endpoint.in_flight -= 1
+
+    def observe_ttft(self, endpoint: BackendEndpoint, seconds: float) -> None:
+        alpha = self.config.latency_alpha
+        with self._lock:
+            prev = endpoint.ttft_avg
+            endpoint.ttft_avg = seconds if prev is None else prev + alpha * (seconds - prev)
+            recovered, endpoint.healthy = not endpoint.healthy, True
+        if recovered:
+            log.info("Backend answered — marked up", extra={'data': endpoint.name})
+
+    def mark_failed(self, endpoint: BackendEndpoint, error) -> None:
+        with self._lock:
+            was, endpoint.healthy = endpoint.healthy, False
+            endpoint.last_error   = str(error)[:200]
+        if was:
+            log.warning("Backend marked down", extra={'data': f"{endpoint.name}: {error}"})
+
+    def stats(self) -> list:
+        with self._lock:
+            return [{
+                'name':      e.name,
+                'kind':      e.kind,
+                'healthy':   e.healthy,
+                'in_flight': e.in_flight,
+                'ttft_ms':   None if e.ttft_avg is None else round(e.ttft_avg * 1000, 1),
+                'error':     e.last_error,
+            } for e in self.endpoints]
+
+    # ── Health probes ─────────────────────────────────────────────────────────
+
+    def start(self) -> None:
+        """Probe every endpoint in the background, if the pool is enabled."""
+        if not self.config.enabled or self.config.probe_interval_s <= 0:
+            return
+        threading.Thread(target=self._probe_loop, daemon=True, name='backend-probe').start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def probe(self, endpoint: BackendEndpoint) -> bool:
+        path = '/api/version' if endpoint.kind == 'ollama' else '/health'
+        try:
+            r  = requests.get(f"{endpoint.host}{path}", timeout=self.config.probe_timeout_s)
+            ok = r.status_code == 200
+            error = f"HTTP {r.status_code}"
+        except Exception as e:
+            ok, error = False, e
+
+        with self._lock:
+            was, endpoint.healthy = endpoint.healthy, ok
+            if not ok:
+                endpoint.last_error = str(error)[:200]
+        if ok and not was:
+            log.info("Backend probe ok — marked up", extra={'data': endpoint.name})
+        elif was and not ok:
+            log.warning("Backend probe failed — marked down", extra={'data': f"{endpoint.name}: {error}"})
+        return ok
+
+    def _probe_loop(self) -> None:
+        while not self._stop.wait(self.config.probe_interval_s):
+            for endpoint in list(self.endpoints):
+                self.probe(endpoint)
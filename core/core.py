@@ -7,14 +7,17 @@ Responsibilities:
   - Calls the Ollama streaming chat API and forwards token chunks to the response_queue
     so that voice interfaces can speak them as they arrive (streaming TTS pipeline).
   - Detects and executes tool calls inline, loops back for the model's follow-up.
-  - Provides cancel_active_response() so voice_remote can interrupt mid-stream on barge-in.
+  - Provides cancel_active_response() so voice_remote can interrupt mid-stream on barge-in —
+    the HTTP stream is cut so the backend stops generating (see stream_handle.py).
   - Owns the EventStore and Scheduler so tools can persist and fire future events.
   - Provides schedule_event() and schedule_call() as the clean public API for tools.
 
 Threading model:
   core.py runs inside whichever thread calls process_input().
-  Interfaces should always call process_input() in a daemon Thread so the asyncio
-  event loop stays free to stream TTS concurrently.
+  Async interfaces iterate process_input_async(), which runs the turn on a worker
+  thread and yields chunks as they're queued, so the asyncio event loop stays
+  free to stream TTS concurrently. Synchronous callers run process_input() in a
+  daemon Thread and drain the response queue themselves.
 
 Mode model:
   interface_mode — set once at session creation by the interface (SPEAKER/PHONE/GENERAL).
@@ -29,7 +32,7 @@ import time
 import types
 import typing
 import inspect
-import base64
+import hashlib
 try:
     import ollama
 except Exception:
@@ -39,12 +42,30 @@ try:
 except Exception:
     openai = None
 import queue
+import asyncio
+import functools
+import concurrent.futures
 from datetime import datetime, timezone, timedelta
 import os
 import uuid
 
 from core.settings import AppConfig
 from core.tool_loader import ToolLoader
+from core.tool_router import ToolRouter
+from core.history_budget import HistoryBudgeter
+from core.history_summary import HistorySummariser
+from core.result_digest import ResultDigester
+from core.slot_manager import SlotManager
+from core.slot_store import SlotStore
+from core.response_queue import ResponseQueue
+from core.tool_stream import ToolCallAssembler
+from core.openai_messages import MessageTranslation, translate_messages
+from core.llm_scheduler import LLMScheduler, Priority
+from core.backend_pool import BackendPool, BackendEndpoint, BackendUnavailable, is_backend_fault
+from core.job_queue import SessionJobQueue
+from core.stream_handle import StreamHandle
+from core.tracing import Tracer, span
+from core.metrics import Metrics
 from core.precontext import PrecontextLoader
 from core.mode_registry import ModeRegistry
 from core.interface_mode import InterfaceMode
@@ -57,7 +78,8 @@ from core.session_state import (
     is_immediate_send_only, get_ts_start, get_session_id,
     KEY_HISTORY, KEY_RESPONSE_QUEUE, KEY_RESPONSE_DONE,
     KEY_CLOSE_CHANNEL, KEY_CANCEL, KEY_OLLAMA_STREAM, KEY_TS_START,
-    KEY_INTERFACE_MODE, KEY_AGENT_MODE, KEY_SESSION_ID, DISCARD_ACCUMULATED
+    KEY_INTERFACE_MODE, KEY_AGENT_MODE, KEY_SESSION_ID, KEY_TRACE, KEY_OAI_MESSAGES,
+    KEY_ROUTED_TOOLS, KEY_LLM_ERROR, DISCARD_ACCUMULATED
 )
 from core.event_store import EventStore
 from core.scheduler import Scheduler
@@ -67,6 +89,21 @@ from core.logger import get_logger
 log = get_logger('core')
 
 
+class HeadlessError(RuntimeError):
+    """run_headless(raise_on_error=True) — the backend failed."""
+
+# Concurrent process_input_async() turns before new ones queue.
+TURN_WORKERS = 16
+
+# Stand-in user turn for prefill requests — chat templates need one, and it
+# comes after the cached prefix so its content doesn't matter.
+PREFILL_PLACEHOLDER = "Hello."
+
+# System prompt for _model_override (headless helper) sessions. One shared
+# dict — like the cached ones, it's never edited in place.
+OVERRIDE_SYSTEM_MESSAGE = {'role': 'system', 'content': 'You are a helpful assistant. Follow instructions precisely and concisely.'}
+
+
 class CoreProcessor:
     """
     Stateful hub that manages sessions and runs the LLM loop.
@@ -91,19 +128,64 @@ class CoreProcessor:
         self.config = config
         self.model  = config.ollama.model
 
-        self.ollama_client = ollama.Client(host=config.ollama.host)
+        # Both clients report each HTTP response to the StreamHandle of the
+        # request being sent on this thread (see _make_backend_client)
+        self._stream_local = threading.local()
+
+        self.ollama_client = self._make_backend_client('ollama', config.ollama.host)
 
         self.llamaserver_client = None
         if getattr(config, 'llama_server', None) and openai is not None:
-            self.llamaserver_client = openai.OpenAI(
-                base_url = f"{config.llama_server.host.rstrip('/')}/v1",
-                api_key = "not-needed",
+            self.llamaserver_client = self._make_backend_client('llama_server', config.llama_server.host)
+
+        # Per-session slot leasing — each live session keeps its own KV cache
+        # slot instead of sharing one per interface (see slot_manager.py)
+        self.slot_manager = None
+        self.slot_store   = None
+        llama_cfg = getattr(config, 'llama_server', None)
+        if llama_cfg and llama_cfg.use_slots and llama_cfg.dynamic_slots:
+            # Saved slot files let a returning endpoint skip the full prefill
+            # (see slot_store.py) — needs llama-server --slot-save-path
+            if llama_cfg.persist_slots:
+                self.slot_store = SlotStore(llama_cfg.host, timeout=llama_cfg.slot_request_timeout)
+            # A session's slot is saved on its own thread once the session
+            # has been quiet for slot_save_idle_s (a new request cancels
+            # that), and when it closes — never between the rounds of a turn.
+            # Only the (short) restore sits on the request path.
+            self._slot_saver       = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='slot-save')
+            self._slot_save_timers = {}   # session_id → threading.Timer
+            self._slot_save_lock   = threading.Lock()
+            self.slot_manager = SlotManager(
+                llama_cfg.slot_pool,
+                on_assign = self._on_slot_assigned if self.slot_store else None,
+                on_idle   = self._on_slot_idle     if self.slot_store else None,
             )
 
-        backend = getattr(config, 'backend', 'ollama')
-        self._send_to_llm = (
-            self.send_to_llamaserver if backend == 'llama_server' else self.send_to_ollama
-        )
+        backend      = getattr(config, 'backend', 'ollama')
+        self.backend = backend
+
+        # Priority admission in front of the backend — voice, text, background
+        # (see llm_scheduler.py). self.scheduler is the event scheduler.
+        self.llm_scheduler = None
+        self._turn_local   = threading.local()
+        if config.scheduler.enabled:
+            self.llm_scheduler = LLMScheduler(config.scheduler.max_concurrent.get(backend, 1))
+
+        # Interactive activity — deferred session-end jobs wait for idle_seconds()
+        self._activity_lock     = threading.Lock()
+        self._interactive_turns = 0
+        self._last_interactive  = time.monotonic()
+
+        # Endpoints requests can be routed to — the backend above first, plus
+        # any extra ones under backends: (see backend_pool.py)
+        if backend == 'llama_server':
+            primary = BackendEndpoint(backend, backend, config.llama_server.host, config.llama_server.model,
+                                      self.llamaserver_client, scheduler=self.llm_scheduler, primary=True)
+        else:
+            primary = BackendEndpoint(backend, 'ollama', config.ollama.host, self.model,
+                                      self.ollama_client, scheduler=self.llm_scheduler, primary=True)
+        self.backends       = BackendPool(config.backends, primary, self._make_backend_client)
+        self._backend_local = threading.local()   # .endpoint for the request this thread is sending
 
         # Agent mode registry — loads config/modes.yaml, hot-reloads on change
         self.mode_registry = ModeRegistry(config_dir)
@@ -118,6 +200,60 @@ class CoreProcessor:
             app_config = config,
         )
 
+        # Per-turn tool subset by embedding similarity (see tool_router.py)
+        self.tool_router = None
+        if config.tool_router.enabled:
+            self.tool_router = ToolRouter(config.tool_router, self.tool_loader)
+            if self.tool_router.available:
+                threading.Thread(target=self._warm_tool_router, daemon=True, name='tool-router-warm').start()
+
+        # Deferred session-end work, drained when nobody is talking to us
+        # (see job_queue.py). Tools opt in with defer_session_end in their yaml.
+        self.job_queue = None
+        if config.jobs.enabled:
+            self.job_queue = SessionJobQueue(
+                config.jobs,
+                dispatch     = lambda name, sessions: self.tool_loader.run_deferred_session_end(self, name, sessions),
+                idle_seconds = self.idle_seconds,
+            )
+
+        # History budget — compacts long sessions to stay inside num_ctx
+        self.history_budgeter = HistoryBudgeter(config.history)
+
+        # Rolling summary of the oldest turns in long text sessions, written
+        # in the background between turns (see history_summary.py)
+        self.history_summariser = HistorySummariser(config.history_summary, self)
+
+        # Answered tool results shrink to digests at the end of each turn
+        # (see result_digest.py); get_tool_result brings one back
+        self.result_digester = ResultDigester(config.tool_results, self.tool_loader)
+
+        # Per-turn latency spans (see tracing.py)
+        self.tracer = Tracer(config.tracing)
+
+        # Live counters and histograms, served at /metrics (see metrics.py)
+        self.metrics = Metrics(config.metrics)
+
+        # Worker threads for process_input_async() turns — kept apart from the
+        # loop's default executor so long turns can't starve ASR/TTS to_thread calls
+        self._turn_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers        = TURN_WORKERS,
+            thread_name_prefix = 'turn',
+        )
+
+        # Shared pool for tool calls marked parallel_safe — see _execute_tool_calls()
+        self._tool_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers        = config.tools.parallel_workers,
+            thread_name_prefix = 'tool',
+        )
+
+        # Last assembled system prompt per (interface, agent mode) — see create_system_message()
+        self._system_message_cache: dict = {}
+
+        # Compiled OpenAI tool arrays — see _openai_tools()
+        self._tool_schema_cache: dict = {}
+        self._tool_schema_lock        = threading.Lock()
+
         # ── Event system ──────────────────────────────────────────────────────
         self.event_store = EventStore(config_dir)
         self.scheduler   = Scheduler(self.event_store, self._on_event_fired)
@@ -135,6 +271,20 @@ class CoreProcessor:
         self._event_handlers  = {}
         self._presence_checks = {}
 
+        # Load the default system prompt into each slot so the first turn
+        # after startup doesn't pay for the full personality + tool prefill
+        if (backend == 'llama_server' and self.llamaserver_client is not None
+                and llama_cfg and llama_cfg.use_slots and llama_cfg.prewarm_slots):
+            threading.Thread(target=self.prewarm_slots, daemon=True, name='slot-prewarm').start()
+
+        if self.job_queue is not None:
+            self.job_queue.start()
+
+        self.backends.start()
+
+        self._register_metrics()
+        self.metrics.start()
+
     # ──────────────────────────────────────────────────────────────────────────
     # Event scheduling API  (called by tools via ToolBase)
     # ──────────────────────────────────────────────────────────────────────────
@@ -296,7 +446,7 @@ class CoreProcessor:
             f.write(f"{json.dumps(prompt_tools, indent=2, default=str)}\n")
             f.write("\n")
 
-    def _log_wire_payload(self, model: str, oai_messages: list, oai_tools: list, extra_body: dict, session: dict) -> None:
+    def _log_wire_payload(self, model: str, oai_messages: list, oai_tools: list, extra_body: dict, session: dict, tools_json: str = '') -> None:
         """
         Dump the exact JSON body about to be sent to llama-server, one file per
         turn, so turns can be diffed directly to spot anything that's silently
@@ -315,6 +465,7 @@ class CoreProcessor:
             'model': model,
             'messages': oai_messages,
             'tools': oai_tools if oai_tools else None,
+            'tools_sha1': hashlib.sha1(tools_json.encode('utf-8')).hexdigest() if tools_json else None,
             'stream': True,
             'extra_body': extra_body,
         }
@@ -340,7 +491,7 @@ class CoreProcessor:
         log.info("Session created", extra={'data': f"id={session_id}"})
         session = {
             KEY_HISTORY:        [],
-            KEY_RESPONSE_QUEUE: queue.Queue(),
+            KEY_RESPONSE_QUEUE: ResponseQueue(),
             KEY_RESPONSE_DONE:  threading.Event(),
             KEY_CLOSE_CHANNEL:  threading.Event(),
             KEY_CANCEL:         threading.Event(),
@@ -388,11 +539,306 @@ class CoreProcessor:
             except Exception as e:
                 log.error("Session end handler error", extra={'data': str(e)})
             finally:
+                if self.slot_manager is not None:
+                    self._save_session_slot(session, session_id)
                 self.sessions.pop(session_id, None)
+                if self.slot_manager is not None:
+                    self.slot_manager.forget(session_id)
                 log.info("Session closed", extra={'data': f"id={session_id}"})
 
         threading.Thread(target=_run, daemon=True).start()
 
+    # ──────────────────────────────────────────────────────────────────────────
+    # LLM admission
+    # ──────────────────────────────────────────────────────────────────────────
+
+    def _request_priority(self, session: dict) -> Priority:
+        """Scheduler class for a session's LLM requests."""
+        if session.get('_headless'):
+            inherited = getattr(self._turn_local, 'priority', None)
+            return inherited if inherited is not None else Priority.BACKGROUND
+        if get_interface_mode(session).is_voice():
+            return Priority.VOICE
+        return Priority.TEXT
+
+    def _admit(self, session: dict, priority: Priority = None):
+        """
+        Wait for the scheduler to let this session's request through. Returns
+        a ticket for _release(), or None with the scheduler disabled.
+        """
+        scheduler = self._endpoint().scheduler
+        if scheduler is None:
+            return None
+        if priority is None:
+            priority = self._current_priority(session)
+        return scheduler.acquire(priority, label=get_session_id(session) or '')
+
+    def _release(self, ticket) -> None:
+        if ticket is not None:
+            self._endpoint().scheduler.release(ticket)
+
+    def _current_priority(self, session: dict) -> Priority:
+        """The calling turn's priority if one is riding on this thread, else the session's own."""
+        priority = getattr(self._turn_local, 'priority', None)
+        return priority if priority is not None else self._request_priority(session)
+
+    def backend_stats(self) -> list:
+        """Health, load and moving-average TTFT of each LLM endpoint."""
+        return self.backends.stats()
+
+    def scheduler_stats(self) -> dict | None:
+        """LLM admission counters, or None with the scheduler disabled."""
+        if self.llm_scheduler is None:
+            return None
+        return self.llm_scheduler.stats()
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # llama-server slots
+    # ──────────────────────────────────────────────────────────────────────────
+
+    def _acquire_slot(self, session: dict) -> int | None:
+        """
+        Pick the id_slot for a llama-server request, or None if slots are off.
+        With dynamic_slots the session's slot is pinned until _release_slot().
+        """
+        cfg = self.config.llama_server
+        if not cfg.use_slots:
+            return None
+        if session.get('_headless'):
+            return cfg.headless_slot
+        if self.slot_manager is not None:
+            if self.slot_store is not None:
+                self._cancel_slot_save(get_session_id(session))
+            return self.slot_manager.acquire(get_session_id(session))
+        interface = session.get('interface', 'general')
+        return cfg.slot_map.get(interface, cfg.default_slot)
+
+    def _release_slot(self, session: dict) -> None:
+        """Unpin the session's slot once its request has finished streaming."""
+        if self.slot_manager is not None and not session.get('_headless'):
+            self.slot_manager.release(get_session_id(session))
+
+    def slot_stats(self) -> dict | None:
+        """Slot hit/miss/eviction counters, or None without dynamic slots."""
+        if self.slot_manager is None:
+            return None
+        return self.slot_manager.stats()
+
+    def _slot_key(self, session: dict | None) -> str | None:
+        """
+        Stable key for saving a session's slot — the interface plus the
+        endpoint (phone number, speaker device, Telegram chat). None when
+        there's nothing stable to come back to, e.g. web sessions whose
+        endpoint is the random session id.
+        """
+        if not session or session.get('_headless'):
+            return None
+        endpoint = get_endpoint_id(session)
+        if not endpoint or endpoint == get_session_id(session):
+            return None
+        return f"{session.get('interface', 'general')}-{endpoint}"
+
+    def _on_slot_idle(self, session_id: str, slot: int) -> None:
+        """
+        SlotManager hook — a request just ended. (Re)start the session's
+        idle timer; the save runs only if no request comes before it fires.
+        """
+        if not self._slot_key(self.get_session(session_id)):
+            return
+        timer = threading.Timer(self.config.llama_server.slot_save_idle_s, self._slot_saver.submit)
+        timer.args   = (self._save_idle_slot, session_id, timer)   # knows itself, to spot a stale fire
+        timer.daemon = True
+        with self._slot_save_lock:
+            previous = self._slot_save_timers.get(session_id)
+            self._slot_save_timers[session_id] = timer
+        if previous is not None:
+            previous.cancel()
+        timer.start()
+
+    def _cancel_slot_save(self, session_id: str) -> None:
+        """Drop a pending idle save — the session is active again."""
+        with self._slot_save_lock:
+            timer = self._slot_save_timers.pop(session_id, None)
+        if timer is not None:
+            timer.cancel()
+
+    def _save_idle_slot(self, session_id: str, timer: threading.Timer) -> None:
+        """
+        Save a session's slot if its idle timer is still current and it
+        still owns the slot between requests. Pinned while saving, so it
+        can't be evicted mid-save.
+        """
+        with self._slot_save_lock:
+            if self._slot_save_timers.get(session_id) is not timer:
+                return   # cancelled or replaced after it fired
+            del self._slot_save_timers[session_id]
+        key  = self._slot_key(self.get_session(session_id))
+        slot = self.slot_manager.hold(session_id, idle_only=True) if key else None
+        if slot is None:
+            return
+        try:
+            self.slot_store.save(slot, key)
+        finally:
+            self.slot_manager.release(session_id, notify=False)
+
+    def _on_slot_assigned(self, session_id: str, slot: int) -> None:
+        """SlotManager hook — reload a returning session's saved cache on a miss."""
+        key = self._slot_key(self.get_session(session_id))
+        if key and self.slot_store.has(key):
+            self.slot_store.restore(slot, key, timeout=self.config.llama_server.slot_restore_timeout)
+
+    def _save_session_slot(self, session: dict, session_id: str) -> None:
+        """Save a closing session's slot, pinned so it can't be evicted mid-save."""
+        if self.slot_store is None:
+            return
+        self._cancel_slot_save(session_id)
+        key = self._slot_key(session)
+        if not key:
+            return
+        slot = self.slot_manager.hold(session_id)
+        if slot is None:
+            return
+        try:
+            self.slot_store.save(slot, key)
+        finally:
+            self.slot_manager.release(session_id, notify=False)
+
+    def prewarm_slots(self) -> None:
+        """
+        Prefill the default system prompt and tool schemas into every live
+        slot. Blocking — __init__ runs it in a background thread.
+        """
+        cfg = self.config.llama_server
+        if cfg.dynamic_slots:
+            targets = {slot: InterfaceMode.GENERAL.value for slot in cfg.slot_pool}
+        else:
+            targets = {cfg.default_slot: InterfaceMode.GENERAL.value}
+            for interface, slot in cfg.slot_map.items():
+                targets.setdefault(slot, interface)
+
+        for slot, interface in targets.items():
+            try:
+                mode = InterfaceMode(interface)
+            except ValueError:
+                mode = InterfaceMode.GENERAL
+            session = {
+                KEY_HISTORY:        [],
+                KEY_INTERFACE_MODE: mode,
+                KEY_AGENT_MODE:     self.mode_registry.default(),
+                KEY_SESSION_ID:     f"prewarm-{slot}",
+                'interface':        interface,
+            }
+            ticket = None
+            try:
+                t0       = time.perf_counter()
+                system   = self.create_system_message(session)
+                tools    = self.tool_loader.get_tools(interface_mode=mode, agent_mode=session[KEY_AGENT_MODE])
+                ticket   = self._admit(session, Priority.BACKGROUND)
+                self._prefill_slot(slot, [system], tools, session)
+                log.info("Slot prewarmed", extra={'data': (
+                    f"slot={slot} interface={interface} ms={(time.perf_counter() - t0) * 1000:.0f}"
+                )})
+            except Exception as e:
+                log.warning("Slot prewarm failed", extra={'data': f"slot={slot} error={e}"})
+            finally:
+                self._release(ticket)
+
+    def _prefill_slot(self, slot: int | None, messages: list, tools: list, session: dict) -> None:
+        """
+        Run a prompt through slot without streaming anything back, leaving
+        its KV cache holding the prompt. A throwaway user message is added
+        because most chat templates refuse a prompt without one — it sits
+        after the prefix we care about. slot=None lets the server choose.
+        """
+        # Uncached — the placeholder mustn't replace the session's translation
+        oai_messages = translate_messages(
+            list(messages) + [{'role': 'user', 'content': PREFILL_PLACEHOLDER}],
+        )
+        oai_tools, _ = self._openai_tools(tools, session)
+        extra_body   = {'cache_prompt': True}
+        if slot is not None:
+            extra_body['id_slot'] = slot
+        self.llamaserver_client.chat.completions.create(
+            model      = self.config.llama_server.model,
+            messages   = oai_messages,
+            tools      = oai_tools or openai.NOT_GIVEN,
+            max_tokens = 1,
+            extra_body = extra_body,
+        )
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # Speculative prefill
+    # ──────────────────────────────────────────────────────────────────────────
+
+    def prefill(self, session_id: str) -> bool:
+        """
+        Evaluate the session's system message, history and tools ahead of
+        the next turn, so only the new user message is left to prefill when
+        process_input() runs. Voice interfaces call this at VAD onset, while
+        the user is still talking and Whisper hasn't run yet.
+
+        Blocking — call from a worker thread. Returns True if a prefill was
+        sent. Skipped for unknown or headless sessions, while a turn is
+        streaming, and while another prefill for the session is running.
+        """
+        session = self.get_session(session_id)
+        if session is None or session.get('_headless'):
+            return False
+        if session.get(KEY_OLLAMA_STREAM) is not None or session.get('_prefilling'):
+            return False
+        if not self.backends.primary.healthy:
+            return False   # the turn will be routed elsewhere — nothing to warm
+
+        session['_prefilling'] = True
+        self._mark_activity(0)   # someone is speaking — keep deferred jobs waiting
+        t0 = time.perf_counter()
+        try:
+            interface_mode = get_interface_mode(session)
+            agent_mode     = get_agent_mode(session)
+            system_message = self.create_system_message(session=session)
+
+            # Same compaction process_input() is about to do, so the prefix
+            # we cache is the prefix it will send
+            num_ctx = session.get('_num_ctx_override', self.config.ollama.num_ctx)
+            self.history_budgeter.fit(session, system_message, num_ctx)
+            messages = [system_message] + get_history(session)
+            tools    = self.tool_loader.get_tools(interface_mode=interface_mode, agent_mode=agent_mode)
+            if self.tool_router is not None:
+                tools = self.tool_router.current(session, tools)
+
+            ticket = self._admit(session)
+            try:
+                if self.backends.primary.kind == 'llama_server':
+                    slot = self._acquire_slot(session)
+                    try:
+                        self._prefill_slot(slot, messages, tools, session)
+                    finally:
+                        if slot is not None:
+                            self._release_slot(session)
+                else:
+                    self.ollama_client.chat(
+                        model      = self.model,
+                        messages   = messages + [{'role': 'user', 'content': PREFILL_PLACEHOLDER}],
+                        stream     = False,
+                        keep_alive = -1,
+                        think      = False,
+                        tools      = tools,
+                        options    = {'num_ctx': num_ctx, 'num_predict': 1},
+                    )
+            finally:
+                self._release(ticket)
+
+            log.debug("Prefill done", extra={'data': (
+                f"session={session_id} messages={len(messages)} "
+                f"ms={(time.perf_counter() - t0) * 1000:.0f}"
+            )})
+            return True
+        except Exception as e:
+            log.warning("Prefill failed", extra={'data': f"session={session_id} error={e}"})
+            return False
+        finally:
+            session['_prefilling'] = False
+
     # ──────────────────────────────────────────────────────────────────────────
     # Tool result formatting
     # ──────────────────────────────────────────────────────────────────────────
@@ -415,7 +861,11 @@ class CoreProcessor:
         Hard-abort any in-flight LLM streaming and discard queued TTS text.
         Called by voice_remote when it receives an INT0 (barge-in) frame.
 
-        Note: flush happens twice — once before stream.close() for fast TTS
+        The stream's socket is shut down rather than waiting for the read
+        loop to see the cancel flag on its next chunk — that way the backend
+        drops the request (and frees its slot) even mid prompt-processing.
+
+        Note: flush happens twice — once before the abort for fast TTS
         stop, and once after to catch tokens in the race window.
         """
         session = self.get_session(session_id)
@@ -431,16 +881,98 @@ class CoreProcessor:
         stream = session.get(KEY_OLLAMA_STREAM)
         if stream is not None:
             try:
-                close = getattr(stream, "close", None)
-                if callable(close):
-                    close()
+                stream.abort()
             except Exception as e:
-                log.warning("Error closing ollama stream", extra={'data': str(e)})
+                log.warning("Error aborting LLM stream", extra={'data': str(e)})
             finally:
                 session[KEY_OLLAMA_STREAM] = None
 
         self._flush_queue(get_response_queue(session))
 
+    def _on_stream_response(self, response) -> None:
+        """httpx response hook — attach a streaming response to its request's StreamHandle."""
+        handle = getattr(self._stream_local, 'handle', None)
+        if handle is not None:
+            handle.attach(response)
+
+    def _begin_stream(self, session: dict) -> StreamHandle:
+        """
+        Register a StreamHandle for the request this thread is about to send.
+        If the turn was already cancelled (e.g. during a tool round) the
+        request is cut off as soon as it connects, not after prompt processing.
+        """
+        handle = StreamHandle()
+        self._stream_local.handle   = handle
+        session[KEY_OLLAMA_STREAM]  = handle
+        self.metrics.llm_in_flight.labels(backend=self._endpoint().name).inc()
+        cancel = get_cancel_event(session)
+        if cancel and cancel.is_set():
+            handle.abort()
+        return handle
+
+    def _end_stream(self, session: dict, handle: StreamHandle | None) -> None:
+        """Close a finished or aborted stream from its own thread."""
+        session[KEY_OLLAMA_STREAM] = None
+        self._stream_local.handle  = None
+        if handle is None:
+            return
+        self.metrics.llm_in_flight.labels(backend=self._endpoint().name).dec()
+        handle.close()
+        if handle.aborted:
+            log.info("LLM stream aborted", **self._elapsed(
+                session, f"close_ms={(time.perf_counter() - handle.aborted_at) * 1000:.1f}"
+            ))
+
+    def _warm_tool_router(self) -> None:
+        """Embed every general-mode tool description before the first turn needs them."""
+        tools = {}
+        for mode in InterfaceMode:
+            for fn in self.tool_loader.get_tools(interface_mode=mode):
+                tools[fn.__name__] = fn
+        self.tool_router.warm(list(tools.values()))
+
+    def _observe_stream(self, n_chunks: int, t_first: float | None, cancel_event) -> None:
+        """Count a finished stream and record its generation rate (one chunk ≈ one token)."""
+        cancelled = bool(cancel_event and cancel_event.is_set())
+        self.metrics.llm_requests.labels(backend=self._endpoint().name, outcome='cancelled' if cancelled else 'ok').inc()
+        if t_first is None or cancelled or n_chunks < 2:
+            return
+        dt = time.monotonic() - t_first
+        if dt > 0:
+            self.metrics.tokens_per_s.labels(backend=self._endpoint().name).observe((n_chunks - 1) / dt)
+
+    def _register_metrics(self) -> None:
+        """Scrape-time gauges for state that already lives elsewhere."""
+        def sessions():
+            counts = {}
+            for session in list(self.sessions.values()):
+                kind = 'headless' if session.get('_headless') else get_interface_mode(session).value
+                counts[kind] = counts.get(kind, 0) + 1
+            return [({'interface': k}, n) for k, n in counts.items()]
+
+        def llm_waiting():
+            if self.llm_scheduler is None:
+                return []
+            counts = {p.name.lower(): 0 for p in Priority}
+            for priority, _ in self.llm_scheduler.stats()['waiting']:
+                counts[priority.lower()] += 1
+            return [({'priority': k}, n) for k, n in counts.items()]
+
+        self.metrics.add_collector(
+            'supernova_sessions_active', "Open core sessions by interface", sessions)
+        self.metrics.add_collector(
+            'supernova_llm_requests_waiting', "LLM requests queued for admission by priority", llm_waiting)
+        self.metrics.add_collector(
+            'supernova_backend_up', "1 if the LLM endpoint answered its last request or health probe",
+            lambda: [({'backend': e['name']}, int(e['healthy'])) for e in self.backends.stats()])
+        self.metrics.add_collector(
+            'supernova_scheduled_events_pending', "Events waiting in the event scheduler",
+            lambda: [({}, len(self.event_store.all()))])
+        if self.job_queue is not None:
+            self.metrics.add_collector(
+                'supernova_session_jobs_pending', "Deferred session-end jobs not yet run",
+                lambda: [({}, self.job_queue.pending_count())])
+
     # ──────────────────────────────────────────────────────────────────────────
     # Main entry point
     # ──────────────────────────────────────────────────────────────────────────
@@ -458,6 +990,67 @@ class CoreProcessor:
             log.warning("Session not found, creating on the fly", extra={'data': f"id={session_id}"})
             session = self.create_session(session_id)
 
+        # The turn's LLM priority rides along on the thread, so a headless
+        # run started from inside a foreground turn inherits it rather than
+        # waiting behind the very turn that's waiting for it.
+        outer_priority = getattr(self._turn_local, 'priority', None)
+        self._turn_local.priority = self._request_priority(session)
+
+        # Waiting on parallel tools is budgeted per turn, not per round — see
+        # _execute_tool_calls()
+        outer_tool_budget = getattr(self._turn_local, 'tool_budget', None)
+        self._turn_local.tool_budget = self.config.tools.deadline_s
+
+        # Voice turns hold background LLM work back until they finish
+        interactive = not session.get('_headless')
+        voice_turn  = (self.llm_scheduler is not None and interactive
+                       and get_interface_mode(session).is_voice())
+        if voice_turn:
+            self.llm_scheduler.voice_turn_started()
+        if interactive:
+            self._mark_activity(+1)
+
+        # Voice interfaces start the trace at end of speech and finish it
+        # after the last audio; anything else gets one for just this call.
+        own_trace = KEY_TRACE not in session
+        if own_trace:
+            trace = self.tracer.start(
+                interface = get_interface_mode(session).value,
+                endpoint  = get_endpoint_id(session),
+                session   = get_session_id(session),
+                headless  = bool(session.get('_headless')),
+            )
+            if trace is not None:
+                session[KEY_TRACE] = trace
+        try:
+            return self._process_turn(session, input_text, images, immediate_only)
+        finally:
+            if own_trace:
+                trace = session.pop(KEY_TRACE, None)
+                if trace is not None:
+                    trace.finish()
+            if interactive:
+                self._mark_activity(-1)
+            if voice_turn:
+                self.llm_scheduler.voice_turn_finished()
+            self._turn_local.priority    = outer_priority
+            self._turn_local.tool_budget = outer_tool_budget
+
+    def _mark_activity(self, delta: int) -> None:
+        """Count an interactive turn in (+1) or out (-1)."""
+        with self._activity_lock:
+            self._interactive_turns += delta
+            self._last_interactive   = time.monotonic()
+
+    def idle_seconds(self) -> float:
+        """Seconds since the last interactive turn finished — 0 while one is running."""
+        with self._activity_lock:
+            if self._interactive_turns:
+                return 0.0
+            return time.monotonic() - self._last_interactive
+
+    def _process_turn(self, session: dict, input_text: str, images: list, immediate_only: bool) -> str:
+        """Body of process_input() — one full turn for an existing session."""
         # Reset per-turn events
         session[KEY_RESPONSE_DONE].clear()
         session[KEY_CANCEL].clear()
@@ -467,10 +1060,20 @@ class CoreProcessor:
         if interface_mode.is_voice():
             clear_hangup(session)
 
-        conversation_history = get_history(session)
+        trace = session.get(KEY_TRACE)
 
         # Build system message fresh each turn
-        system_message = self.create_system_message(session=session)
+        with span(trace, 'system_prompt'):
+            system_message = self.create_system_message(session=session)
+
+        # Compact history before it's used to build the prompt — the system
+        # message is never touched, so the cached prefix survives. A summary
+        # finished since the last turn goes in first, at this turn boundary.
+        num_ctx = session.get('_num_ctx_override', self.config.ollama.num_ctx)
+        with span(trace, 'history_budget'):
+            self.history_summariser.apply(session)
+            self.history_budgeter.fit(session, system_message, num_ctx)
+        conversation_history = get_history(session)
 
         turn_prompt, turn_injections = self.create_prompt(
             input_text           = input_text,
@@ -499,6 +1102,9 @@ class CoreProcessor:
                 interface_mode = interface_mode,
                 agent_mode     = agent_mode,
             )
+            if self.tool_router is not None and not session.get('_headless'):
+                with span(trace, 'tool_router'):
+                    prompt_tools = self.tool_router.select(session, prompt_tools, input_text)
 
 
         # max_tool_loops from agent mode config
@@ -546,6 +1152,7 @@ class CoreProcessor:
                     get_history(session).append(msg)
                 if any(m.get('tool_name') in ('hangup_call', 'end_call') for m in tool_msg):
                     break
+                self.history_budgeter.fit(session, system_message, num_ctx)
                 prompt = [system_message] + get_history(session)
                 continue
             else:
@@ -574,6 +1181,14 @@ class CoreProcessor:
                 get_history(session).append(
                     {'role': 'assistant', 'content': full_response})
 
+        # The model has answered from this turn's tool results — shrink the
+        # big ones so later turns don't carry them. Headless runs are one-shot.
+        if not session.get('_headless'):
+            with span(trace, 'result_digest'):
+                self.result_digester.compact(session, self)
+            self.history_summariser.maybe_schedule(
+                session, self.history_budgeter.estimate_message(system_message), num_ctx)
+
         # ── Response delivery routing ─────────────────────────────────────────
         # The immediate_only parameter overrides the session flag when given.
         # Injected turns (relay replies) pass True so routing is decided
@@ -615,6 +1230,65 @@ class CoreProcessor:
         self.response_finished(session, queue_sentinel=not deliver_immediate)
         return delivered
 
+    async def process_input_async(
+        self,
+        input_text:     str,
+        session_id:     str,
+        images:         list = None,
+        immediate_only: bool = None,
+    ):
+        """
+        Async generator over one turn's response chunks.
+
+        Runs process_input() once on a turn worker thread and yields each
+        chunk from the session's response queue as it arrives — no thread
+        per chunk and no polling. Chunks are yielded exactly as queued,
+        including DISCARD_ACCUMULATED markers; the None sentinel ends the
+        iteration and is not yielded.
+
+        Immediate-only turns deliver through immediate_send and put nothing
+        on the queue, so for those the generator just waits for the turn.
+
+            async for chunk in core.process_input_async(text, session_id):
+                ...
+        """
+        session = self.get_session(session_id)
+        if session is None:
+            log.warning("Session not found, creating on the fly", extra={'data': f"id={session_id}"})
+            session = self.create_session(session_id)
+
+        route_immediate = (
+            immediate_only if immediate_only is not None
+            else is_immediate_send_only(session)
+        )
+        queued = not (get_immediate_send(session) and route_immediate)
+
+        loop = asyncio.get_running_loop()
+        turn = loop.run_in_executor(
+            self._turn_pool,
+            functools.partial(self.process_input, input_text, session_id, images, immediate_only),
+        )
+
+        if not queued:
+            await turn
+            return
+
+        q = get_response_queue(session)
+
+        def _on_turn_done(fut):
+            # A crashed turn never reaches response_finished() — end the
+            # stream ourselves so the consumer doesn't wait forever.
+            if not fut.cancelled() and fut.exception() is not None:
+                log.error("Turn failed", extra={'data': f"session={session_id} error={fut.exception()}"})
+                q.put(None)
+        turn.add_done_callback(_on_turn_done)
+
+        while True:
+            chunk = await q.get_async()
+            if chunk is None:
+                break
+            yield chunk
+
     # ──────────────────────────────────────────────────────────────────────────
     # Headless (background tasks)
     # ──────────────────────────────────────────────────────────────────────────
@@ -627,10 +1301,12 @@ class CoreProcessor:
         session_overrides: dict = None,
         model:            str  = None,
         num_ctx:          int  = None,
+        raise_on_error:   bool = False,
     ) -> str:
         """
         Run a prompt through the LLM with no live user present.
-        Returns the text response.
+        Returns the text response — on a backend failure that is the
+        "Error: ..." text the user would have seen, unless raise_on_error.
 
         Args:
             prompt:             The user-turn prompt text to process.
@@ -645,6 +1321,10 @@ class CoreProcessor:
                                 Use to inject speaker, user identity, or any other
                                 session keys needed by tools (e.g. _get_user_id).
                                 Example: {'speaker': 'jesse', 'endpoint_id': '123'}
+            raise_on_error:     Raise HeadlessError instead of returning the error
+                                text when the backend failed. Use it when the reply
+                                gets stored (summaries, memories). An empty reply
+                                is not an error — a tools-only pass has none.
         """
         session_id = f"headless_{uuid.uuid4().hex[:8]}"
         session    = self.create_session(session_id)
@@ -683,7 +1363,10 @@ class CoreProcessor:
                 break
 
         self.sessions.pop(session_id, None)
-        return "".join(result)
+        reply = "".join(result)
+        if raise_on_error and session.get(KEY_LLM_ERROR):
+            raise HeadlessError(session[KEY_LLM_ERROR])
+        return reply
 
     # ──────────────────────────────────────────────────────────────────────────
     # Prompt builders
@@ -717,7 +1400,9 @@ class CoreProcessor:
         turn_injections = []
         # skip tool injections for headless sessions
         if not session.get('_headless'):
-            for text, persist in self.tool_loader.get_turn_context_injections(self, session, input_text):
+            with span(session.get(KEY_TRACE), 'turn_context'):
+                injections = self.tool_loader.get_turn_context_injections(self, session, input_text)
+            for text, persist in injections:
                 msg = {'role': 'system', 'content': text}
                 messages.append(msg)
                 if persist:
@@ -735,22 +1420,109 @@ class CoreProcessor:
           3. Interface declaration (LLM knows which interface it's on)
         """
         if session.get('_model_override'):
-            return {'role': 'system', 'content': 'You are a helpful assistant. Follow instructions precisely and concisely.'}
+            return OVERRIDE_SYSTEM_MESSAGE
     
         interface_mode = get_interface_mode(session)
         agent_mode     = get_agent_mode(session)
 
         # 1. Agent personality
-        full_context = self.precontext_loader.get(agent_mode)
+        personality = self.precontext_loader.get(agent_mode)
 
         # 2. Tool context injections — session-aware
-        for injection in self.tool_loader.get_context_injections(self, session):
+        injections = tuple(self.tool_loader.get_context_injections(self, session))
+
+        # Reuse last turn's message if nothing changed. Memoized providers hand
+        # back the same str objects, so this comparison is mostly identity
+        # checks — and the prompt stays byte-identical for the prefix cache.
+        # The very same dict is returned, so the OpenAI translation cache
+        # (openai_messages.py) sees an unchanged prefix across turns.
+        key    = (interface_mode, str(agent_mode), bool(session.get('_headless')))
+        cached = self._system_message_cache.get(key)
+        if cached is not None and cached[0] == personality and cached[1] == injections:
+            return cached[2]
+
+        full_context = personality
+        for injection in injections:
             full_context += f"\n\n{injection}"
 
         # 3. Interface declaration
         full_context += f"\n\n[INTERFACE]\nThe user is interacting via: {interface_mode}"
 
-        return {'role': 'system', 'content': full_context}
+        message = {'role': 'system', 'content': full_context}
+        self._system_message_cache[key] = (personality, injections, message)
+        return message
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # Backend routing
+    # ──────────────────────────────────────────────────────────────────────────
+
+    def _send_to_llm(self, prompt_text: list, prompt_tools: list, session: dict, images: list = None) -> tuple:
+        """
+        Send one request to the best endpoint for the session's class (see
+        backend_pool.py), moving on to the next candidate if an endpoint
+        fails before streaming anything. Same contract as send_to_ollama.
+        """
+        request_class = self._current_priority(session).name.lower()
+        candidates    = self.backends.candidates(request_class)
+        # A tool run inside this request can make its own (headless) request
+        # on this thread — put the outer endpoint back afterwards
+        previous = (getattr(self._backend_local, 'endpoint', None),
+                    getattr(self._backend_local, 'can_fail_over', False))
+        try:
+            for n, endpoint in enumerate(candidates):
+                self._backend_local.endpoint      = endpoint
+                self._backend_local.can_fail_over = n < len(candidates) - 1
+                send = self.send_to_llamaserver if endpoint.kind == 'llama_server' else self.send_to_ollama
+                self.backends.begin(endpoint)
+                try:
+                    return send(prompt_text=prompt_text, prompt_tools=prompt_tools, session=session, images=images)
+                except BackendUnavailable as e:
+                    log.warning("Backend failed before streaming — failing over", extra={'data': (
+                        f"from={endpoint.name} to={candidates[n + 1].name} class={request_class} error={e}"
+                    )})
+                finally:
+                    self.backends.end(endpoint)
+        finally:
+            self._backend_local.endpoint, self._backend_local.can_fail_over = previous
+
+    def _endpoint(self) -> BackendEndpoint:
+        """The endpoint the request on this thread is going to (the primary outside _send_to_llm)."""
+        return getattr(self._backend_local, 'endpoint', None) or self.backends.primary
+
+    def _make_backend_client(self, kind: str, host: str):
+        """
+        Client for an ollama or llama_server endpoint. Both report each HTTP
+        response to the StreamHandle of the request being sent on this
+        thread, so a barge-in can cut it off.
+        """
+        stream_hooks = {'response': [self._on_stream_response]}
+        if kind == 'llama_server':
+            if openai is None:
+                raise RuntimeError("llama_server endpoints need the openai package")
+            return openai.OpenAI(
+                base_url    = f"{host.rstrip('/')}/v1",
+                api_key     = "not-needed",
+                http_client = openai.DefaultHttpxClient(event_hooks=stream_hooks),
+            )
+        return ollama.Client(host=host, event_hooks=stream_hooks)
+
+    def _observe_ttft(self, seconds: float) -> None:
+        endpoint = self._endpoint()
+        self.metrics.ttft.labels(backend=endpoint.name).observe(seconds)
+        self.backends.observe_ttft(endpoint, seconds)
+
+    def _backend_failed(self, error: Exception, streamed: bool) -> bool:
+        """
+        Mark this thread's endpoint down if error says it is unreachable or
+        overloaded. True if the request should move to the next endpoint —
+        only when nothing was streamed, so nothing reached the user twice.
+        """
+        # Without the pool there is nowhere to fail over to and no probe to
+        # bring the primary back — leave the existing error handling to it
+        if not self.backends.config.enabled or not is_backend_fault(error):
+            return False
+        self.backends.mark_failed(self._endpoint(), error)
+        return not streamed and getattr(self._backend_local, 'can_fail_over', False)
 
     # ──────────────────────────────────────────────────────────────────────────
     # Ollama streaming
@@ -769,8 +1541,11 @@ class CoreProcessor:
         Returns:
             (full_response: str, tool_messages: list | None, chat_tool_calls: list | None)
         """
-        response_queue = get_response_queue(session)
-        cancel_event   = get_cancel_event(session)
+        response_queue  = get_response_queue(session)
+        cancel_event    = get_cancel_event(session)
+        ticket          = None
+        handle          = None
+        first_chunk_yet = False
 
         try:
             response_content = ""
@@ -786,11 +1561,21 @@ class CoreProcessor:
             # debug logging for full prompt and tool list send to Ollama so we can diagnose KV cache breaking changes between sessions/turns:
             self._log_prompt(prompt_text, prompt_tools, session)
 
-            # if we have any model overrides (for headless mode) use them, otherwise default to self.model:
-            model = session.get('_model_override', self.model)
-            num_ctx = session.get('_num_ctx_override', self.config.ollama.num_ctx)  # allow override for headless calls etc, otherwise default to config value
-
-            response_stream = self.ollama_client.chat(
+            # if we have any model overrides (for headless mode) use them, otherwise default to self.model.
+            # Extra endpoints in the backend pool always run their own model.
+            endpoint = self._endpoint()
+            model    = session.get('_model_override', self.model) if endpoint.primary else endpoint.model
+            num_ctx  = session.get('_num_ctx_override', endpoint.num_ctx or self.config.ollama.num_ctx)  # allow override for headless calls etc, otherwise default to config value
+
+            submit_early = self._early_tool_submitter(session)
+            started      = {}
+            trace        = session.get(KEY_TRACE)
+
+            with span(trace, 'llm_admit'):
+                ticket = self._admit(session)
+            t_request = time.monotonic()
+            handle = self._begin_stream(session)
+            response_stream = endpoint.client.chat(
                 model      = model,
                 messages   = prompt_text,
                 stream     = True,
@@ -803,15 +1588,21 @@ class CoreProcessor:
 
             )
 
-            session[KEY_OLLAMA_STREAM] = response_stream
+            handle.stream = response_stream
             log.debug("Stream started", **self._elapsed(session))
             first_chunk_yet = False
+            n_chunks        = 0
 
             for chunk in response_stream:
                 if not first_chunk_yet:
                     log.debug("First chunk received", **self._elapsed(session))
                     first_chunk_yet = True
                     print(f"[STREAM] ", end="", flush=True)
+                    t_first = time.monotonic()
+                    self._observe_ttft(t_first - t_request)
+                    if trace is not None:
+                        trace.add('llm_ttft', t_request)
+                n_chunks += 1
 
                 # Barge-in check
                 if cancel_event and cancel_event.is_set():
@@ -825,20 +1616,40 @@ class CoreProcessor:
                     response_queue.put(chunk.message.content)
 
                 if chunk.message.tool_calls:
-                    tool_calls.extend(chunk.message.tool_calls)
+                    # Ollama sends each call whole — start safe ones right away
+                    for tc in chunk.message.tool_calls:
+                        future = submit_early(tc.function.name, tc.function.arguments)
+                        if future is not None:
+                            started[len(tool_calls)] = future
+                        tool_calls.append(tc)
 
             log.debug("Stream ended", extra={'data': f"chars={len(response_content)} tools={len(tool_calls)}"})
-            session[KEY_OLLAMA_STREAM] = None
+            if trace is not None:
+                trace.add('llm_stream', t_request, chars=len(response_content), tools=len(tool_calls))
+            self._observe_stream(n_chunks, t_first if first_chunk_yet else None, cancel_event)
+            self._end_stream(session, handle)
+            handle = None
+            self._release(ticket)
+            ticket = None
 
             # ── Tool execution ────────────────────────────────────────────────
             if tool_calls:
-                tool_messages = self._execute_tool_calls(tool_calls, session, response_content, response_queue)
+                tool_messages = self._execute_tool_calls(tool_calls, session, response_content, response_queue, started)
                 return response_content, tool_messages, tool_calls
             
             return response_content, None, None
 
         except Exception as e:
-            session[KEY_OLLAMA_STREAM] = None
+            self._end_stream(session, handle)
+            self._release(ticket)
+            # A barge-in cuts the connection — the read error is expected
+            if cancel_event and cancel_event.is_set():
+                self.metrics.llm_requests.labels(backend=self._endpoint().name, outcome='cancelled').inc()
+                log.debug("Response cancelled by user", **self._elapsed(session))
+                return response_content + "\n[User interrupted]\n", None, None
+            self.metrics.llm_requests.labels(backend=self._endpoint().name, outcome='error').inc()
+            if self._backend_failed(e, first_chunk_yet):
+                raise BackendUnavailable(str(e)) from e
             return self._handle_ollama_error(
                 error            = e,
                 session          = session,
@@ -852,14 +1663,12 @@ class CoreProcessor:
         if isinstance(error, ConnectionError):
             msg = "Cannot connect to Ollama — is it running? Try: ollama serve"
             log.error("Ollama connection error", extra={'data': str(error)})
-            response_queue.put(f"\nError: {msg}")
-            return f"Error: {msg}", None, None
+            return self._error_reply(session, response_queue, msg)
 
         if ollama and isinstance(error, ollama.RequestError):
             msg = f"Bad request to Ollama: {error.error}"
             log.error("Ollama request error", extra={'data': msg})
-            response_queue.put(f"\nError: {msg}")
-            return f"Error: {msg}", None, None
+            return self._error_reply(session, response_queue, msg)
 
         if ollama and isinstance(error, ollama.ResponseError):
             log.error("Ollama response error", extra={'data': f"status={error.status_code} {error.error}"})
@@ -873,8 +1682,7 @@ class CoreProcessor:
                 except Exception as pull_err:
                     msg = f"Model '{self.model}' not found and pull failed: {pull_err}"
                     log.error("Model pull failed", extra={'data': str(pull_err)})
-                response_queue.put(f"\nError: {msg}")
-                return f"Error: {msg}", None, None
+                return self._error_reply(session, response_queue, msg)
 
             if error.status_code == 500:
                 self._send_retry_notice(session)
@@ -884,8 +1692,7 @@ class CoreProcessor:
                 )
 
             msg = f"Ollama server error ({error.status_code})"
-            response_queue.put(f"\nError: {msg}")
-            return f"Error: {msg}", None, None
+            return self._error_reply(session, response_queue, msg)
 
         if tool_calls:
             return self._loop_back_bad_tool(
@@ -895,6 +1702,15 @@ class CoreProcessor:
 
         msg = str(error)
         log.error("Unexpected Ollama exception", extra={'data': msg})
+        return self._error_reply(session, response_queue, msg)
+
+    def _error_reply(self, session: dict, response_queue: queue.Queue, msg: str) -> tuple:
+        """
+        End the round with an error the user can see. The message is also
+        kept on the session, so run_headless() callers can tell a failed
+        request from a reply.
+        """
+        session[KEY_LLM_ERROR] = msg
         response_queue.put(f"\nError: {msg}")
         return f"Error: {msg}", None, None
 
@@ -927,10 +1743,20 @@ class CoreProcessor:
     # Shared tool execution (used by both send_to_ollama and send_to_llamaserver)
     # ──────────────────────────────────────────────────────────────────────────
 
-    def _execute_tool_calls(self, tool_calls: list, session: dict, response_content: str, response_queue: queue.Queue) -> list:
+    def _execute_tool_calls(self, tool_calls: list, session: dict, response_content: str, response_queue: queue.Queue, started: dict = None) -> list:
         """
         Run each tool call and return the list of resulting tool-role messages
-        to append to history.
+        to append to history, in the order the model made the calls.
+
+        Tools marked parallel_safe in their yaml run concurrently on the
+        shared pool; everything else runs sequentially on this thread. Once
+        the sequential calls are done, the parallel ones are waited on for
+        whatever is left of the turn's config.tools.deadline_s — each round's
+        wait is deducted, so a turn never waits longer than that in total,
+        however many tool rounds it takes. Once it is spent, later rounds run
+        every call in order here. started maps positions in tool_calls to
+        futures already launched mid-stream (see _early_tool_submitter); those
+        are joined rather than run again.
 
         tool_calls entries just need to expose:
             .function.name        — str
@@ -949,49 +1775,157 @@ class CoreProcessor:
                 # consumer sees it after all pre-tool tokens and drops them.
                 response_queue.put(DISCARD_ACCUMULATED)
 
-        tool_messages = []
-        for tc in tool_calls:
-            tool_name_detected = tc.function.name
-            tool_args          = {
-                'name':       tool_name_detected,
-                'parameters': dict(tc.function.arguments) if tc.function.arguments else {},
-            }
-            tc_id = getattr(tc, 'id', None)
-            log.info("Tool call detected", **self._elapsed(session, tool_name_detected))
+        # Parallel-safe calls go to the pool first, then everything else runs
+        # here in order while they're in flight. A lone call isn't worth a
+        # thread hop.
+        # Once the turn's wait budget is spent, a round runs entirely in
+        # order: nothing can be waited on, and abandoning a tool that would
+        # still finish (and act) later is worse than running it here.
+        started  = started or {}
+        budget   = self._tool_budget()
+        parallel = [
+            i for i, tc in enumerate(tool_calls)
+            if i not in started and self.tool_loader.is_parallel_safe(tc.function.name)
+        ]
+        if (len(parallel) < 2 and not started) or budget <= 0:
+            if parallel and budget <= 0:
+                log.info("Turn tool budget spent — running tools in order", extra={'data': (
+                    f"{[tool_calls[i].function.name for i in parallel]}"
+                )})
+            parallel = []
+
+        results  = [None] * len(tool_calls)
+        futures  = dict(started)
+        futures.update({i: self._submit_tool(tool_calls[i], session) for i in parallel})
+        if futures:
+            log.info("Running tools in parallel", extra={'data': (
+                f"{[tool_calls[i].function.name for i in sorted(futures)]} started_early={len(started)}"
+            )})
+
+        for i, tc in enumerate(tool_calls):
+            if i not in futures:
+                results[i] = self._run_one_tool(tc, session)
+
+        if futures:
+            # The clock starts here, so slow sequential tools don't use up the
+            # parallel ones' time
+            t_wait  = time.monotonic()
+            done, _ = concurrent.futures.wait(futures.values(), timeout=max(0.0, budget))
+            waited  = time.monotonic() - t_wait
+            if getattr(self._turn_local, 'tool_budget', None) is not None:
+                self._turn_local.tool_budget = max(0.0, budget - waited)
+            for i, future in futures.items():
+                if future in done and not future.cancelled():
+                    # Rebuild the message from the final call — an early start
+                    # may not have had the call's id yet
+                    results[i] = self._tool_message(tool_calls[i], future.result()['content'])
+                    continue
+                # Threads can't be killed — a straggler keeps its pool worker
+                # until it returns, but its result is dropped.
+                future.cancel()
+                name = tool_calls[i].function.name
+                log.warning("Tool deadline exceeded", extra={'data': (
+                    f"{name} deadline={self.config.tools.deadline_s}s waited={waited:.1f}s"
+                )})
+                results[i] = self._tool_message(
+                    tool_calls[i], json.dumps({"text": f"Tool timed out after {waited:.1f}s"})
+                )
 
-            try:
-                fn = self.tool_loader.get_executor(tool_name_detected)
-                if fn is None:
-                    log.warning("Tool not found", extra={'data': tool_name_detected})
-                    wrapped = self._wrap_tool_result(tool_name_detected, {"text": "Unknown tool"})
-                else:
-                    log.info("Executing tool", **self._elapsed(session, tool_name_detected))
-                    t_tool  = time.perf_counter()
-                    wrapped = fn(tool_args=tool_args, session=session, core=self)
-                    dt_tool = time.perf_counter() - t_tool
-                    log.info("Tool finished", **self._elapsed(session, f"{tool_name_detected} dur={dt_tool:.3f}s"))
-
-                if wrapped is None:
-                    content = json.dumps({"text": "ok"})
-                else:
-                    content = json.dumps(
-                        json.loads(wrapped).get('tool_result', {}).get('content', {})
-                    )
-            except Exception as e:
-                log.error("Tool execution error", extra={'data': f"{tool_name_detected}: {e}"})
-                content = json.dumps({"text": f"Tool error: {e}"})
+        return results
 
-            tool_message = {
-                'role':      'tool',
-                'tool_name': tool_name_detected,
-                'content':   content,
-            }
-            if tc_id:
-                tool_message['tool_call_id'] = tc_id
+    def _run_one_tool(self, tc, session: dict) -> dict:
+        """Execute one tool call and return its tool-role message. Never raises."""
+        tool_name_detected = tc.function.name
+        tool_args          = {
+            'name':       tool_name_detected,
+            'parameters': dict(tc.function.arguments) if tc.function.arguments else {},
+        }
+        log.info("Tool call detected", **self._elapsed(session, tool_name_detected))
 
-            tool_messages.append(tool_message)
+        try:
+            fn = self.tool_loader.get_executor(tool_name_detected)
+            if fn is None:
+                log.warning("Tool not found", extra={'data': tool_name_detected})
+                wrapped = self._wrap_tool_result(tool_name_detected, {"text": "Unknown tool"})
+            else:
+                log.info("Executing tool", **self._elapsed(session, tool_name_detected))
+                t_tool  = time.perf_counter()
+                try:
+                    with span(session.get(KEY_TRACE), f"tool:{tool_name_detected}"):
+                        wrapped = fn(tool_args=tool_args, session=session, core=self)
+                except Exception:
+                    self.metrics.tool_seconds.labels(tool=tool_name_detected, outcome='error').observe(
+                        time.perf_counter() - t_tool)
+                    raise
+                dt_tool = time.perf_counter() - t_tool
+                self.metrics.tool_seconds.labels(tool=tool_name_detected, outcome='ok').observe(dt_tool)
+                log.info("Tool finished", **self._elapsed(session, f"{tool_name_detected} dur={dt_tool:.3f}s"))
+
+            if wrapped is None:
+                content = json.dumps({"text": "ok"})
+            else:
+                content = json.dumps(
+                    json.loads(wrapped).get('tool_result', {}).get('content', {})
+                )
+        except Exception as e:
+            log.error("Tool execution error", extra={'data': f"{tool_name_detected}: {e}"})
+            content = json.dumps({"text": f"Tool error: {e}"})
 
-        return tool_messages
+        return self._tool_message(tc, content)
+
+    def _early_tool_submitter(self, session: dict):
+        """
+        Return a submit(name, args) callback for starting tool calls while the
+        model is still streaming. Only parallel_safe tools start early —
+        anything else may depend on running in order after earlier calls.
+        Returns None from the callback to leave a call for after the stream.
+        """
+        def submit(name: str, args: dict):
+            if not self.tool_loader.is_parallel_safe(name) or self._tool_budget() <= 0:
+                return None
+            tc = types.SimpleNamespace(
+                id       = None,
+                function = types.SimpleNamespace(name=name, arguments=args),
+            )
+            return self._submit_tool(tc, session)
+        return submit
+
+    def _tool_budget(self) -> float:
+        """
+        Seconds the current turn may still wait on parallel tools. Outside
+        process_input (no turn) every call gets the full deadline.
+        """
+        budget = getattr(self._turn_local, 'tool_budget', None)
+        return self.config.tools.deadline_s if budget is None else budget
+
+    def _submit_tool(self, tc, session: dict) -> concurrent.futures.Future:
+        """
+        Run _run_one_tool on the tool pool under the calling turn's LLM
+        priority, so a tool that makes its own headless LLM call is admitted
+        like the turn that called it.
+        """
+        priority = getattr(self._turn_local, 'priority', None)
+
+        def run():
+            self._turn_local.priority = priority
+            try:
+                return self._run_one_tool(tc, session)
+            finally:
+                self._turn_local.priority = None
+        return self._tool_pool.submit(run)
+
+    @staticmethod
+    def _tool_message(tc, content: str) -> dict:
+        """Build the tool-role history message for a call's result."""
+        tool_message = {
+            'role':      'tool',
+            'tool_name': tc.function.name,
+            'content':   content,
+        }
+        tc_id = getattr(tc, 'id', None)
+        if tc_id:
+            tool_message['tool_call_id'] = tc_id
+        return tool_message
 
     # ──────────────────────────────────────────────────────────────────────────
     # llama-server (OpenAI-compatible) streaming
@@ -1016,30 +1950,39 @@ class CoreProcessor:
 
         response_content = ""
         tool_calls        = []
+        slot_leased       = False
+        ticket            = None
+        handle            = None
+        first_chunk_yet   = False
 
         try:
-            oai_messages = self._messages_to_openai(prompt_text, images)
-            oai_tools    = [self._tool_to_openai_schema(fn) for fn in (prompt_tools or [])]
+            oai_messages = self._messages_to_openai(prompt_text, images, session)
+            oai_tools, tools_json = self._openai_tools(prompt_tools, session)
 
             self._log_prompt(prompt_text, prompt_tools, session)
 
-            model = session.get('_model_override', self.config.llama_server.model)
+            endpoint = self._endpoint()
+            model    = (session.get('_model_override', self.config.llama_server.model)
+                        if endpoint.primary else endpoint.model)
+
+            # Admission first, so a queued request doesn't sit on a pinned slot
+            trace = session.get(KEY_TRACE)
+            with span(trace, 'llm_admit'):
+                ticket = self._admit(session)
 
             extra_body = {}
-            if self.config.llama_server.use_slots:
-                if session.get('_headless'):
-                    extra_body['id_slot'] = self.config.llama_server.headless_slot
-                else:
-                    interface = session.get('interface', 'general')
-                    extra_body['id_slot'] = self.config.llama_server.slot_map.get(
-                        interface, self.config.llama_server.default_slot
-                    )
+            slot = self._acquire_slot(session) if endpoint.primary else None
+            if slot is not None:
+                extra_body['id_slot'] = slot
+                slot_leased = True
 
             # Dump exact wire payload for cache-diffing between turns
             if self.config.debug.log_prompts:
-                self._log_wire_payload(model, oai_messages, oai_tools, extra_body, session)
+                self._log_wire_payload(model, oai_messages, oai_tools, extra_body, session, tools_json)
 
-            stream = self.llamaserver_client.chat.completions.create(
+            t_request = time.monotonic()
+            handle = self._begin_stream(session)
+            stream = endpoint.client.chat.completions.create(
                 model    = model,
                 messages = oai_messages,
                 tools    = oai_tools or openai.NOT_GIVEN,
@@ -1047,17 +1990,23 @@ class CoreProcessor:
                 extra_body = extra_body,
             )
 
-            session[KEY_OLLAMA_STREAM] = stream
+            handle.stream = stream
             log.debug("Stream started", **self._elapsed(session))
             first_chunk_yet = False
+            n_chunks        = 0
 
-            pending_tool_calls = {}
+            assembler = ToolCallAssembler(submit=self._early_tool_submitter(session))
 
             for chunk in stream:
                 if not first_chunk_yet:
                     log.debug("First chunk received", **self._elapsed(session))
                     first_chunk_yet = True
                     print(f"[STREAM] ", end="", flush=True)
+                    t_first = time.monotonic()
+                    self._observe_ttft(t_first - t_request)
+                    if trace is not None:
+                        trace.add('llm_ttft', t_request)
+                n_chunks += 1
 
                 if cancel_event and cancel_event.is_set():
                     log.debug("Response cancelled by user", **self._elapsed(session))
@@ -1076,30 +2025,41 @@ class CoreProcessor:
 
                 if delta.tool_calls:
                     for tc_delta in delta.tool_calls:
-                        entry = pending_tool_calls.setdefault(
-                            tc_delta.index, {'id': None, 'name': None, 'arguments': ''}
-                        )
-                        if tc_delta.id:
-                            entry['id'] = tc_delta.id
-                        if tc_delta.function:
-                            if tc_delta.function.name:
-                                entry['name'] = tc_delta.function.name
-                            if tc_delta.function.arguments:
-                                entry['arguments'] += tc_delta.function.arguments
-
-            log.debug("Stream ended", extra={'data': f"chars={len(response_content)} tools={len(pending_tool_calls)}"})
-            session[KEY_OLLAMA_STREAM] = None
-
-            tool_calls = self._finalize_tool_calls(pending_tool_calls)
+                        assembler.add(tc_delta)
+
+            log.debug("Stream ended", extra={'data': f"chars={len(response_content)} tools={len(assembler.pending)}"})
+            if trace is not None:
+                trace.add('llm_stream', t_request, chars=len(response_content), tools=len(assembler.pending))
+            self._observe_stream(n_chunks, t_first if first_chunk_yet else None, cancel_event)
+            self._end_stream(session, handle)
+            handle = None
+            if slot_leased:
+                slot_leased = False
+                self._release_slot(session)
+            self._release(ticket)
+            ticket = None
+
+            tool_calls, started = assembler.finish(self._finalize_tool_calls)
 
             if tool_calls:
-                tool_messages = self._execute_tool_calls(tool_calls, session, response_content, response_queue)
+                tool_messages = self._execute_tool_calls(tool_calls, session, response_content, response_queue, started)
                 return response_content, tool_messages, tool_calls
 
             return response_content, None, None
 
         except Exception as e:
-            session[KEY_OLLAMA_STREAM] = None
+            self._end_stream(session, handle)
+            if slot_leased:
+                self._release_slot(session)
+            self._release(ticket)
+            # A barge-in cuts the connection — the read error is expected
+            if cancel_event and cancel_event.is_set():
+                self.metrics.llm_requests.labels(backend=self._endpoint().name, outcome='cancelled').inc()
+                log.debug("Response cancelled by user", **self._elapsed(session))
+                return response_content + "\n[User interrupted]\n", None, None
+            self.metrics.llm_requests.labels(backend=self._endpoint().name, outcome='error').inc()
+            if self._backend_failed(e, first_chunk_yet):
+                raise BackendUnavailable(str(e)) from e
             return self._handle_llamaserver_error(
                 error            = e,
                 session          = session,
@@ -1133,18 +2093,7 @@ class CoreProcessor:
             ))
         return tool_calls
 
-    @staticmethod
-    def _image_url(img) -> str:
-        """Normalise any image input shape to a data-URI string."""
-        if isinstance(img, (bytes, bytearray)):
-            try:
-                img = bytes(img).decode('ascii')          # base64-as-bytes
-            except UnicodeDecodeError:
-                img = base64.b64encode(bytes(img)).decode('ascii')  # raw bytes
-        img = ''.join(str(img).split())
-        return img if img.startswith('data:') else f"data:image/jpeg;base64,{img}"
-
-    def _messages_to_openai(self, messages: list, images: list = None) -> list:
+    def _messages_to_openai(self, messages: list, images: list = None, session: dict = None) -> list:
         """
         Translate our internal, backend-agnostic message list into OpenAI
         wire format, respecting Qwen3.5's template constraint that only one
@@ -1157,81 +2106,16 @@ class CoreProcessor:
         preserves the live, per-turn injection timing your history is
         actually built with, instead of statically front-loading everything
         into one block at the top.
-        """
-        oai = []
-        pending_system = []
-        leading_system_seen = False
-        last_user_idx = None
-
-        for i, msg in enumerate(messages):
-            role = msg.get('role')
-
-            if role == 'system':
-                content = msg.get('content', '')
-                if not leading_system_seen:
-                    leading_system_seen = True
-                    oai.append({'role': 'system', 'content': content})
-                elif content:
-                    pending_system.append(content)
-                continue
-
-            if role == 'tool':
-                oai.append({
-                    'role':         'tool',
-                    'tool_call_id': msg.get('tool_call_id') or msg.get('tool_name', 'unknown'),
-                    'content':      msg.get('content', ''),
-                })
-                continue
-
-            if role == 'assistant' and msg.get('tool_calls'):
-                oai.append({
-                    'role':       'assistant',
-                    'content':    msg.get('content') or None,
-                    'tool_calls': [
-                        {
-                            'id':   getattr(tc, 'id', None) or f"call_{i}_{j}",
-                            'type': 'function',
-                            'function': {
-                                'name':      tc.function.name,
-                                'arguments': json.dumps(tc.function.arguments),
-                            },
-                        }
-                        for j, tc in enumerate(msg['tool_calls'])
-                    ],
-                })
-                continue
-
-            content = msg.get('content', '')
-            if role == 'user' and pending_system:
-                injected = '\n\n'.join(f"[context]\n{c}\n[/context]" for c in pending_system)
-                content = f"{injected}\n\n{content}" if content else injected
-                pending_system = []
-
-            msg_images = msg.get('images')
-            if msg_images:
-                blocks = ([{'type': 'text', 'text': content}] if content else [])
-                blocks += [{'type': 'image_url',
-                            'image_url': {'url': self._image_url(im)}}
-                           for im in msg_images]
-                oai.append({'role': role, 'content': blocks})
-            else:
-                oai.append({'role': role, 'content': content})
-                
-            if role == 'user':
-                last_user_idx = len(oai) - 1
-
-        # Shouldn't normally happen given how process_input builds history
-        # (injections are always immediately followed by a new user message),
-        # but don't silently drop anything if it does.
-        if pending_system:
-            if oai and oai[0]['role'] == 'system':
-                oai[0]['content'] += '\n\n' + '\n\n'.join(pending_system)
-            else:
-                oai.insert(0, {'role': 'system', 'content': '\n\n'.join(pending_system)})
-                if last_user_idx is not None:
-                    last_user_idx += 1
 
-        return oai
+        With a session, the translation is cached on it and only messages
+        after the unchanged prefix are translated (see openai_messages.py).
+        """
+        if session is None:
+            return translate_messages(messages)
+        translation = session.get(KEY_OAI_MESSAGES)
+        if translation is None:
+            translation = session[KEY_OAI_MESSAGES] = MessageTranslation()
+        return translation.translate(messages)
 
     def _annotation_to_json_schema(self, annotation) -> dict:
         """
@@ -1285,6 +2169,53 @@ class CoreProcessor:
                 list: 'array', dict: 'object'}
         return {'type': flat.get(annotation, 'string')}
 
+    def _openai_tools(self, prompt_tools: list, session: dict) -> tuple[list, str]:
+        """
+        Return (oai_tools, tools_json) for prompt_tools — the OpenAI tool array
+        and its serialized JSON.
+
+        Compiling a schema means inspect.signature, docstring parsing and
+        the recursive annotation walk, for every tool on every LLM round.
+        The result only changes when the tool set reloads, so it's cached per
+        (tool loader version, interface_mode, agent_mode). Returning the same
+        dicts every round also means the client serializes identical bytes,
+        keeping the tools block of the prompt prefix stable for the KV cache.
+
+        The cached entry remembers which schema functions it was built from
+        and is rebuilt if they differ, so an explicit headless tool list or a
+        reload mid-turn can never be served someone else's schemas.
+        """
+        if not prompt_tools:
+            return [], ''
+
+        version = self.tool_loader.version
+        if '_headless_tools' in session or KEY_ROUTED_TOOLS in session:
+            # An explicit or routed subset — key on the tools themselves
+            key = (version, 'subset', tuple(fn.__name__ for fn in prompt_tools))
+        else:
+            key = (version, get_interface_mode(session), str(get_agent_mode(session)))
+
+        with self._tool_schema_lock:
+            entry = self._tool_schema_cache.get(key)
+        if entry is not None:
+            fns, oai_tools, tools_json = entry
+            if len(fns) == len(prompt_tools) and all(a is b for a, b in zip(fns, prompt_tools)):
+                return oai_tools, tools_json
+
+        oai_tools  = [self._tool_to_openai_schema(fn) for fn in prompt_tools]
+        tools_json = json.dumps(oai_tools, ensure_ascii=False)
+
+        with self._tool_schema_lock:
+            # Entries from an older tool set can never be hit again
+            for stale in [k for k in self._tool_schema_cache if k[0] != version]:
+                del self._tool_schema_cache[stale]
+            self._tool_schema_cache[key] = (tuple(prompt_tools), oai_tools, tools_json)
+
+        log.debug("Tool schemas compiled", extra={'data': (
+            f"version={version} key={key[1:]} tools={len(oai_tools)} bytes={len(tools_json)}"
+        )})
+        return oai_tools, tools_json
+
     def _tool_to_openai_schema(self, fn) -> dict:
         """
         Convert one of our tool schema functions into an OpenAI-style tool
@@ -1323,8 +2254,7 @@ class CoreProcessor:
         if openai and isinstance(error, openai.APIConnectionError):
             msg = "Cannot connect to llama-server — is it running?"
             log.error("llama-server connection error", extra={'data': str(error)})
-            response_queue.put(f"\nError: {msg}")
-            return f"Error: {msg}", None, None
+            return self._error_reply(session, response_queue, msg)
 
         if openai and isinstance(error, openai.APIStatusError):
             status = error.status_code
@@ -1338,8 +2268,7 @@ class CoreProcessor:
                 )
 
             msg = f"llama-server error ({status})"
-            response_queue.put(f"\nError: {msg}")
-            return f"Error: {msg}", None, None
+            return self._error_reply(session, response_queue, msg)
 
         if tool_calls:
             return self._loop_back_bad_tool(
@@ -1349,8 +2278,7 @@ class CoreProcessor:
 
         msg = str(error)
         log.error("Unexpected llama-server exception", extra={'data': msg})
-        response_queue.put(f"\nError: {msg}")
-        return f"Error: {msg}", None, None
+        return self._error_reply(session, response_queue, msg)
 
     # ──────────────────────────────────────────────────────────────────────────
     # Queue helpers
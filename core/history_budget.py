@@ -0,0 +1,197 @@
+"""
+core/history_budget.py — Token-budgeted conversation history compaction.
+
+History is appended to every turn and never trimmed, so long Telegram and
+web sessions eventually overflow num_ctx — and long before that, prefill
+time grows with every turn. HistoryBudgeter keeps the prompt under a
+configurable fraction of the context window.
+
+Cache-friendly by design:
+  - The system message is never touched, so the stable prefix
+    (personality + tool context) always survives.
+  - Compaction is hysteretic: once the prompt crosses the high-water mark
+    it is trimmed down to a lower target in one step and the result is
+    written back to the session. The compacted history is then a stable
+    prefix again for many turns, instead of shifting by one message every
+    turn (which would miss the KV cache on every single turn).
+  - The cheapest content goes first: old tool results are folded to a
+    one-line stub and old turn injections are dropped. Whole turns are
+    only dropped, oldest first, if that isn't enough. The rolling summary
+    (history_summary.py) is not an injection and is kept.
+
+Usage:
+    budgeter = HistoryBudgeter(config.history)
+    budgeter.fit(session, system_message, num_ctx)   # mutates history if over budget
+"""
+
+import json
+
+from core.history_summary import is_summary
+from core.session_state import get_history, set_history, get_session_id
+from core.logger import get_logger
+
+log = get_logger('history_budget')
+
+# Per-message chat template overhead (role markers, separators) in tokens.
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Rough prompt cost of one attached image. Vision encoders vary a lot, this
+# just stops image turns from counting as free.
+IMAGE_TOKENS = 768
+
+TOOL_RESULT_STUB = "[Earlier tool result removed to save context — call the tool again if needed.]"
+
+
+class HistoryBudgeter:
+    """
+    Estimates prompt size and compacts session history to fit the budget.
+
+    Token counts are estimated from character length — the tokenizer lives
+    in the backend, and a round trip per turn would cost more than the
+    prefill it saves. chars_per_token is configurable for models whose
+    tokenizer is noticeably denser or sparser than the default.
+
+    Stateless apart from config — one instance lives on CoreProcessor and
+    is shared by all sessions.
+    """
+
+    def __init__(self, config):
+        self.config = config
+
+    # ── Estimation ────────────────────────────────────────────────────────────
+
+    def estimate_message(self, msg: dict) -> int:
+        """Estimated token cost of one message dict."""
+        chars = len(msg.get('content') or '')
+        for tc in msg.get('tool_calls') or []:
+            try:
+                chars += len(tc.function.name) + len(json.dumps(tc.function.arguments, default=str))
+            except Exception:
+                chars += len(str(tc))
+        tokens = int(chars / self.config.chars_per_token) + MESSAGE_OVERHEAD_TOKENS
+        tokens += IMAGE_TOKENS * len(msg.get('images') or [])
+        return tokens
+
+    def estimate(self, messages: list) -> int:
+        """Estimated token cost of a message list."""
+        return sum(self.estimate_message(m) for m in messages)
+
+    # ── Compaction ────────────────────────────────────────────────────────────
+
+    def fit(self, session: dict, system_message: dict, num_ctx: int) -> bool:
+        """
+        Compact the session's history if system_message + history is over
+        budget_fraction of num_ctx. Returns True if history was changed.
+
+        Messages are replaced rather than edited in place, so anything still
+        holding the old list or dicts (e.g. an in-flight prompt) is unaffected.
+        """
+        if not self.config.enabled:
+            return False
+
+        history = get_history(session)
+        if not history:
+            return False
+
+        budget  = int(num_ctx * self.config.budget_fraction) - self.config.reserve_tokens
+        fixed   = self.estimate_message(system_message)
+        costs   = [self.estimate_message(m) for m in history]
+        total   = fixed + sum(costs)
+        if total <= budget:
+            return False
+
+        target  = int(num_ctx * self.config.target_fraction) - self.config.reserve_tokens
+        before  = total
+        history = list(history)
+
+        protected_from = self._protected_start(history)
+
+        # ── 1. Fold old tool results and drop old turn injections ────────────
+        total, removed = self._fold(history, costs, total, target, 0, protected_from)
+        protected_from -= removed
+
+        # ── 2. Drop whole turns, oldest first ────────────────────────────────
+        # Cut only at user-message boundaries so an assistant tool_calls
+        # message is never separated from its tool results. The rolling
+        # summary leads the history and stands in for the turns already
+        # dropped — cut after it, never through it.
+        if total > target:
+            lead = 0
+            while lead < protected_from and is_summary(history[lead]):
+                lead += 1
+            starts = [i for i in range(lead, protected_from) if history[i].get('role') == 'user']
+            starts.append(protected_from)
+            cut = lead
+            for nxt in starts[1:]:
+                if total <= target:
+                    break
+                total -= sum(costs[cut:nxt])
+                cut = nxt
+            if cut > lead:
+                del history[lead:cut]
+                del costs[lead:cut]
+                protected_from -= cut - lead
+
+        # ── 3. Still over — fold results inside the protected turns too ──────
+        # Deep-research turns can blow the budget on their own. The newest
+        # tool round (everything after the last assistant message) is kept
+        # intact since the model hasn't read it yet.
+        if total > target:
+            last_assistant = max(
+                (i for i, m in enumerate(history) if m.get('role') == 'assistant'),
+                default=-1,
+            )
+            total, _ = self._fold(history, costs, total, target, protected_from, last_assistant)
+
+        # Only the protected turns are left and nothing in them could go —
+        # leave the history (and the cached prefix) as it is
+        if total == before:
+            return False
+
+        set_history(session, history)
+        log.info(
+            "History compacted",
+            extra={'data': (
+                f"session={get_session_id(session)} tokens~{before}→{total} "
+                f"budget={budget} messages={len(history)}"
+            )},
+        )
+        return True
+
+    def _protected_start(self, history: list) -> int:
+        """Index of the first message in the newest keep_recent_turns user turns."""
+        keep = max(1, self.config.keep_recent_turns)
+        seen = 0
+        for i in range(len(history) - 1, -1, -1):
+            if history[i].get('role') == 'user':
+                seen += 1
+                if seen >= keep:
+                    return i
+        return 0
+
+    def _fold(self, history: list, costs: list, total: int, target: int, start: int, end: int) -> tuple[int, int]:
+        """
+        Fold tool results and drop system injections in history[start:end],
+        oldest first, until total <= target. Mutates history and costs.
+        Returns (new total, number of messages removed).
+        """
+        removed = 0
+        i = start
+        while i < end and total > target:
+            msg  = history[i]
+            role = msg.get('role')
+            if role == 'tool' and msg.get('content') != TOOL_RESULT_STUB:
+                folded      = dict(msg, content=TOOL_RESULT_STUB)
+                new_cost    = self.estimate_message(folded)
+                total      += new_cost - costs[i]
+                history[i]  = folded
+                costs[i]    = new_cost
+            elif role == 'system' and not is_summary(msg):
+                total -= costs[i]
+                del history[i]
+                del costs[i]
+                end     -= 1
+                removed += 1
+                continue
+            i += 1
+        return total, removed
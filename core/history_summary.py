@@ -0,0 +1,183 @@
+"""
+core/history_summary.py — Rolling summaries of the oldest turns in long text sessions.
+
+Telegram sessions live until SESSION_TTL of inactivity and web tabs stay
+open for hours, so their history keeps growing. HistoryBudgeter only steps
+in near the context limit, and then it throws turns away. HistorySummariser
+acts earlier and keeps their gist instead. Once the prompt passes
+trigger_fraction of num_ctx, the oldest summarise_turns user turns are
+condensed into one system message that starts with SUMMARY_HEADER. An
+earlier summary at the top of history is folded into the new one, so there
+is only ever one.
+
+Never on the critical path:
+  - The summary is written by a headless pass on a background thread after
+    the turn has been answered. It uses the memory tool's summary_model and
+    summary_num_ctx (config/memory.yaml) unless model / num_ctx are set
+    here. Headless requests run on llama-server's headless_slot and at
+    background priority in the LLM scheduler, so they never evict the live
+    conversation's KV cache or delay its turns.
+  - The finished summary waits in the session until the next turn starts
+    and is swapped in then, in one assignment, before the prompt is built.
+    The cached prefix therefore breaks once per compaction, at a turn
+    boundary, and not in the middle of a turn.
+  - The job records exactly which message objects it covered. If history
+    changed under it (reset, budget compaction), the summary is dropped and
+    a later turn tries again.
+
+Usage:
+    summariser = HistorySummariser(config.history_summary, core)
+    summariser.apply(session)                              # turn start
+    summariser.maybe_schedule(session, system_tokens, num_ctx)   # turn end
+
+    is_summary(msg)   # True for the summary system message
+"""
+
+import concurrent.futures
+
+from core.interface_mode import InterfaceMode
+from core.logger import get_logger
+from core.session_state import (
+    get_history, set_history, get_session_id, get_interface_mode,
+    KEY_SUMMARY_JOB,
+)
+
+log = get_logger('history_summary')
+
+SUMMARY_HEADER = "[SUMMARY OF EARLIER CONVERSATION]"
+
+# Per-message cap in the transcript handed to the summary model
+TRANSCRIPT_CHARS_PER_MESSAGE = 1500
+TOOL_RESULT_CHARS            = 300
+
+SUMMARY_PROMPT = (
+    "Below is the earlier part of a conversation between a user and an AI "
+    "assistant. Write a summary the assistant can rely on instead of the "
+    "transcript. Keep names, facts and preferences the user gave, decisions "
+    "made, anything the assistant promised or still has to do, and results "
+    "from tools that may matter later. Drop small talk. If the transcript "
+    "starts with an earlier summary, merge it in. Write plain prose in the "
+    "third person, at most {words} words. Reply with the summary only.\n\n"
+    "{transcript}"
+)
+
+
+def is_summary(msg: dict) -> bool:
+    """True if msg is the rolling summary system message."""
+    content = msg.get('content')
+    return msg.get('role') == 'system' and isinstance(content, str) and content.startswith(SUMMARY_HEADER)
+
+
+class HistorySummariser:
+    """
+    Schedules summaries between turns and swaps them in at the next turn.
+    One instance lives on CoreProcessor. Summaries are written one at a time.
+    """
+
+    def __init__(self, config, core):
+        self.config = config
+        self.core   = core
+        self._pool  = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='summarise')
+
+    # ── Turn boundary ─────────────────────────────────────────────────────────
+
+    def apply(self, session: dict) -> bool:
+        """Swap a finished summary into history. Returns True if history changed."""
+        job = session.get(KEY_SUMMARY_JOB)
+        if job is None or job['summary'] is None:
+            return False
+        session.pop(KEY_SUMMARY_JOB, None)
+
+        history = get_history(session)
+        covered = job['covered']
+        if len(history) < len(covered) or any(history[i] is not m for i, m in enumerate(covered)):
+            log.info("History changed under summary — dropped", extra={'data': get_session_id(session)})
+            return False
+
+        summary = {'role': 'system', 'content': f"{SUMMARY_HEADER}\n{job['summary']}"}
+        set_history(session, [summary] + history[len(covered):])
+        log.info("History summarised", extra={'data': (
+            f"session={get_session_id(session)} messages={len(covered)}→1 "
+            f"chars={sum(len(m.get('content') or '') for m in covered)}→{len(summary['content'])}"
+        )})
+        return True
+
+    def maybe_schedule(self, session: dict, system_tokens: int, num_ctx: int) -> bool:
+        """
+        Start a background summary if the session's prompt is over the
+        trigger and none is pending. Returns True if one was started.
+        """
+        if not self.config.enabled or session.get('_headless'):
+            return False
+        if get_interface_mode(session) != InterfaceMode.GENERAL or KEY_SUMMARY_JOB in session:
+            return False
+
+        history = get_history(session)
+        tokens  = system_tokens + self.core.history_budgeter.estimate(history)
+        if tokens < num_ctx * self.config.trigger_fraction:
+            return False
+
+        starts = [i for i, m in enumerate(history) if m.get('role') == 'user']
+        n      = min(self.config.summarise_turns, len(starts) - max(1, self.config.keep_recent_turns))
+        if n < 1:
+            return False
+
+        # Cut before the next turn's injections (time, memory hits), which
+        # sit just ahead of its user message and belong with it
+        cut = starts[n]
+        while cut > starts[n - 1] + 1 and history[cut - 1].get('role') == 'system':
+            cut -= 1
+
+        job = {'covered': history[:cut], 'summary': None}
+        session[KEY_SUMMARY_JOB] = job
+        self._pool.submit(self._summarise, session, job, tokens)
+        return True
+
+    # ── Background ────────────────────────────────────────────────────────────
+
+    def _summarise(self, session: dict, job: dict, tokens: int) -> None:
+        session_id = get_session_id(session)
+        memory_cfg = self.core.tool_loader.get_tool_config('memory')
+        prompt     = SUMMARY_PROMPT.format(
+            words      = self.config.max_words,
+            transcript = self._transcript(job['covered']),
+        )
+        log.info("Summarising history", extra={'data': (
+            f"session={session_id} messages={len(job['covered'])} prompt_tokens~{tokens}"
+        )})
+        try:
+            text = self.core.run_headless(
+                prompt,
+                tools   = [],
+                model   = self.config.model or memory_cfg.get('summary_model'),
+                num_ctx = self.config.num_ctx or memory_cfg.get('summary_num_ctx'),
+                raise_on_error = True,
+            ).strip()
+        except Exception as e:
+            text = ''
+            log.warning("History summary failed", extra={'data': f"session={session_id} error={e}"})
+
+        if text:
+            job['summary'] = text
+        elif session.get(KEY_SUMMARY_JOB) is job:
+            session.pop(KEY_SUMMARY_JOB, None)   # let a later turn try again
+
+    def _transcript(self, messages: list) -> str:
+        earlier, lines = '', []
+        for msg in messages:
+            role    = msg.get('role')
+            content = msg.get('content')
+            if not isinstance(content, str) or not content.strip():
+                continue
+            if is_summary(msg):
+                earlier = f"Earlier summary: {content[len(SUMMARY_HEADER):].strip()}\n"
+            elif role in ('user', 'assistant'):
+                lines.append(f"{role.capitalize()}: {content.strip()[:TRANSCRIPT_CHARS_PER_MESSAGE]}")
+            elif role == 'tool':
+                lines.append(f"[{msg.get('tool_name', 'tool')} result: {content[:TOOL_RESULT_CHARS]}]")
+            # other system messages are per-turn injections (time, memory hits) — skipped
+        transcript = '\n'.join(lines)
+        room       = max(0, self.config.max_transcript_chars - len(earlier))
+        if len(transcript) > room:
+            transcript = transcript[-room:]   # the oldest detail goes first, never the earlier summary
+        return earlier + transcript
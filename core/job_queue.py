@@ -0,0 +1,262 @@
+"""
+core/job_queue.py — Persistent queue for deferred session-end work.
+
+on_session_end handlers like memory's summary and fact extraction make
+headless LLM passes as soon as a session closes. On a memory-limited box
+those passes compete with whatever conversation is live, evicting its KV
+cache right when the next caller is speaking.
+
+Handlers whose yaml sets defer_session_end: true are not called at close.
+ToolLoader enqueues a JSON snapshot of the session here instead. The queue
+drains only once no interactive turn has run for idle_s seconds. It hands
+each handler up to batch_size sessions at once through its
+on_session_end_batch hook, or one at a time through on_session_end if the
+tool has no batch hook. Jobs survive restarts. A job that raises is retried
+on a later drain, up to max_attempts.
+
+The snapshot keeps what session-end handlers read: the session id,
+identity fields (speaker, endpoint_id, interface, ...), the interface mode
+and the text of each history message. Live objects (queues, events, agent
+mode) are dropped. Handlers see the snapshot with '_deferred': True.
+
+Usage:
+    jobs = SessionJobQueue(config.jobs, dispatch=fn, idle_seconds=core.idle_seconds)
+    jobs.start()
+
+    jobs.enqueue('memory', session)   # from ToolLoader.call_session_end_handlers
+    jobs.drain()                      # run everything now, regardless of idle
+
+File location: data/jobs/session_end.db
+"""
+
+import enum
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable
+
+from core.logger import get_logger
+from core.session_state import KEY_HISTORY, KEY_SESSION_ID
+
+log = get_logger('job_queue')
+
+
+DB_FILENAME = "session_end.db"
+
+
+# ── Session snapshots ─────────────────────────────────────────────────────────
+
+def snapshot_session(session: dict) -> dict:
+    """
+    Reduce a live session to plain JSON: scalar top-level fields, enums by
+    value, and the role/content of each history message with text content.
+    """
+    snapshot = {}
+    for key, value in session.items():
+        if key == KEY_HISTORY:
+            continue
+        if isinstance(value, enum.Enum):
+            value = value.value
+        if value is None or isinstance(value, (str, int, float, bool)):
+            snapshot[key] = value
+
+    snapshot[KEY_HISTORY] = [
+        {'role': msg.get('role', ''), 'content': msg['content']}
+        for msg in session.get(KEY_HISTORY) or []
+        if isinstance(msg.get('content'), str)
+    ]
+    return snapshot
+
+
+# ── Queue ─────────────────────────────────────────────────────────────────────
+
+class SessionJobQueue:
+    """
+    SQLite-backed queue of (handler, session snapshot) jobs.
+
+    Args:
+        config:       JobsConfig from settings.
+        dispatch:     callback(handler_name, sessions) that runs one batch.
+                      It must raise if the batch should be retried.
+        idle_seconds: callback() → seconds since the last interactive turn
+                      (0 while one is running).
+    """
+
+    def __init__(self, config, dispatch: Callable, idle_seconds: Callable):
+        self.config        = config
+        self._dispatch     = dispatch
+        self._idle_seconds = idle_seconds
+        self._lock         = threading.Lock()   # one writer / drainer at a time
+        self._thread       = None
+
+        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        data_dir     = os.path.join(project_root, 'data', 'jobs')
+        os.makedirs(data_dir, exist_ok=True)
+        self._path = os.path.join(data_dir, DB_FILENAME)
+
+        with self._lock:
+            conn = self._connect()
+            # Anything left 'running' was interrupted by a restart
+            recovered = conn.execute(
+                "UPDATE jobs SET status = 'pending' WHERE status = 'running'"
+            ).rowcount
+            conn.commit()
+            conn.close()
+        log.info("SessionJobQueue ready", extra={'data': (
+            f"pending={self.pending_count()} recovered={recovered} idle_s={config.idle_s}"
+        )})
+
+    # ── Public API ────────────────────────────────────────────────────────────
+
+    def enqueue(self, handler: str, session: dict) -> int:
+        """Persist a session snapshot for handler. Returns the job id."""
+        snapshot = snapshot_session(session)
+        with self._lock:
+            conn = self._connect()
+            job_id = conn.execute(
+                "INSERT INTO jobs (handler, session_id, payload, created_at) VALUES (?, ?, ?, ?)",
+                (handler, str(snapshot.get(KEY_SESSION_ID, '')), json.dumps(snapshot),
+                 datetime.now(timezone.utc).isoformat()),
+            ).lastrowid
+            conn.commit()
+            conn.close()
+        log.info("Session end work deferred", extra={'data': (
+            f"handler={handler} session={str(snapshot.get(KEY_SESSION_ID, ''))[:8]} job={job_id}"
+        )})
+        return job_id
+
+    def pending_count(self) -> int:
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'pending'").fetchone()[0]
+        finally:
+            conn.close()
+
+    def start(self) -> None:
+        """Start the background thread that drains the queue when idle."""
+        self._thread = threading.Thread(target=self._loop, daemon=True, name='session-jobs')
+        self._thread.start()
+
+    def drain(self, only_when_idle: bool = False) -> int:
+        """
+        Run pending jobs in batches until the queue is empty, or, with
+        only_when_idle, until an interactive turn starts. A batch already
+        handed to its handler always runs to completion. Returns the number
+        of jobs completed.
+        """
+        done = 0
+        while not (only_when_idle and not self._is_idle()):
+            claimed = self._claim()
+            if claimed is None:
+                break
+            handler, jobs = claimed
+            done += self._run_batch(handler, jobs)
+        return done
+
+    # ── Internals ─────────────────────────────────────────────────────────────
+
+    def _loop(self) -> None:
+        while True:
+            time.sleep(self.config.poll_s)
+            try:
+                if self._is_idle() and self.pending_count():
+                    done = self.drain(only_when_idle=True)
+                    if done:
+                        log.info("Deferred session work drained", extra={'data': (
+                            f"jobs={done} pending={self.pending_count()}"
+                        )})
+            except Exception as e:
+                log.error("Job queue error", extra={'data': str(e)})
+
+    def _is_idle(self) -> bool:
+        return self._idle_seconds() >= self.config.idle_s
+
+    def _claim(self) -> tuple[str, list] | None:
+        """
+        Mark the oldest pending job and up to batch_size - 1 more for the
+        same handler as running. Returns (handler, [(id, snapshot), ...]).
+        """
+        with self._lock:
+            conn = self._connect()
+            try:
+                head = conn.execute(
+                    "SELECT handler FROM jobs WHERE status = 'pending' ORDER BY id LIMIT 1"
+                ).fetchone()
+                if head is None:
+                    return None
+                handler = head['handler']
+                rows = conn.execute(
+                    "SELECT id, payload FROM jobs WHERE status = 'pending' AND handler = ? "
+                    "ORDER BY id LIMIT ?",
+                    (handler, max(1, self.config.batch_size)),
+                ).fetchall()
+                conn.executemany(
+                    "UPDATE jobs SET status = 'running', attempts = attempts + 1 WHERE id = ?",
+                    [(row['id'],) for row in rows],
+                )
+                conn.commit()
+            finally:
+                conn.close()
+
+        jobs = []
+        for row in rows:
+            session = json.loads(row['payload'])
+            session['_deferred'] = True
+            jobs.append((row['id'], session))
+        return handler, jobs
+
+    def _run_batch(self, handler: str, jobs: list) -> int:
+        ids = [job_id for job_id, _ in jobs]
+        t0  = time.perf_counter()
+        try:
+            self._dispatch(handler, [session for _, session in jobs])
+        except Exception as e:
+            log.error("Deferred session work failed", extra={'data': f"handler={handler} jobs={ids} error={e}"})
+            self._finish(ids, error=str(e))
+            return 0
+
+        self._finish(ids)
+        log.info("Deferred session batch done", extra={'data': (
+            f"handler={handler} sessions={len(ids)} s={time.perf_counter() - t0:.1f}"
+        )})
+        return len(ids)
+
+    def _finish(self, ids: list, error: str = None) -> None:
+        """Delete completed jobs, or put failed ones back (until max_attempts)."""
+        with self._lock:
+            conn = self._connect()
+            if error is None:
+                conn.executemany("DELETE FROM jobs WHERE id = ?", [(i,) for i in ids])
+            else:
+                conn.executemany(
+                    "UPDATE jobs SET last_error = ?, "
+                    "status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END "
+                    "WHERE id = ?",
+                    [(error[:500], self.config.max_attempts, i) for i in ids],
+                )
+            conn.commit()
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.row_factory = sqlite3.Row
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id          INTEGER PRIMARY KEY AUTOINCREMENT,
+                handler     TEXT NOT NULL,
+                session_id  TEXT NOT NULL,
+                payload     TEXT NOT NULL,
+                status      TEXT NOT NULL DEFAULT 'pending',
+                attempts    INTEGER NOT NULL DEFAULT 0,
+                created_at  TEXT NOT NULL,
+                last_error  TEXT
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_jobs_status
+                ON jobs(status, handler, id);
+        """)
+        return conn
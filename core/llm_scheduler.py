@@ -0,0 +1,172 @@
+"""
+core/llm_scheduler.py — Priority admission for LLM requests across sessions.
+
+Every session talks to the same local backend. Without coordination a
+memory summary from on_session_end, a Telegram message and a live phone
+call all compete equally, and a caller can end up waiting behind a
+background job. LLMScheduler puts an admission queue in front of the
+backend:
+
+  - Requests are admitted in priority order (VOICE, then TEXT, then
+    BACKGROUND), first come first served within a class.
+  - Foreground requests (VOICE/TEXT) are limited to max_concurrent at once.
+  - BACKGROUND requests are deferred while any voice turn is active — from
+    the moment the transcript is dispatched until the reply is done,
+    tool rounds included. They also need a free place under the limit.
+  - BACKGROUND requests never count against the foreground limit, so a
+    summary already streaming can't make a voice request wait.
+
+Usage:
+    scheduler = LLMScheduler(max_concurrent=2)
+
+    ticket = scheduler.acquire(Priority.TEXT, label=session_id)   # blocks until admitted
+    try:
+        ...stream the request...
+    finally:
+        scheduler.release(ticket)
+
+    scheduler.voice_turn_started()   # around a whole voice turn
+    scheduler.voice_turn_finished()
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from dataclasses import dataclass
+from enum import IntEnum
+
+from core.logger import get_logger
+
+log = get_logger('llm_scheduler')
+
+
+class Priority(IntEnum):
+    """Request class — lower value is admitted first."""
+    VOICE      = 0
+    TEXT       = 1
+    BACKGROUND = 2
+
+
+@dataclass
+class Ticket:
+    """An admitted (or waiting) request. Returned by acquire(), passed to release()."""
+    priority:  Priority
+    seq:       int
+    label:     str   = ''
+    queued_at: float = 0.0
+    admitted:  bool  = False
+
+
+class LLMScheduler:
+    """
+    Thread-safe priority admission gate. One instance per CoreProcessor,
+    sized for whichever backend is active.
+    """
+
+    def __init__(self, max_concurrent: int = 1):
+        self.max_concurrent = max(1, int(max_concurrent))
+
+        self._cond    = threading.Condition()
+        self._seq     = itertools.count()
+        self._waiting: list = []    # heap of (priority, seq, Ticket)
+
+        self._active_foreground = 0
+        self._active_background = 0
+        self._voice_turns       = 0
+
+        self.admitted = {p.name: 0 for p in Priority}
+        self.deferred = 0           # background admissions that had to wait for voice
+
+    # ── Admission ─────────────────────────────────────────────────────────────
+
+    def acquire(self, priority: Priority, label: str = '') -> Ticket:
+        """Block until a request of this priority may go to the backend."""
+        ticket = Ticket(priority=priority, seq=next(self._seq), label=label,
+                        queued_at=time.monotonic())
+        with self._cond:
+            heapq.heappush(self._waiting, (ticket.priority, ticket.seq, ticket))
+            waited_for_voice = False
+            while not self._can_admit(ticket):
+                if priority == Priority.BACKGROUND and self._voice_turns:
+                    waited_for_voice = True
+                self._cond.wait()
+            heapq.heappop(self._waiting)
+            ticket.admitted = True
+            if priority == Priority.BACKGROUND:
+                self._active_background += 1
+                if waited_for_voice:
+                    self.deferred += 1
+            else:
+                self._active_foreground += 1
+            self.admitted[priority.name] += 1
+            # The next ticket in line may be admissible too (e.g. a
+            # background request is at the head but blocked by voice)
+            self._cond.notify_all()
+
+        waited = time.monotonic() - ticket.queued_at
+        if waited > 0.05:
+            log.info("LLM request admitted after wait", extra={'data': (
+                f"priority={priority.name} label={label} waited={waited:.2f}s {self._summary()}"
+            )})
+        return ticket
+
+    def release(self, ticket: Ticket) -> None:
+        """Return a ticket's place once its request has finished streaming."""
+        if not ticket.admitted:
+            return
+        ticket.admitted = False
+        with self._cond:
+            if ticket.priority == Priority.BACKGROUND:
+                self._active_background -= 1
+            else:
+                self._active_foreground -= 1
+            self._cond.notify_all()
+
+    # ── Voice turns ───────────────────────────────────────────────────────────
+
+    def voice_turn_started(self) -> None:
+        """A voice turn is running — background work waits until it ends."""
+        with self._cond:
+            self._voice_turns += 1
+
+    def voice_turn_finished(self) -> None:
+        with self._cond:
+            self._voice_turns = max(0, self._voice_turns - 1)
+            self._cond.notify_all()
+
+    # ── Introspection ─────────────────────────────────────────────────────────
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                'max_concurrent':    self.max_concurrent,
+                'active_foreground': self._active_foreground,
+                'active_background': self._active_background,
+                'voice_turns':       self._voice_turns,
+                'waiting':           [(t.priority.name, t.label) for _, _, t in sorted(self._waiting)],
+                'admitted':          dict(self.admitted),
+                'deferred':          self.deferred,
+            }
+
+    # ── Internals ─────────────────────────────────────────────────────────────
+
+    def _can_admit(self, ticket: Ticket) -> bool:
+        """Caller holds the lock."""
+        if ticket.priority == Priority.BACKGROUND:
+            # Background goes only when nothing else is queued ahead of it,
+            # no voice turn is live and the backend has spare capacity.
+            if self._waiting[0][2] is not ticket or self._voice_turns:
+                return False
+            return self._active_foreground + self._active_background < self.max_concurrent
+
+        # Foreground: only higher-or-equal priority foreground requests queued
+        # ahead of us matter — a blocked background ticket never holds us up.
+        for priority, seq, other in self._waiting:
+            if other is not ticket and other.priority != Priority.BACKGROUND and (priority, seq) < (ticket.priority, ticket.seq):
+                return False
+        return self._active_foreground < self.max_concurrent
+
+    def _summary(self) -> str:
+        return (f"fg={self._active_foreground} bg={self._active_background} "
+                f"voice_turns={self._voice_turns} waiting={len(self._waiting)}")
@@ -0,0 +1,312 @@
+"""
+core/metrics.py — In-process metrics with a Prometheus text endpoint.
+
+Counters, gauges and histograms that the core and the interfaces update as
+they go, served at http://<host>:<port>/metrics in the Prometheus text
+exposition format (version 0.0.4). There are no dependencies beyond the
+standard library, and nothing is pushed anywhere. Point Prometheus (or
+curl) at the port.
+
+Recording is on the hot path: every VAD chunk, every LLM chunk, every tool
+call. So an update never takes a lock. Each labelled series keeps one small
+shard per thread that records into it, and only that thread ever writes
+to it. A scrape sums the shards. A shard is created, under a lock, the
+first time a thread touches a series, and never again after that. Values
+that already live somewhere else (sessions, pool queues, scheduler queues)
+are not recorded at all. They are read by callbacks when /metrics is
+scraped.
+
+Usage:
+    metrics = Metrics(config.metrics)       # CoreProcessor owns this
+    metrics.start()                         # serve /metrics if enabled
+
+    metrics.ttft.labels(backend='ollama').observe(0.42)
+    metrics.tool_seconds.labels(tool='weather', outcome='ok').observe(1.3)
+    metrics.vad_chunks.labels(interface='speaker').inc()
+    metrics.llm_in_flight.labels(backend='ollama').inc()   # ...dec() later
+
+    metrics.add_collector('supernova_sessions_active', "Open sessions",
+                          lambda: [({'interface': 'web'}, 3)])   # read at scrape time
+
+File location: none — all in memory.
+"""
+
+import http.server
+import math
+import threading
+
+from core.logger import get_logger
+
+log = get_logger('metrics')
+
+# Seconds. Covers fast local tools and TTFT through to slow web lookups.
+LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+RATE_BUCKETS    = (5, 10, 20, 30, 40, 60, 80, 120, 200)
+
+
+def _label_str(labels: dict) -> str:
+    if not labels:
+        return ''
+    parts = []
+    for k, v in labels.items():
+        v = str(v).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+        parts.append(f'{k}="{v}"')
+    return '{' + ','.join(parts) + '}'
+
+
+def _fmt(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+# ── Series ────────────────────────────────────────────────────────────────────
+
+class _Series:
+    """One labelled series. Writes go to the calling thread's shard."""
+
+    def __init__(self, width: int):
+        self._width  = width
+        self._local  = threading.local()
+        self._shards: list = []
+        self._lock   = threading.Lock()
+
+    def _shard(self) -> list:
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = [0.0] * self._width
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def _totals(self) -> list:
+        with self._lock:
+            shards = list(self._shards)
+        totals = [0.0] * self._width
+        for shard in shards:
+            for i, v in enumerate(shard):
+                totals[i] += v
+        return totals
+
+
+class _CounterSeries(_Series):
+    def __init__(self):
+        super().__init__(1)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._shard()[0] += amount
+
+    def value(self) -> float:
+        return self._totals()[0]
+
+
+class _GaugeSeries(_CounterSeries):
+    """Up/down gauge. inc() and dec() may come from different threads — the sum is right."""
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._shard()[0] -= amount
+
+
+class _HistogramSeries(_Series):
+    # shard layout: [count per bucket..., +Inf count, sum]
+    def __init__(self, buckets: tuple):
+        super().__init__(len(buckets) + 2)
+        self._buckets = buckets
+
+    def observe(self, value: float) -> None:
+        shard = self._shard()
+        for i, bound in enumerate(self._buckets):
+            if value <= bound:
+                shard[i] += 1
+                break
+        else:
+            shard[len(self._buckets)] += 1
+        shard[-1] += value
+
+
+# ── Metric families ───────────────────────────────────────────────────────────
+
+class _Family:
+    kind = ''
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = ()):
+        self.name       = name
+        self.help       = help_text
+        self.labelnames = tuple(labelnames)
+        self._children: dict = {}
+        self._lock      = threading.Lock()
+
+    def labels(self, **labels):
+        key   = tuple(str(labels.get(n, '')) for n in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.get(key)
+                if child is None:
+                    child = self._children[key] = self._new_series()
+        return child
+
+    def _items(self) -> list:
+        with self._lock:
+            return list(self._children.items())
+
+    def _new_series(self):
+        raise NotImplementedError
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, series in self._items():
+            labels = dict(zip(self.labelnames, key))
+            lines.extend(self._render_series(labels, series))
+        return lines
+
+    def _render_series(self, labels: dict, series) -> list:
+        return [f"{self.name}{_label_str(labels)} {_fmt(series.value())}"]
+
+
+class Counter(_Family):
+    kind = 'counter'
+
+    def _new_series(self):
+        return _CounterSeries()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+
+class Gauge(_Family):
+    kind = 'gauge'
+
+    def _new_series(self):
+        return _GaugeSeries()
+
+
+class Histogram(_Family):
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_series(self):
+        return _HistogramSeries(self.buckets)
+
+    def _render_series(self, labels: dict, series) -> list:
+        totals     = series._totals()
+        lines      = []
+        cumulative = 0.0
+        for bound, n in zip(self.buckets + (math.inf,), totals[:-1]):
+            cumulative += n
+            lines.append(f"{self.name}_bucket{_label_str({**labels, 'le': _fmt(bound)})} {_fmt(cumulative)}")
+        lines.append(f"{self.name}_sum{_label_str(labels)} {_fmt(totals[-1])}")
+        lines.append(f"{self.name}_count{_label_str(labels)} {_fmt(cumulative)}")
+        return lines
+
+
+# ── Registry + endpoint ───────────────────────────────────────────────────────
+
+class Metrics:
+    """
+    The process's metric families, plus scrape-time collectors for values
+    that are owned elsewhere. CoreProcessor creates one; interfaces reach it
+    as core_processor.metrics.
+    """
+
+    def __init__(self, config):
+        self.config      = config
+        self._families   = []
+        self._collectors = {}   # name -> (help, [fn]) — fn() yields (labels, value)
+        self._server     = None
+
+        self.llm_in_flight = self.gauge(
+            'supernova_llm_requests_in_flight', "LLM requests admitted and streaming", ('backend',))
+        self.llm_requests = self.counter(
+            'supernova_llm_requests_total', "LLM requests sent, by outcome", ('backend', 'outcome'))
+        self.ttft = self.histogram(
+            'supernova_llm_ttft_seconds', "Request sent to first streamed chunk", ('backend',))
+        self.tokens_per_s = self.histogram(
+            'supernova_llm_tokens_per_second', "Generation rate after the first chunk (chunks/s)",
+            ('backend',), buckets=RATE_BUCKETS)
+        self.tool_seconds = self.histogram(
+            'supernova_tool_call_seconds', "Tool execution time", ('tool', 'outcome'))
+        self.vad_chunks = self.counter(
+            'supernova_vad_chunks_total', "Audio chunks run through VAD", ('interface',))
+
+    # ── Definition ────────────────────────────────────────────────────────────
+
+    def counter(self, name: str, help_text: str, labelnames: tuple = ()) -> Counter:
+        return self._add(Counter(name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: tuple = ()) -> Gauge:
+        return self._add(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help_text, labelnames, buckets))
+
+    def add_collector(self, name: str, help_text: str, fn) -> None:
+        """
+        Gauge read at scrape time. fn() returns an iterable of (labels dict,
+        value). Several callers may add to the same name (one per inference
+        pool, say) — their series are rendered under one family.
+        """
+        self._collectors.setdefault(name, (help_text, []))[1].append(fn)
+
+    def _add(self, family):
+        self._families.append(family)
+        return family
+
+    # ── Exposition ────────────────────────────────────────────────────────────
+
+    def render(self) -> str:
+        lines = []
+        for family in self._families:
+            lines.extend(family.render())
+        for name, (help_text, fns) in list(self._collectors.items()):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            for fn in list(fns):
+                try:
+                    for labels, value in fn():
+                        lines.append(f"{name}{_label_str(labels)} {_fmt(value)}")
+                except Exception as e:
+                    log.warning("Metrics collector failed", extra={'data': f"{name}: {e}"})
+        return '\n'.join(lines) + '\n'
+
+    def start(self) -> None:
+        """Serve /metrics on a daemon thread, if enabled."""
+        if not self.config.enabled or self._server is not None:
+            return
+        metrics = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?', 1)[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        try:
+            self._server = http.server.ThreadingHTTPServer((self.config.host, self.config.port), Handler)
+        except OSError as e:
+            log.error("Metrics endpoint failed to start", extra={'data': f"{self.config.host}:{self.config.port} {e}"})
+            return
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True, name='metrics-http').start()
+        log.info("Metrics endpoint listening", extra={'data': f"http://{self.config.host}:{self.config.port}/metrics"})
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -0,0 +1,218 @@
+"""
+core/openai_messages.py — Incremental translation of history to OpenAI wire format.
+
+_messages_to_openai() used to re-walk the whole prompt on every LLM round.
+That meant folding system messages into user turns, rebuilding tool-call
+arrays and re-encoding every image as a data URL. A deep-research turn runs
+many rounds over one growing history, so the work was quadratic, and the
+images were re-encoded each time.
+
+Between rounds the prompt only grows, and history messages are never edited
+in place. HistoryBudgeter replaces a folded message with a new dict rather
+than mutating it. So the translation of a prompt prefix can be kept.
+MessageTranslation remembers, per session, the source messages it has
+already translated (by identity), the translated output, and a checkpoint
+of the fold state after each one. The next call reuses the longest prefix
+that is still the same objects and translates only what follows. The
+leading system message is the exception: it is compared by content, since
+it is rebuilt each turn (create_system_message hands back the same dict
+while nothing in it changed, but callers aren't required to). A new turn
+diverges where the previous turn's per-turn time message sat. Compaction
+diverges at the first replaced message. Either way the work starts from
+that point, not from the top.
+
+Image data URLs are cached by a hash of the image content (image_url), so
+a photo that has to be re-translated after a divergence still isn't
+re-encoded.
+
+Usage:
+    translation = MessageTranslation()          # one per session
+    oai = translation.translate(messages)       # fresh list every call
+
+    oai = translate_messages(messages)          # one-off, no cache
+"""
+
+import base64
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+# Encoded images kept by content hash — each entry is about 4/3 the image size
+IMAGE_URL_CACHE_SIZE = 16
+
+_image_urls: OrderedDict = OrderedDict()
+_image_lock = threading.Lock()
+
+
+def image_url(img) -> str:
+    """Normalise any image input shape to a data-URI string, cached by content."""
+    if isinstance(img, bytearray):
+        img = bytes(img)
+    raw = img if isinstance(img, bytes) else str(img).encode('utf-8', 'surrogatepass')
+    key = hashlib.blake2b(raw, digest_size=16).digest()
+
+    with _image_lock:
+        url = _image_urls.get(key)
+        if url is not None:
+            _image_urls.move_to_end(key)
+            return url
+
+    url = _encode_image(img)
+    with _image_lock:
+        _image_urls[key] = url
+        while len(_image_urls) > IMAGE_URL_CACHE_SIZE:
+            _image_urls.popitem(last=False)
+    return url
+
+
+def _encode_image(img) -> str:
+    if isinstance(img, bytes):
+        try:
+            img = img.decode('ascii')                     # base64-as-bytes
+        except UnicodeDecodeError:
+            img = base64.b64encode(img).decode('ascii')   # raw bytes
+    img = ''.join(str(img).split())
+    return img if img.startswith('data:') else f"data:image/jpeg;base64,{img}"
+
+
+class MessageTranslation:
+    """
+    Cached translation of one session's prompt. translate() is safe to call
+    from several threads (a speculative prefill can overlap the turn); calls
+    are serialised.
+    """
+
+    def __init__(self):
+        self._lock    = threading.Lock()
+        self._source: list = []   # (message, its content object) per translated input
+        self._oai:    list = []   # translated output so far
+        # After source[k]: (len(oai), leading_system_seen, pending_system tuple)
+        self._checkpoints: list = [(0, False, ())]
+
+    def translate(self, messages: list) -> list:
+        with self._lock:
+            keep = self._common_prefix(messages)
+            oai_len, leading_seen, pending = self._checkpoints[keep]
+            del self._source[keep:]
+            del self._checkpoints[keep + 1:]
+            del self._oai[oai_len:]
+
+            pending = list(pending)
+            for i in range(keep, len(messages)):
+                msg = messages[i]
+                leading_seen = _translate_one(msg, i, self._oai, pending, leading_seen)
+                self._source.append((msg, msg.get('content')))
+                self._checkpoints.append((len(self._oai), leading_seen, tuple(pending)))
+
+            return _finish(self._oai, pending)
+
+    def _common_prefix(self, messages: list) -> int:
+        """
+        Number of leading messages that are the very objects translated last
+        time (the leading system message only needs the same content).
+        """
+        n = min(len(messages), len(self._source))
+        for i in range(n):
+            msg, content = self._source[i]
+            if i == 0 and _same_system(messages[0], msg, content):
+                self._source[0] = (messages[0], messages[0].get('content'))
+                continue
+            # The content check catches the odd caller that edits a dict in place
+            if messages[i] is not msg or msg.get('content') is not content:
+                return i
+        return n
+
+
+def _same_system(new: dict, old: dict, old_content) -> bool:
+    """True if new is a system message with the same text the cached one was translated from."""
+    return (new.get('role') == 'system' and old.get('role') == 'system'
+            and isinstance(old_content, str) and new.get('content') == old_content)
+
+
+def translate_messages(messages: list) -> list:
+    """Translate without a cache."""
+    oai, pending, leading_seen = [], [], False
+    for i, msg in enumerate(messages):
+        leading_seen = _translate_one(msg, i, oai, pending, leading_seen)
+    return _finish(oai, pending)
+
+
+# ── Translation ───────────────────────────────────────────────────────────────
+
+def _translate_one(msg: dict, i: int, oai: list, pending_system: list, leading_system_seen: bool) -> bool:
+    """
+    Append msg's translation to oai. System messages after the leading one
+    are held in pending_system and folded into the next user message.
+    Returns the updated leading_system_seen.
+    """
+    role = msg.get('role')
+
+    if role == 'system':
+        content = msg.get('content', '')
+        if not leading_system_seen:
+            oai.append({'role': 'system', 'content': content})
+            return True
+        if content:
+            pending_system.append(content)
+        return leading_system_seen
+
+    if role == 'tool':
+        oai.append({
+            'role':         'tool',
+            'tool_call_id': msg.get('tool_call_id') or msg.get('tool_name', 'unknown'),
+            'content':      msg.get('content', ''),
+        })
+        return leading_system_seen
+
+    if role == 'assistant' and msg.get('tool_calls'):
+        oai.append({
+            'role':       'assistant',
+            'content':    msg.get('content') or None,
+            'tool_calls': [
+                {
+                    'id':   getattr(tc, 'id', None) or f"call_{i}_{j}",
+                    'type': 'function',
+                    'function': {
+                        'name':      tc.function.name,
+                        'arguments': json.dumps(tc.function.arguments),
+                    },
+                }
+                for j, tc in enumerate(msg['tool_calls'])
+            ],
+        })
+        return leading_system_seen
+
+    content = msg.get('content', '')
+    if role == 'user' and pending_system:
+        injected = '\n\n'.join(f"[context]\n{c}\n[/context]" for c in pending_system)
+        content = f"{injected}\n\n{content}" if content else injected
+        pending_system.clear()
+
+    msg_images = msg.get('images')
+    if msg_images:
+        blocks = ([{'type': 'text', 'text': content}] if content else [])
+        blocks += [{'type': 'image_url', 'image_url': {'url': image_url(im)}}
+                   for im in msg_images]
+        oai.append({'role': role, 'content': blocks})
+    else:
+        oai.append({'role': role, 'content': content})
+    return leading_system_seen
+
+
+def _finish(oai: list, pending_system: list) -> list:
+    """
+    Copy of oai for the caller, with any trailing system messages that had
+    no user message to fold into merged into the leading system message.
+    """
+    out = list(oai)
+    # Shouldn't normally happen given how process_input builds history
+    # (injections are always immediately followed by a new user message),
+    # but don't silently drop anything if it does.
+    if pending_system:
+        extra = '\n\n'.join(pending_system)
+        if out and out[0]['role'] == 'system':
+            out[0] = dict(out[0], content=out[0]['content'] + '\n\n' + extra)
+        else:
+            out.insert(0, {'role': 'system', 'content': extra})
+    return out
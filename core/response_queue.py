@@ -0,0 +1,63 @@
+"""
+core/response_queue.py — Session response queue that asyncio can await.
+
+process_input() runs on a worker thread and pushes token chunks onto the
+session's response queue. Async interfaces used to drain it with
+asyncio.to_thread(q.get, True, 0.25): one thread hop per token plus up to
+250ms of polling jitter when the queue was empty.
+
+ResponseQueue is a plain queue.Queue for every existing producer and
+synchronous consumer (tools, immediate-send routing, cancel flushes). In
+addition, each put() wakes an asyncio.Event on the consumer's loop through
+call_soon_threadsafe, so get_async() sleeps until a chunk actually arrives.
+
+Usage:
+    q = ResponseQueue()
+    q.put("Hello")              # from any thread, as before
+    chunk = await q.get_async() # from the event loop — no thread, no polling
+"""
+
+import asyncio
+import queue
+
+
+class ResponseQueue(queue.Queue):
+    """
+    queue.Queue with a non-blocking async get.
+
+    Meant for one async consumer at a time, which is how every interface
+    uses its session queue. Cancelling get_async() never loses a chunk:
+    items are only removed with get_nowait(), which never suspends.
+    """
+
+    def __init__(self, maxsize: int = 0):
+        super().__init__(maxsize)
+        self._loop:  asyncio.AbstractEventLoop | None = None
+        self._event: asyncio.Event | None             = None
+
+    def _put(self, item) -> None:
+        # Runs with self.mutex held, so _loop / _event can't be swapped
+        # out from under us by get_async() binding a new loop.
+        super()._put(item)
+        if self._loop is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._event.set)
+            except RuntimeError:
+                # Consumer's loop has been closed — nothing to wake.
+                self._loop, self._event = None, None
+
+    async def get_async(self):
+        """Remove and return the next item, waiting without blocking the loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            with self.mutex:
+                self._loop, self._event = loop, asyncio.Event()
+
+        while True:
+            # Clear before checking: a put() landing after the check sets
+            # the event again, so the wait below can't miss it.
+            self._event.clear()
+            try:
+                return self.get_nowait()
+            except queue.Empty:
+                await self._event.wait()
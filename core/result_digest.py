@@ -0,0 +1,216 @@
+"""
+core/result_digest.py — Compact digests of tool results the model has answered from.
+
+Tool results are appended to history verbatim. One open_website chunk is
+4000 characters, and search results and Home Assistant state dumps are not
+much smaller. Every later round and every later turn sends them again,
+although the model has already read them and answered. So the prompt grows
+with every page fetched, long before HistoryBudgeter has to step in.
+
+At the end of each turn, ResultDigester replaces every tool result that is
+over max_chars, and that has an assistant message after it, with a short
+digest. The full payload is kept in the session under a short id (r1,
+r2, ...). The digest names that id, and get_tool_result
+(tools/get_tool_result.py) returns the full payload if the model needs it
+again.
+
+Digests:
+  - A tool can supply its own by exporting digest_result(core, tool_config,
+    result) -> dict | str | None. open_website keeps the url, title and
+    summary, for example. Returning None falls back to the default.
+  - The default keeps the result's shape. Short fields are kept, long
+    strings are cut to digest_chars, big lists and dicts are replaced by
+    their length, and 'instructions' is dropped because it was meant for
+    the answer that has already been given.
+  - digest_max_chars in a tool's yaml overrides max_chars for that tool.
+    0 means its results are never digested.
+
+KV cache: only the turn that just finished is rewritten. Earlier turns
+were digested when they ended. The next turn's prompt therefore diverges
+from the cached one at the first digested result of the previous turn,
+which is close to the end of the prompt anyway. Rounds within a turn are
+left alone, because rewriting them would re-prefill the rest of the turn
+on every round. Messages are replaced rather than edited in place, as
+HistoryBudgeter does.
+
+Usage:
+    digester = ResultDigester(config.tool_results, tool_loader)
+    digester.compact(session, core)             # end of turn
+    entry = digester.lookup(session, 'r3')      # {'tool': ..., 'content': ...} or None
+"""
+
+import json
+from collections import OrderedDict
+
+from core.logger import get_logger
+from core.session_state import get_history, set_history, get_session_id, KEY_TOOL_RESULTS
+
+log = get_logger('result_digest')
+
+# The retrieval tool the digests point at (tools/get_tool_result.py)
+RETRIEVE_TOOL = 'get_tool_result'
+
+DIGEST_NOTE = ("Shortened after you answered from it. Call get_tool_result with "
+               "this result_id if you need the full result again.")
+DIGEST_NOTE_NO_RETRIEVE = ("Shortened after you answered from it. Call the "
+                           "original tool again if you need the full result.")
+
+
+class ResultDigester:
+    """
+    Replaces answered tool results with digests and keeps the originals.
+    One instance lives on CoreProcessor. All state is in the session.
+    """
+
+    def __init__(self, config, tool_loader):
+        self.config      = config
+        self.tool_loader = tool_loader
+        if config.enabled and tool_loader.get_executor(RETRIEVE_TOOL) is None:
+            log.warning("Retrieval tool not loaded — digests can't be fetched back",
+                        extra={'data': f"{RETRIEVE_TOOL} (tools/{RETRIEVE_TOOL}.py)"})
+
+    # ── Public ────────────────────────────────────────────────────────────────
+
+    def compact(self, session: dict, core=None) -> bool:
+        """
+        Digest the large tool results of the turn that just finished — from
+        its user message up to the last assistant message. Earlier turns
+        were done when they ended. Returns True if history was changed.
+        """
+        if not self.config.enabled:
+            return False
+        history = get_history(session)
+        last_assistant = max(
+            (i for i, m in enumerate(history) if m.get('role') == 'assistant'),
+            default=-1,
+        )
+        if last_assistant < 0:
+            return False
+        turn_start = max(
+            (i for i in range(last_assistant) if history[i].get('role') == 'user'),
+            default=0,
+        )
+
+        retrievable = self.tool_loader.get_executor(RETRIEVE_TOOL) is not None
+        changed     = None
+        before = after = 0
+        for i in range(turn_start, last_assistant):
+            msg = history[i]
+            if msg.get('role') != 'tool':
+                continue
+            content = msg.get('content') or ''
+            limit   = self._limit(msg.get('tool_name'))
+            if not limit or len(content) <= limit:
+                continue
+
+            digested = self._digest(session, msg, content, retrievable, core)
+            if digested is None:
+                continue
+            if changed is None:
+                changed = list(history)
+            changed[i] = digested
+            before    += len(content)
+            after     += len(digested['content'])
+
+        if changed is None:
+            return False
+        set_history(session, changed)
+        log.info("Tool results digested", extra={'data': (
+            f"session={get_session_id(session)} chars={before}→{after}"
+        )})
+        return True
+
+    def lookup(self, session: dict, result_id) -> dict | None:
+        """The stored original for result_id: {'tool': name, 'content': str}, or None."""
+        store = session.get(KEY_TOOL_RESULTS)
+        if not store or not isinstance(result_id, str):
+            return None
+        return store['items'].get(result_id)
+
+    # ── Internals ─────────────────────────────────────────────────────────────
+
+    def _limit(self, tool_name: str) -> int:
+        return self.tool_loader.digest_max_chars(tool_name, self.config.max_chars)
+
+    def _digest(self, session: dict, msg: dict, content: str, retrievable: bool, core) -> dict | None:
+        """The replacement message for msg, or None to leave it alone."""
+        payload   = _parse(content)
+        tool_name = msg.get('tool_name') or ''
+
+        # A result fetched back with get_tool_result is digested as the
+        # original, under the id it already has. A new result is only
+        # stored once its digest is known to be shorter.
+        original = self.lookup(session, payload.get('result_id')) if isinstance(payload, dict) else None
+        if original is not None:
+            result_id = payload['result_id']
+            tool_name = original['tool']
+            payload   = _parse(original['content'])
+        else:
+            result_id = self._next_id(session)
+
+        digest = self.tool_loader.digest_tool_result(core, tool_name, payload)
+        if digest is None:
+            digest = self._default_digest(payload)
+
+        body = json.dumps({
+            'result_id': result_id,
+            'digest':    digest,
+            'note':      DIGEST_NOTE if retrievable else DIGEST_NOTE_NO_RETRIEVE,
+        }, ensure_ascii=False)
+        if len(body) >= len(content):
+            return None
+        if original is None:
+            self._store(session, tool_name, content)
+        return dict(msg, content=body)
+
+    def _default_digest(self, payload):
+        limit = self.config.digest_chars
+        if isinstance(payload, str):
+            return _cut(payload, limit)
+        if not isinstance(payload, dict):
+            return _cut(json.dumps(payload, ensure_ascii=False), limit)
+
+        out = {}
+        for key, value in payload.items():
+            if key in ('instructions', 'result_id'):
+                continue
+            if isinstance(value, str):
+                out[key] = _cut(value, limit)
+            elif isinstance(value, (list, dict)):
+                if len(json.dumps(value, ensure_ascii=False)) <= limit:
+                    out[key] = value
+                else:
+                    out[key] = f"[{len(value)} {'items' if isinstance(value, list) else 'fields'} omitted]"
+            else:
+                out[key] = value
+        return out
+
+    def _next_id(self, session: dict) -> str:
+        """The id _store() will give the next result."""
+        store = session.get(KEY_TOOL_RESULTS)
+        return f"r{store['next'] if store else 1}"
+
+    def _store(self, session: dict, tool_name: str, content: str) -> str:
+        """Keep content under a new id, evicting the oldest past keep. Returns the id."""
+        store = session.get(KEY_TOOL_RESULTS)
+        if store is None:
+            store = session[KEY_TOOL_RESULTS] = {'next': 1, 'items': OrderedDict()}
+        result_id = f"r{store['next']}"
+        store['next'] += 1
+        store['items'][result_id] = {'tool': tool_name, 'content': content}
+        while len(store['items']) > max(1, self.config.keep):
+            store['items'].popitem(last=False)
+        return result_id
+
+
+def _parse(content: str):
+    try:
+        return json.loads(content)
+    except (TypeError, ValueError):
+        return content
+
+
+def _cut(text: str, limit: int) -> str:
+    if len(text) <= limit:
+        return text
+    return text[:limit].rstrip() + f"… [{len(text) - limit} more chars]"
@@ -67,6 +67,12 @@ KEY_ENDPOINT_ID      = 'endpoint_id'
 KEY_IMMEDIATE_SEND   = 'immediate_send'
 KEY_IMMEDIATE_ONLY   = 'immediate_send_only'
 KEY_SESSION_ID        = 'session_id'
+KEY_TRACE            = '_trace'           # core.tracing.Trace for the turn in flight, or absent
+KEY_OAI_MESSAGES     = '_oai_messages'    # core.openai_messages.MessageTranslation (llama-server)
+KEY_ROUTED_TOOLS     = '_routed_tools'    # core.tool_router sticky selection, or absent
+KEY_TOOL_RESULTS     = '_tool_results'    # core.result_digest originals of digested tool results
+KEY_SUMMARY_JOB      = '_summary_job'     # core.history_summary job pending or ready to swap in
+KEY_LLM_ERROR        = '_llm_error'       # last backend error shown to the user (see run_headless)
 # Queue marker: everything accumulated before this point was already
 # delivered via immediate_send — the consumer should discard it.
 DISCARD_ACCUMULATED = "\x00__DISCARD_ACCUMULATED__"
@@ -145,8 +151,10 @@ def append_history(session: dict, message: dict) -> None:
 
 
 def clear_history(session: dict) -> None:
-    """Wipe the conversation history."""
+    """Wipe the conversation history (and the tool results it referred to)."""
     session[KEY_HISTORY] = []
+    session.pop(KEY_TOOL_RESULTS, None)
+    session.pop(KEY_SUMMARY_JOB, None)
 
 
 # ── Identity ──────────────────────────────────────────────────────────────────
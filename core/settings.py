@@ -21,6 +21,13 @@ class LlamaServerConfig:
     default_slot:  int  = 0
     headless_slot: int  = 2
     slot_map:      dict = field(default_factory=lambda: {"general": 0})
+    dynamic_slots: bool = False   # lease slots per session (LRU) instead of slot_map
+    slot_pool:     list = field(default_factory=lambda: [0, 1])   # slots leased to live sessions
+    persist_slots: bool = False   # save/restore slot KV caches to disk (needs llama-server --slot-save-path)
+    prewarm_slots: bool = False   # prefill the default system prompt into each slot at startup
+    slot_save_idle_s:     float = 30.0   # save a session's slot once it has been quiet this long
+    slot_request_timeout: float = 30.0   # seconds, for slot saves (background)
+    slot_restore_timeout: float = 2.0    # seconds — a restore delays the turn's first token
 
 @dataclass
 class ServerConfig:
@@ -70,6 +77,26 @@ class AsteriskConfig:
 class VoiceConfig:
     model_path: str  = "./libs/voices/voice.onnx"
     use_cuda:   bool = False
+    speculative_prefill: bool = True   # prefill history into the LLM at voice onset, before ASR finishes
+    incremental_asr:     bool = True   # transcribe at pauses while the user speaks; only the tail after speech
+    asr_commit_gap_s:    float = 0.3   # pause long enough to commit the audio before it
+    asr_min_segment_s:   float = 1.0   # shorter uncommitted stretches wait for the end-of-utterance decode
+    tts_lookahead:       int   = 2     # sentences synthesised ahead of the one playing
+    vad_batching:        bool = True   # one batched Silero run per tick for all streams, off the event loop
+    vad_max_batch:       int   = 32
+
+
+@dataclass
+class TTSCacheConfig:
+    """Synthesised-phrase audio cache (interfaces/tts_cache.py)."""
+    enabled:        bool = True
+    max_chars:      int  = 60      # longer sentences are never cached
+    memory_entries: int  = 256
+    disk_entries:   int  = 2000    # oldest files dropped beyond this
+    dir:            str  = "data/tts_cache"   # relative to the project root
+    prewarm:        list = field(default_factory=lambda: [
+        "Hello.", "Just a moment", "I'm here", "Done.", "Timer set.", "Okay.",
+    ])
 
 
 @dataclass
@@ -85,16 +112,116 @@ class DebugConfig:
     log_prompts:     bool = False
     log_prompts_dir: str  = "./debug_prompts"
 
+@dataclass
+class HistoryConfig:
+    """Token budget for conversation history sent each turn."""
+    enabled:           bool  = True
+    budget_fraction:   float = 0.75    # compact once the prompt passes this share of num_ctx
+    target_fraction:   float = 0.5     # ...and trim it down to this share in one step
+    keep_recent_turns: int   = 3       # newest user turns are never compacted
+    chars_per_token:   float = 3.5     # token estimate — lower for denser tokenizers
+    reserve_tokens:    int   = 2048    # headroom for tool schemas and the reply
+
+@dataclass
+class HistorySummaryConfig:
+    """Rolling summary of the oldest turns in long text sessions (core/history_summary.py)."""
+    enabled:              bool  = True
+    trigger_fraction:     float = 0.4     # summarise once the prompt passes this share of num_ctx
+    summarise_turns:      int   = 8       # oldest user turns folded into the summary per pass
+    keep_recent_turns:    int   = 4       # newest user turns are never summarised
+    max_words:            int   = 200
+    max_transcript_chars: int   = 16000   # transcript handed to the summary model
+    model:                str   = ""      # "" = summary_model from config/memory.yaml
+    num_ctx:              int   = 0       # 0 = summary_num_ctx from config/memory.yaml
+
+@dataclass
+class ToolsConfig:
+    """Execution of tool calls requested in one model round."""
+    parallel_workers: int   = 4       # shared pool for tools marked parallel_safe in their yaml
+    deadline_s:       float = 30.0    # per turn: total wait on parallel calls before the rest are abandoned
+
+@dataclass
+class ToolResultsConfig:
+    """Digests of tool results the model has already answered from (core/result_digest.py)."""
+    enabled:      bool = True
+    max_chars:    int  = 1500    # results longer than this are digested at the end of the turn
+    digest_chars: int  = 300     # long string fields in the default digest are cut to this
+    keep:         int  = 32      # originals kept per session for get_tool_result, oldest dropped
+
+@dataclass
+class ToolRouterConfig:
+    """Per-turn tool subset ranked by embedding similarity (core/tool_router.py)."""
+    enabled:          bool  = False
+    embedder:         str   = "chromadb"   # chromadb (local, as memory uses) | ollama | openai
+    host:             str   = ""           # embeddings server for ollama / openai
+    model:            str   = ""           # embedding model on that server
+    top_k:            int   = 6            # best-matching tools added per turn
+    min_score:        float = 0.0          # cosine similarity a pick must reach
+    context_messages: int   = 2            # earlier user/assistant messages added to the query
+    max_tools:        int   = 14           # sticky set is rebuilt from scratch past this size
+    timeout_s:        float = 2.0
+
+@dataclass
+class SchedulerConfig:
+    """Priority admission for LLM requests — voice, then text, then background."""
+    enabled:        bool = True
+    max_concurrent: dict = field(default_factory=lambda: {"ollama": 1, "llama_server": 2})   # foreground requests at once, per backend
+
+@dataclass
+class BackendsConfig:
+    """Extra LLM endpoints with health checks and failover (core/backend_pool.py)."""
+    enabled:          bool  = False
+    primary_serves:   list  = field(default_factory=lambda: ["voice", "text", "background"])
+    endpoints:        list  = field(default_factory=list)   # {name, kind, host, model, serves, fallback, max_concurrent, num_ctx}
+    probe_interval_s: float = 10.0
+    probe_timeout_s:  float = 2.0
+    latency_alpha:    float = 0.3    # weight of the newest TTFT in the moving average
+
+@dataclass
+class JobsConfig:
+    """Deferred session-end work (tools with defer_session_end) — run once the system is idle."""
+    enabled:      bool  = True
+    idle_s:       float = 300.0   # no interactive turn for this long before draining
+    poll_s:       float = 30.0    # how often the drain thread checks
+    batch_size:   int   = 4       # sessions handed to one on_session_end_batch call
+    max_attempts: int   = 3       # a job that keeps failing is parked as 'failed'
+
+@dataclass
+class TracingConfig:
+    """Per-turn latency spans written to a rotating JSONL file (scripts/trace_summary.py)."""
+    enabled:      bool = True
+    path:         str  = "data/traces/traces.jsonl"   # relative to the project root
+    max_bytes:    int  = 5_000_000
+    backup_count: int  = 3
+
+@dataclass
+class MetricsConfig:
+    """Prometheus text endpoint for the in-process metrics (core/metrics.py)."""
+    enabled: bool = True
+    host:    str  = "127.0.0.1"   # loopback only by default — no auth on this port
+    port:    int  = 9464
+
 @dataclass
 class AppConfig:
     ollama:     OllamaConfig
     server:     ServerConfig
     interfaces: InterfacesConfig
     voice:      VoiceConfig    = field(default_factory=VoiceConfig)
+    tts_cache:  TTSCacheConfig = field(default_factory=TTSCacheConfig)
     asterisk:   AsteriskConfig = field(default_factory=AsteriskConfig)
     telegram:   TelegramConfig = field(default_factory=TelegramConfig)
     debug:      DebugConfig    = field(default_factory=DebugConfig)
     speaker_id: SpeakerConfig  = field(default_factory=SpeakerConfig)
+    history:    HistoryConfig  = field(default_factory=HistoryConfig)
+    history_summary: HistorySummaryConfig = field(default_factory=HistorySummaryConfig)
+    tools:      ToolsConfig    = field(default_factory=ToolsConfig)
+    tool_results: ToolResultsConfig = field(default_factory=ToolResultsConfig)
+    tool_router: ToolRouterConfig = field(default_factory=ToolRouterConfig)
+    scheduler:  SchedulerConfig = field(default_factory=SchedulerConfig)
+    backends:   BackendsConfig = field(default_factory=BackendsConfig)
+    jobs:       JobsConfig     = field(default_factory=JobsConfig)
+    tracing:    TracingConfig  = field(default_factory=TracingConfig)
+    metrics:    MetricsConfig  = field(default_factory=MetricsConfig)
     backend:      str                        = "ollama"
     llama_server: Optional[LlamaServerConfig] = None
 
@@ -122,7 +249,7 @@ def _dataclass_from_dict(cls, raw: dict):
 def load_config(path: str = None) -> AppConfig:
     """
     Load configuration from:
-      core_config.yaml          — ollama, server, interfaces, voice, debug, speaker_id
+      core_config.yaml          — ollama, server, interfaces, voice, tts_cache, debug, speaker_id, history, history_summary, tools, tool_results, tool_router, scheduler, backends, jobs, tracing, metrics
       asterisk_interface.yaml   — asterisk settings + endpoints
       telegram_interface.yaml   — telegram settings + endpoints
 
@@ -180,12 +307,45 @@ def load_config(path: str = None) -> AppConfig:
     # ── Voice ─────────────────────────────────────────────────────────────────
     voice = _dataclass_from_dict(VoiceConfig, raw.get("voice") or {})
 
+    # ── TTS phrase cache ──────────────────────────────────────────────────────
+    tts_cache = _dataclass_from_dict(TTSCacheConfig, raw.get("tts_cache") or {})
+
     # ── Debug ─────────────────────────────────────────────────────────────────
     debug = _dataclass_from_dict(DebugConfig, raw.get("debug") or {})
 
     # ── Speaker ID ────────────────────────────────────────────────────────────
     speaker_id = _dataclass_from_dict(SpeakerConfig, raw.get("speaker_id") or {})
 
+    # ── History budget ────────────────────────────────────────────────────────
+    history = _dataclass_from_dict(HistoryConfig, raw.get("history") or {})
+
+    # ── Rolling history summary ───────────────────────────────────────────────
+    history_summary = _dataclass_from_dict(HistorySummaryConfig, raw.get("history_summary") or {})
+
+    # ── Tool execution ────────────────────────────────────────────────────────
+    tools = _dataclass_from_dict(ToolsConfig, raw.get("tools") or {})
+
+    # ── Tool result digests ───────────────────────────────────────────────────
+    tool_results = _dataclass_from_dict(ToolResultsConfig, raw.get("tool_results") or {})
+
+    # ── Tool router ───────────────────────────────────────────────────────────
+    tool_router = _dataclass_from_dict(ToolRouterConfig, raw.get("tool_router") or {})
+
+    # ── LLM scheduler ─────────────────────────────────────────────────────────
+    scheduler = _dataclass_from_dict(SchedulerConfig, raw.get("scheduler") or {})
+
+    # ── Backend pool ──────────────────────────────────────────────────────────
+    backends = _dataclass_from_dict(BackendsConfig, raw.get("backends") or {})
+
+    # ── Deferred session-end jobs ─────────────────────────────────────────────
+    jobs = _dataclass_from_dict(JobsConfig, raw.get("jobs") or {})
+
+    # ── Tracing ───────────────────────────────────────────────────────────────
+    tracing = _dataclass_from_dict(TracingConfig, raw.get("tracing") or {})
+
+    # ── Metrics ───────────────────────────────────────────────────────────────
+    metrics = _dataclass_from_dict(MetricsConfig, raw.get("metrics") or {})
+
     # ── Interfaces ────────────────────────────────────────────────────────────
     interfaces_raw = dict(raw.get("interfaces") or {})
     # Rename voice_remote → speaker in yaml for backwards compat
@@ -217,10 +377,21 @@ def load_config(path: str = None) -> AppConfig:
         server       = ServerConfig(**raw["server"]),
         interfaces   = interfaces,
         voice        = voice,
+        tts_cache    = tts_cache,
         asterisk     = asterisk,
         telegram     = telegram,
         debug        = debug,
         speaker_id   = speaker_id,
+        history      = history,
+        history_summary = history_summary,
+        tools        = tools,
+        tool_results = tool_results,
+        tool_router  = tool_router,
+        scheduler    = scheduler,
+        backends     = backends,
+        jobs         = jobs,
+        tracing      = tracing,
+        metrics      = metrics,
         backend      = backend,
         llama_server = llama_server,
     )
\ No newline at end of file
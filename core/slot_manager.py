@@ -0,0 +1,186 @@
+"""
+core/slot_manager.py — Per-session llama-server slot leasing.
+
+llama-server keeps one KV cache per slot (--parallel N). A static
+interface → slot map puts every concurrent phone/speaker session on the
+same slot, so they thrash each other's cache. SlotManager leases slots per
+session instead:
+
+  - A session keeps its slot between turns, so its cached prefix is still
+    there next turn (a hit).
+  - A session with no slot takes a free one, or evicts the least recently
+    used session that isn't mid-request (a miss).
+  - A session is pinned while a request is in flight — an active stream's
+    slot is never handed to someone else.
+
+Hit / miss / eviction counts are kept so --parallel can be sized from data.
+
+Usage:
+    slots = SlotManager([0, 1])
+    slot  = slots.acquire(session_id)   # pin for the duration of a request
+    ...
+    slots.release(session_id)           # unpin, keep ownership (fires on_idle)
+    slot  = slots.hold(session_id)      # pin without leasing (e.g. to save it)
+    slots.forget(session_id)            # session closed — free the slot
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from core.logger import get_logger
+
+log = get_logger('slot_manager')
+
+
+class SlotManager:
+    """
+    LRU slot allocator. Thread-safe — requests for different sessions run
+    in parallel threads.
+
+    Args:
+        slots:    slot ids available for leasing (must exist on the server,
+                  i.e. be < --parallel).
+        on_assign: optional callback(session_id, slot) fired, outside the
+                  lock, when a session takes ownership of a slot on a miss.
+                  The slot is already pinned. Runs on the requesting
+                  thread, ahead of its first token — keep it short.
+        on_idle:  optional callback(session_id, slot) fired, outside the
+                  lock, when release() leaves a session's owned slot with no
+                  request in flight. Must not block the releasing thread.
+    """
+
+    def __init__(self, slots: list, on_assign: Optional[Callable] = None,
+                 on_idle: Optional[Callable] = None):
+        self._slots     = list(slots)
+        self._on_assign = on_assign
+        self._on_idle   = on_idle
+        self._lock     = threading.Lock()
+
+        self._owned:    OrderedDict = OrderedDict()   # session_id → slot, least recent first
+        self._inflight: dict        = {}              # session_id → active request count
+
+        self.hits      = 0   # session still owned its slot
+        self.misses    = 0   # session had to be (re)assigned a slot
+        self.evictions = 0   # a miss that displaced another session
+        self.contended = 0   # every slot pinned — had to share one
+
+    # ── Public API ────────────────────────────────────────────────────────────
+
+    def acquire(self, session_id: str) -> int:
+        """Return the slot for session_id and pin it until release()."""
+        evicted  = None
+        assigned = False
+        with self._lock:
+            slot = self._owned.get(session_id)
+            if slot is not None:
+                self.hits += 1
+                self._owned.move_to_end(session_id)
+            else:
+                self.misses += 1
+                slot, evicted = self._assign(session_id)
+                assigned = self._owned.get(session_id) == slot
+            self._inflight[session_id] = self._inflight.get(session_id, 0) + 1
+
+        if evicted is not None:
+            log.info("Slot evicted", extra={'data': (
+                f"slot={slot} from={evicted} to={session_id} {self._summary()}"
+            )})
+        if assigned and self._on_assign:
+            try:
+                self._on_assign(session_id, slot)
+            except Exception as e:
+                log.error("Slot assign callback error", extra={'data': str(e)})
+        return slot
+
+    def hold(self, session_id: str, idle_only: bool = False) -> Optional[int]:
+        """
+        Pin session_id's slot without counting a hit or miss, e.g. to save
+        it before forget(). Returns the slot, or None if it owns none (or,
+        with idle_only, if a request is in flight on it). Pair with
+        release(session_id, notify=False).
+        """
+        with self._lock:
+            slot = self._owned.get(session_id)
+            if slot is None or (idle_only and session_id in self._inflight):
+                return None
+            self._inflight[session_id] = self._inflight.get(session_id, 0) + 1
+            return slot
+
+    def release(self, session_id: str, notify: bool = True) -> None:
+        """Unpin session_id's slot after a request. Ownership is kept."""
+        idle = None
+        with self._lock:
+            count = self._inflight.get(session_id, 0) - 1
+            if count > 0:
+                self._inflight[session_id] = count
+            else:
+                self._inflight.pop(session_id, None)
+                idle = self._owned.get(session_id)
+
+        if notify and idle is not None and self._on_idle:
+            try:
+                self._on_idle(session_id, idle)
+            except Exception as e:
+                log.error("Slot idle callback error", extra={'data': str(e)})
+
+    def forget(self, session_id: str) -> Optional[int]:
+        """Drop session_id's ownership (session closed). Returns the freed slot."""
+        with self._lock:
+            self._inflight.pop(session_id, None)
+            return self._owned.pop(session_id, None)
+
+    def owner(self, slot: int) -> Optional[str]:
+        """Return the session currently owning slot, or None."""
+        with self._lock:
+            for session_id, owned in self._owned.items():
+                if owned == slot:
+                    return session_id
+        return None
+
+    def stats(self) -> dict:
+        """Snapshot of lease counters and current ownership."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'slots':     list(self._slots),
+                'owned':     dict(self._owned),
+                'inflight':  dict(self._inflight),
+                'hits':      self.hits,
+                'misses':    self.misses,
+                'evictions': self.evictions,
+                'contended': self.contended,
+                'hit_rate':  round(self.hits / total, 3) if total else None,
+            }
+
+    # ── Internals ─────────────────────────────────────────────────────────────
+
+    def _assign(self, session_id: str) -> tuple:
+        """Pick a slot for a new lease. Caller holds the lock. Returns (slot, evicted_session)."""
+        taken = set(self._owned.values())
+        for slot in self._slots:
+            if slot not in taken:
+                self._owned[session_id] = slot
+                log.debug("Slot assigned", extra={'data': f"slot={slot} session={session_id}"})
+                return slot, None
+
+        # All slots owned — evict the least recently used idle session
+        for victim, slot in self._owned.items():
+            if victim not in self._inflight:
+                del self._owned[victim]
+                self._owned[session_id] = slot
+                self.evictions += 1
+                return slot, victim
+
+        # Every slot is mid-request — share the least recently used one
+        # without taking ownership; llama-server queues the request.
+        self.contended += 1
+        victim, slot = next(iter(self._owned.items()))
+        log.warning("All slots busy — sharing", extra={'data': (
+            f"slot={slot} owner={victim} session={session_id}"
+        )})
+        return slot, None
+
+    def _summary(self) -> str:
+        return (f"hits={self.hits} misses={self.misses} "
+                f"evictions={self.evictions} contended={self.contended}")
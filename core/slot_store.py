@@ -0,0 +1,180 @@
+"""
+core/slot_store.py — Save and restore llama-server KV slots to disk.
+
+A leased slot only holds a session's KV cache until another session takes
+the slot, and nothing survives a llama-server restart. llama-server can
+write a slot's cache to a file and load it back later
+(POST /slots/{id}?action=save|restore). SlotStore wraps those endpoints and
+remembers which conversations have a saved file, so a returning caller,
+speaker or Telegram chat picks up its cached prefix again instead of
+re-prefilling the whole personality and tool context.
+
+Requires llama-server to be started with --slot-save-path <dir>. The files
+are written there by the server; we only keep an index of keys on our side.
+
+Usage:
+    store = SlotStore(config.llama_server.host)
+
+    store.save(slot, key)        # background: slot went idle, or session close
+    if store.has(key):
+        store.restore(slot, key, timeout=2.0)   # on the request path — keep it short
+
+File location: data/slot_cache/saved_slots.json (index only)
+"""
+
+import json
+import os
+import re
+import threading
+from datetime import datetime, timezone
+
+import requests
+
+from core.logger import get_logger
+
+log = get_logger('slot_store')
+
+
+INDEX_FILENAME = "saved_slots.json"
+
+
+class SlotStore:
+    """
+    Thread-safe client for llama-server's slot save/restore API.
+
+    The index maps a conversation key to the last time its slot was saved.
+    It is rewritten atomically on every change so it survives restarts
+    alongside the server-side files.
+
+    If the server rejects slot actions (no --slot-save-path), the store
+    disables itself after the first failure rather than adding a failed
+    round trip to every lease.
+    """
+
+    def __init__(self, host: str, timeout: float = 30.0):
+        self._base    = host.rstrip('/')
+        self._timeout = timeout
+        self._lock    = threading.Lock()
+        self.enabled  = True
+
+        data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../data/slot_cache')
+        os.makedirs(data_dir, exist_ok=True)
+        self._path = os.path.join(data_dir, INDEX_FILENAME)
+
+        self._index: dict = self._load()
+        log.info("SlotStore loaded", extra={'data': f"saved={len(self._index)}"})
+
+    # ── Public API ────────────────────────────────────────────────────────────
+
+    def has(self, key: str) -> bool:
+        """True if a saved slot file is recorded for key."""
+        with self._lock:
+            return key in self._index
+
+    def save(self, slot: int, key: str) -> bool:
+        """Write slot's KV cache to the file for key. Returns True on success."""
+        result = self._action(slot, 'save', self.filename(key))
+        if result is None:
+            return False
+        with self._lock:
+            self._index[key] = {
+                'saved_at': datetime.now(timezone.utc).isoformat(),
+                'n_tokens': result.get('n_saved'),
+            }
+            self._save()
+        log.info("Slot saved", extra={'data': (
+            f"slot={slot} key={key} tokens={result.get('n_saved')} "
+            f"ms={(result.get('timings') or {}).get('save_ms')}"
+        )})
+        return True
+
+    def restore(self, slot: int, key: str, timeout: float = None) -> bool:
+        """Load key's saved KV cache into slot. Returns True on success."""
+        if not self.has(key):
+            return False
+        try:
+            result = self._action(slot, 'restore', self.filename(key), timeout, raise_errors=True)
+        except Exception as e:
+            # Slow or unreachable, not a bad file — keep it for next time
+            log.warning("Slot restore skipped", extra={'data': f"slot={slot} key={key} error={e}"})
+            return False
+        if result is None:
+            # File is gone or unreadable (model changed, save dir wiped) —
+            # stop trying it.
+            self.discard(key)
+            return False
+        log.info("Slot restored", extra={'data': (
+            f"slot={slot} key={key} tokens={result.get('n_restored')} "
+            f"ms={(result.get('timings') or {}).get('restore_ms')}"
+        )})
+        return True
+
+    def discard(self, key: str) -> None:
+        """Forget key's saved file. The file itself stays on the server."""
+        with self._lock:
+            if self._index.pop(key, None) is not None:
+                self._save()
+
+    @staticmethod
+    def filename(key: str) -> str:
+        """Server-side file name for key — llama-server rejects path separators."""
+        return "supernova-" + re.sub(r'[^A-Za-z0-9_.-]', '_', key) + ".bin"
+
+    # ── Internals ─────────────────────────────────────────────────────────────
+
+    def _action(self, slot: int, action: str, filename: str, timeout: float = None,
+                raise_errors: bool = False) -> dict | None:
+        """
+        POST a slot action. Returns the response JSON, or None on failure.
+        With raise_errors, a failed request (timeout, connection) raises
+        instead, so callers can tell it apart from the server saying no.
+        """
+        if not self.enabled:
+            return None
+        try:
+            resp = requests.post(
+                f"{self._base}/slots/{slot}",
+                params  = {'action': action},
+                json    = {'filename': filename},
+                timeout = timeout or self._timeout,
+            )
+        except Exception as e:
+            if raise_errors:
+                raise
+            log.warning("Slot request failed", extra={'data': f"action={action} slot={slot} error={e}"})
+            return None
+
+        if resp.status_code == 501 or (resp.status_code == 400 and 'slot-save-path' in resp.text):
+            self.enabled = False
+            log.warning("Slot save/restore not supported — start llama-server with --slot-save-path",
+                        extra={'data': f"status={resp.status_code}"})
+            return None
+        if resp.status_code != 200:
+            log.warning("Slot request rejected", extra={'data': (
+                f"action={action} slot={slot} status={resp.status_code} body={resp.text[:200]!r}"
+            )})
+            return None
+        try:
+            return resp.json()
+        except ValueError:
+            return {}
+
+    def _load(self) -> dict:
+        try:
+            with open(self._path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            log.error("Failed to load slot index", extra={'data': str(e)})
+            return {}
+
+    def _save(self) -> None:
+        """Write the index atomically. Caller holds the lock."""
+        tmp = self._path + '.tmp'
+        try:
+            with open(tmp, 'w') as f:
+                json.dump(self._index, f, indent=2)
+            os.replace(tmp, self._path)
+        except Exception as e:
+            log.error("Failed to save slot index", extra={'data': str(e)})
@@ -0,0 +1,102 @@
+"""
+core/stream_handle.py — Abortable reference to an in-flight LLM stream.
+
+Setting the session's cancel event only stops our read loop at the next
+chunk. It doesn't stop the server: the HTTP response stays open, so
+llama-server (or Ollama) keeps generating into a slot nobody is reading.
+While the prompt is still being processed no chunks arrive at all, so even
+our own loop doesn't notice until the first token.
+
+Neither server has a cancel endpoint for a single request. Both stop
+generating as soon as the client connection goes away. StreamHandle
+therefore aborts by shutting down the response's socket. That wakes the
+streaming thread's blocked read right away and sends the server a FIN, so
+the slot is freed within milliseconds. Closing the socket from another
+thread would do neither: a blocked recv keeps the socket alive.
+
+The handle is stored in session[KEY_OLLAMA_STREAM]. The streaming thread
+calls close() when it's done with the stream. cancel_active_response()
+calls abort() from whichever thread sees the barge-in.
+
+Usage:
+    handle = StreamHandle(stream)           # openai Stream: response known
+    handle = StreamHandle(generator)        # ollama: attach() from an httpx hook
+    session[KEY_OLLAMA_STREAM] = handle
+
+    handle.abort()      # from any thread
+    handle.close()      # from the streaming thread, always
+"""
+
+import socket
+import threading
+import time
+
+from core.logger import get_logger
+
+log = get_logger('stream_handle')
+
+
+class StreamHandle:
+    """
+    One streaming request. stream is whatever is being iterated (an openai
+    Stream or Ollama's chunk generator). The underlying httpx response is
+    taken from stream.response when present, or supplied later via attach().
+    """
+
+    def __init__(self, stream=None):
+        self.stream     = stream
+        self.aborted    = False
+        self.aborted_at = None   # perf_counter at abort(), for latency logging
+        self._lock      = threading.Lock()
+        self._response  = getattr(stream, 'response', None)
+
+    def attach(self, response) -> None:
+        """Record the httpx response once the request is sent. Aborts it if cancel already came in."""
+        with self._lock:
+            self._response = response
+            aborted = self.aborted
+        if aborted:
+            self._shutdown(response)
+
+    def abort(self) -> None:
+        """Cut the connection so the server stops generating. Safe to call twice."""
+        with self._lock:
+            if self.aborted:
+                return
+            self.aborted    = True
+            self.aborted_at = time.perf_counter()
+            response        = self._response
+        if response is not None:
+            self._shutdown(response)
+
+    def close(self) -> None:
+        """Release the stream from the thread that iterated it."""
+        try:
+            close = getattr(self.stream, 'close', None)
+            if callable(close):
+                close()
+            elif self._response is not None:
+                self._response.close()
+        except Exception as e:
+            log.debug("Stream close error", extra={'data': str(e)})
+
+    @staticmethod
+    def _shutdown(response) -> None:
+        """
+        Shut down the socket under an httpx response. Falls back to closing
+        the response if the transport doesn't expose its socket.
+        """
+        try:
+            network_stream = response.extensions.get('network_stream')
+            sock = network_stream.get_extra_info('socket') if network_stream is not None else None
+            if sock is not None:
+                sock.shutdown(socket.SHUT_RDWR)
+                return
+        except OSError:
+            return   # already disconnected
+        except Exception as e:
+            log.debug("Socket shutdown unavailable", extra={'data': str(e)})
+        try:
+            response.close()
+        except Exception as e:
+            log.warning("Error closing stream response", extra={'data': str(e)})
@@ -10,6 +10,10 @@ Each tool module must follow this convention:
     ├── A schema function (or get_schema hook for dynamic schemas)
     ├── execute(tool_args, session, core, tool_config) — the implementation
     ├── provide_context(core, tool_config, session) -> str  (optional)
+    ├── context_version(core, tool_config, session) -> hashable  (optional)
+    ├── on_session_end(core, tool_config, session)  (optional)
+    ├── on_session_end_batch(core, tool_config, sessions)  (optional, deferred work)
+    ├── digest_result(core, tool_config, result) -> dict | str  (optional, see result_digest.py)
     └── TOOLS list for multi-tool files (optional)
 
     config/my_tool.yaml  (optional sidecar)
@@ -19,6 +23,10 @@ Each tool module must follow this convention:
     ├── blocked_modes:    []           # ['deep_research'] to exclude from specific modes
     ├── requires_config:  ptv          # skip if AppConfig lacks this attribute
     ├── context_priority: 50           # lower = earlier in system prompt
+    ├── parallel_safe:    false        # may run concurrently with other calls in the same round
+    ├── router_pinned:    false        # always offered when the tool router is on
+    ├── defer_session_end: false       # queue session-end work until the system is idle
+    ├── digest_max_chars: 1500         # digest answered results over this size (0 = never)
     └── ... any other tool-specific config values
 
 Multi-tool files export a TOOLS list:
@@ -34,6 +42,25 @@ Dynamic schema hook — for tools that need runtime data in descriptions:
 
 The loader passes tool_config into execute() and provide_context() so tools
 can read their own settings without touching AppConfig directly.
+
+context_version lets a context provider be memoized: it returns a cheap
+token that changes whenever provide_context's output would (file mtime,
+interface mode, ...). While the token is unchanged the last text is reused
+without calling provide_context. Returning None means "don't know" and the
+provider runs as normal. Providers without the hook run every turn.
+
+defer_session_end hands a closing session to core.job_queue instead of
+calling the tool's session-end hook straight away. The queue later runs
+on_session_end_batch with several sessions at once, or on_session_end per
+session if the tool has no batch hook (see job_queue.py).
+
+digest_result shortens one of the tool's results once the model has
+answered from it (result_digest.py). It gets the parsed result payload and
+returns what should stay in history. Returning None means the default
+digest is used.
+
+ToolLoader.version increments on every reload, so callers can cache anything
+derived from the tool set (e.g. compiled OpenAI schemas) and know when it's stale.
 """
 
 import importlib
@@ -47,6 +74,9 @@ from core.logger import get_logger
 
 log = get_logger('tool_loader')
 
+# Memoized context texts kept per provider (see context_version)
+CONTEXT_MEMO_SIZE = 8
+
 
 class ToolLoader:
     def __init__(self, tools_dir: str, config_dir: str, app_config):
@@ -60,11 +90,16 @@ class ToolLoader:
         self._tools:            list[dict] = []   # all loaded tool entries
         self._executors:        dict       = {}   # name → callable(tool_args, session, core)
         self._tool_configs:     dict       = {}   # name → yaml dict
-        self._context_providers: list      = []   # (priority, name, fn, tool_config)
+        self._parallel_safe:    set        = set()   # tool names allowed to run concurrently
+        self._router_pinned:    set        = set()   # tool names the tool router never drops
+        self._digesters:        dict       = {}   # name → (digest_result fn or None, tool_config)
+        self._context_providers: list      = []   # (priority, name, fn, version_fn, tool_config)
+        self._context_memo:     dict       = {}   # name → {version token: text}
         self._turn_context_providers: list = []   # for those tools that inject some context just before agent turn
-        self._session_end_handlers:   list = []   # for those tools that need to clean up after a session ends
+        self._session_end_handlers:   list = []   # (name, fn, batch_fn, tool_config) — clean up after a session ends
         self._last_mtime:       float      = 0.0
         self._core_ref                     = None  # set on first get_context_injections call
+        self.version:           int        = 0     # bumped on every reload — cache key for derived data
 
         # Force an initial load
         self._reload()
@@ -99,6 +134,32 @@ class ToolLoader:
         self._reload_if_changed()
         return self._executors.get(tool_name)
 
+    def is_parallel_safe(self, tool_name: str) -> bool:
+        """True if the tool's yaml declares parallel_safe: true."""
+        return tool_name in self._parallel_safe
+
+    def is_router_pinned(self, tool_name: str) -> bool:
+        """True if the tool's yaml declares router_pinned: true."""
+        return tool_name in self._router_pinned
+
+    def digest_max_chars(self, tool_name: str, default: int) -> int:
+        """The tool's digest_max_chars from its yaml, or default."""
+        entry = self._digesters.get(tool_name)
+        if entry is None:
+            return default
+        return int(entry[1].get('digest_max_chars', default) or 0)
+
+    def digest_tool_result(self, core, tool_name: str, result):
+        """The tool's own digest of a result it returned, or None to use the default."""
+        fn, tool_config = self._digesters.get(tool_name, (None, None))
+        if fn is None:
+            return None
+        try:
+            return fn(core, tool_config, result)
+        except Exception as e:
+            log.error(f"digest_result error in {tool_name}", extra={'data': str(e)})
+            return None
+
     def get_tool_config(self, tool_name: str) -> dict:
         """Return the yaml config dict for a tool (empty dict if no yaml)."""
         return self._tool_configs.get(tool_name, {})
@@ -120,14 +181,35 @@ class ToolLoader:
         self._reload_if_changed()
         self._core_ref = core
         results = []
-        for priority, name, provider_fn, tool_config in self._context_providers:
+        for priority, name, provider_fn, version_fn, tool_config in self._context_providers:
             try:
-                text = provider_fn(core, tool_config, session)
-                if text and text.strip():
-                    results.append(text.strip())
+                token = version_fn(core, tool_config, session) if version_fn else None
+                if token is None:
+                    text = (provider_fn(core, tool_config, session) or '').strip()
+                else:
+                    text = self._memoized_context(name, token, provider_fn, core, tool_config, session)
+                if text:
+                    results.append(text)
             except Exception as e:
                 log.error(f"Context provider error in {name}", extra={'data': str(e)})
         return results
+
+    def _memoized_context(self, name: str, token, provider_fn, core, tool_config: dict, session: dict) -> str:
+        """
+        Return the provider's text for this version token, calling it only
+        on a new token. The same str object comes back every time, so an
+        unchanged system prompt is recognised by identity.
+        """
+        memo = self._context_memo.setdefault(name, {})
+        text = memo.get(token)
+        if text is None:
+            text = (provider_fn(core, tool_config, session) or '').strip()
+            # A few tokens per provider (e.g. one per interface mode) — drop
+            # the oldest rather than let stale versions pile up
+            if len(memo) >= CONTEXT_MEMO_SIZE:
+                memo.pop(next(iter(memo)))
+            memo[token] = text
+        return text
     
     def get_turn_context_injections(self, core, session: dict, user_input: str) -> list[str]:
         """
@@ -162,15 +244,42 @@ class ToolLoader:
         Call all registered on_session_end handlers.
         Called by CoreProcessor.close_session() when a session ends cleanly.
         Plugins use this hook to summarise, persist, or clean up session data.
+
+        Handlers with defer_session_end: true are queued on core.job_queue
+        instead, when the core has one.
         """
         self._reload_if_changed()
-        for name, fn, tool_config in self._session_end_handlers:
+        job_queue = getattr(core, 'job_queue', None)
+        for name, fn, batch_fn, tool_config in self._session_end_handlers:
             try:
-                fn(core, tool_config, session)
+                if job_queue is not None and tool_config.get('defer_session_end', False):
+                    job_queue.enqueue(name, session)
+                elif fn is not None:
+                    fn(core, tool_config, session)
+                else:
+                    batch_fn(core, tool_config, [session])
             except Exception as e:
                 log.error(f"Session end handler error in {name}",
                         extra={'data': str(e)})
 
+    def run_deferred_session_end(self, core, name: str, sessions: list[dict]):
+        """
+        Run one tool's deferred session-end work for a batch of session
+        snapshots. Called by the job queue; raises so a failed batch is retried.
+        """
+        self._reload_if_changed()
+        for h_name, fn, batch_fn, tool_config in self._session_end_handlers:
+            if h_name == name:
+                break
+        else:
+            raise KeyError(f"No session end handler named {name!r}")
+
+        if batch_fn is not None:
+            batch_fn(core, tool_config, sessions)
+        else:
+            for session in sessions:
+                fn(core, tool_config, session)
+
     # ── Filtering helpers ─────────────────────────────────────────────────────
 
     @staticmethod
@@ -250,6 +359,9 @@ class ToolLoader:
         tools            = []
         executors        = {}
         tool_configs     = {}
+        parallel_safe    = set()
+        router_pinned    = set()
+        digesters        = {}
         context_providers = []
         turn_providers   = []
         session_end_handlers = []
@@ -302,8 +414,11 @@ class ToolLoader:
             # ── Context provider (optional) ───────────────────────────────────
             provider_fn = getattr(module, 'provide_context', None)
             if provider_fn is not None and callable(provider_fn):
-                priority = tool_config.get('context_priority', 50)
-                context_providers.append((priority, name, provider_fn, tool_config))
+                priority   = tool_config.get('context_priority', 50)
+                version_fn = getattr(module, 'context_version', None)
+                if not callable(version_fn):
+                    version_fn = None
+                context_providers.append((priority, name, provider_fn, version_fn, tool_config))
                 log.debug(f"Registered context provider: {name} (priority={priority})")
 
             # ── Turn context provider (optional) ───────────────────────────────
@@ -314,10 +429,18 @@ class ToolLoader:
                 log.debug(f"Registered turn context provider: {name} (priority={priority})")
 
             # ── Session end handler (optional) ───────────────────────────────
-            end_fn = getattr(module, 'on_session_end', None)
-            if end_fn is not None and callable(end_fn):
-                session_end_handlers.append((name, end_fn, tool_config))
-                log.debug(f"Registered session end handler: {name}")
+            end_fn   = getattr(module, 'on_session_end', None)
+            batch_fn = getattr(module, 'on_session_end_batch', None)
+            end_fn   = end_fn   if callable(end_fn)   else None
+            batch_fn = batch_fn if callable(batch_fn) else None
+            if end_fn is not None or batch_fn is not None:
+                session_end_handlers.append((name, end_fn, batch_fn, tool_config))
+                log.debug(f"Registered session end handler: {name}",
+                          extra={'data': f"batch={batch_fn is not None} deferred={tool_config.get('defer_session_end', False)}"})
+
+            # ── Result digest hook (optional) ─────────────────────────────────
+            digest_fn = getattr(module, 'digest_result', None)
+            digest_fn = digest_fn if callable(digest_fn) else None
 
             # ── Executor closure ──────────────────────────────────────────────
             def make_executor(fn, tc):
@@ -350,6 +473,11 @@ class ToolLoader:
                         'blocked_modes': blocked_modes,
                     })
                     executors[t_name] = make_executor(t_execute, tool_config)
+                    if entry.get('parallel_safe', tool_config.get('parallel_safe', False)):
+                        parallel_safe.add(t_name)
+                    if entry.get('router_pinned', tool_config.get('router_pinned', False)):
+                        router_pinned.add(t_name)
+                    digesters[t_name] = (entry.get('digest', digest_fn), tool_config)
                     log.info(f"Loaded tool: {t_name}",
                              extra={'data': f"interfaces={[str(i) for i in interfaces]} agent_modes={agent_modes} blocked_modes={blocked_modes}"})
                 continue
@@ -382,6 +510,11 @@ class ToolLoader:
                 'blocked_modes': blocked_modes,
             })
             executors[name] = make_executor(execute_fn, tool_config)
+            if tool_config.get('parallel_safe', False):
+                parallel_safe.add(name)
+            if tool_config.get('router_pinned', False):
+                router_pinned.add(name)
+            digesters[name] = (digest_fn, tool_config)
             log.info(f"Loaded tool: {name}",
                      extra={'data': f"interfaces={[str(i) for i in interfaces]} agent_modes={agent_modes} blocked_modes={blocked_modes}"})
 
@@ -391,11 +524,16 @@ class ToolLoader:
 
         self._tools             = tools
         self._executors         = executors
+        self._parallel_safe     = parallel_safe
+        self._router_pinned     = router_pinned
+        self._digesters         = digesters
         self._tool_configs      = tool_configs
         self._context_providers = context_providers
+        self._context_memo      = {}   # modules and configs were reloaded — old text is stale
         self._turn_context_providers = turn_providers
         self._session_end_handlers   = session_end_handlers
         self._last_mtime        = self._current_mtime()
+        self.version           += 1
 
         general_count = sum(1 for t in tools if not t['_interfaces'])
         filtered_count = len(tools) - general_count
@@ -0,0 +1,214 @@
+"""
+core/tool_router.py — Per-turn tool subset chosen by embedding similarity.
+
+get_tools() returns every tool the interface and agent mode allow. With
+Home Assistant, memory, recipes, the shopping list and the rest, the tool
+schemas alone cost thousands of prompt tokens on every turn, while a turn
+rarely needs more than one or two of them.
+
+ToolRouter embeds a short description of each tool once: the name, the
+first docstring paragraph and the parameter names. The vectors are cached
+by that text, so only new or changed tools are embedded again after a
+reload. On each turn it embeds the user's input together with the last
+few messages and ranks the tools by cosine similarity. It offers the top_k
+plus every tool whose yaml sets router_pinned: true.
+
+KV cache: the chat template renders tools ahead of the conversation, so any
+change to the offered set invalidates the whole cached prompt. The
+selection is therefore sticky per session. Each turn's picks are added to
+the set the session already has, and nothing is dropped, so a turn that
+needs no new tool sends byte-identical schemas. The set is rebuilt from the
+current turn's picks only once it would grow past max_tools, or when the
+available tools change (reload, agent mode switch). Tools keep get_tools()
+order, so the same set always produces the same schema array.
+
+If the embedder is unavailable or fails, the full list is returned.
+
+Embedders:
+    chromadb  local ONNX all-MiniLM-L6-v2 — the model tools/memory.py
+              already uses (pip install chromadb)
+    ollama    POST {host}/api/embed
+    openai    POST {host}/v1/embeddings (llama-server --embeddings)
+
+Usage:
+    router = ToolRouter(config.tool_router, tool_loader)
+    tools  = router.select(session, tools, input_text)   # per turn
+    tools  = router.current(session, tools)              # prefill: no new picks
+    router.warm(tools)                                   # embed ahead of first turn
+
+Measure with scripts/bench_tool_router.py.
+"""
+
+import inspect
+import math
+import threading
+
+import requests
+
+from core.logger import get_logger
+from core.session_state import get_history, KEY_ROUTED_TOOLS
+
+log = get_logger('tool_router')
+
+# Each query message is cut to this many characters — the gist is enough
+QUERY_CHARS_PER_MESSAGE = 400
+
+
+def tool_text(fn) -> str:
+    """What gets embedded for a tool: name, summary line(s) and parameter names."""
+    doc     = (inspect.getdoc(fn) or '').split('\n\n')[0].strip()
+    params  = [p for p in inspect.signature(fn).parameters if p != 'self']
+    text    = f"{fn.__name__.replace('_', ' ')}: {doc}"
+    if params:
+        text += f" (parameters: {', '.join(p.replace('_', ' ') for p in params)})"
+    return text
+
+
+def _normalise(vec) -> list:
+    vec  = [float(x) for x in vec]
+    norm = math.sqrt(sum(x * x for x in vec)) or 1.0
+    return [x / norm for x in vec]
+
+
+def _dot(a: list, b: list) -> float:
+    return sum(x * y for x, y in zip(a, b))
+
+
+# ── Embedders ─────────────────────────────────────────────────────────────────
+
+def make_embedder(config):
+    """Return embed(texts) -> list of vectors for config.embedder, or None if unavailable."""
+    kind = config.embedder
+
+    if kind == 'chromadb':
+        try:
+            from chromadb.utils import embedding_functions
+        except ImportError:
+            log.warning("Tool router needs chromadb for the local embedder — routing disabled")
+            return None
+        fn = embedding_functions.DefaultEmbeddingFunction()
+        return lambda texts: [list(v) for v in fn(list(texts))]
+
+    host = config.host.rstrip('/')
+    if not host:
+        log.warning("Tool router embedder needs a host — routing disabled", extra={'data': kind})
+        return None
+
+    if kind == 'ollama':
+        def embed(texts):
+            r = requests.post(f"{host}/api/embed", json={'model': config.model, 'input': list(texts)},
+                              timeout=config.timeout_s)
+            r.raise_for_status()
+            return r.json()['embeddings']
+        return embed
+
+    if kind == 'openai':
+        def embed(texts):
+            r = requests.post(f"{host}/v1/embeddings", json={'model': config.model, 'input': list(texts)},
+                              timeout=config.timeout_s)
+            r.raise_for_status()
+            return [d['embedding'] for d in sorted(r.json()['data'], key=lambda d: d['index'])]
+        return embed
+
+    log.warning("Unknown tool router embedder — routing disabled", extra={'data': kind})
+    return None
+
+
+# ── Router ────────────────────────────────────────────────────────────────────
+
+class ToolRouter:
+    """Chooses the tools offered on each turn. Thread-safe."""
+
+    def __init__(self, config, tool_loader, embed=None):
+        self.config      = config
+        self.tool_loader = tool_loader
+        self._embed      = embed if embed is not None else make_embedder(config)
+        self._vectors: dict = {}   # tool_text → unit vector
+        self._lock       = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return self._embed is not None
+
+    def warm(self, tools: list) -> None:
+        """Embed any tool descriptions not yet cached."""
+        try:
+            self._tool_vectors(tools)
+        except Exception as e:
+            log.warning("Tool router warm-up failed", extra={'data': str(e)})
+
+    def select(self, session: dict, tools: list, input_text: str) -> list:
+        """The tools to offer this turn: the session's sticky set plus this turn's picks."""
+        pinned = {fn.__name__ for fn in tools if self.tool_loader.is_router_pinned(fn.__name__)}
+        if self._embed is None or len(tools) <= self.config.top_k + len(pinned):
+            return tools
+
+        try:
+            picks = self._rank(tools, self._query(session, input_text))
+        except Exception as e:
+            log.warning("Tool routing failed — offering all tools", extra={'data': str(e)})
+            return tools
+
+        universe = tuple(fn.__name__ for fn in tools)
+        chosen   = pinned | set(picks)
+        state    = session.get(KEY_ROUTED_TOOLS)
+        if state is not None and state['universe'] == universe:
+            grown = state['names'] | chosen
+            names = grown if len(grown) <= self.config.max_tools else chosen
+            if names != state['names']:
+                log.debug("Tool set changed", extra={'data': (
+                    f"added={sorted(names - state['names'])} "
+                    f"reset={names is chosen} total={len(names)}"
+                )})
+        else:
+            names = chosen
+
+        session[KEY_ROUTED_TOOLS] = {'universe': universe, 'names': names}
+        return [fn for fn in tools if fn.__name__ in names]
+
+    def current(self, session: dict, tools: list) -> list:
+        """The session's sticky set without ranking anything — what a prefill should send."""
+        state = session.get(KEY_ROUTED_TOOLS)
+        if state is None or state['universe'] != tuple(fn.__name__ for fn in tools):
+            return tools
+        return [fn for fn in tools if fn.__name__ in state['names']]
+
+    # ── Internals ─────────────────────────────────────────────────────────────
+
+    def _query(self, session: dict, input_text: str) -> str:
+        texts = [
+            m['content'] for m in get_history(session)
+            if m.get('role') in ('user', 'assistant') and isinstance(m.get('content'), str) and m['content']
+        ]
+        if texts and texts[-1] == input_text:
+            texts.pop()   # already appended to history by the time we're called
+        recent = texts[-self.config.context_messages:] if self.config.context_messages > 0 else []
+        return '\n'.join(t[:QUERY_CHARS_PER_MESSAGE] for t in recent + [input_text])
+
+    def _rank(self, tools: list, query: str) -> list:
+        """Names of the top_k tools by similarity to query, best first."""
+        vectors = self._tool_vectors(tools)
+        q       = _normalise(self._embed([query])[0])
+        scored  = sorted(
+            ((_dot(q, vectors[fn.__name__]), fn.__name__) for fn in tools),
+            reverse=True,
+        )
+        return [name for score, name in scored[:self.config.top_k] if score >= self.config.min_score]
+
+    def _tool_vectors(self, tools: list) -> dict:
+        """name → unit vector for tools, embedding any descriptions not cached yet in one call."""
+        texts = {fn.__name__: tool_text(fn) for fn in tools}
+        with self._lock:
+            missing = [t for t in set(texts.values()) if t not in self._vectors]
+        if missing:
+            vecs = self._embed(missing)
+            with self._lock:
+                for text, vec in zip(missing, vecs):
+                    self._vectors[text] = _normalise(vec)
+                # Dynamic schemas (get_schema hooks) change text on reload — drop the old ones
+                if len(self._vectors) > 2 * len(texts) + 32:
+                    live = set(texts.values())
+                    self._vectors = {t: v for t, v in self._vectors.items() if t in live}
+            log.info("Tool descriptions embedded", extra={'data': f"count={len(missing)}"})
+        with self._lock:
+            return {name: self._vectors[text] for name, text in texts.items()}
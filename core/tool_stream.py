@@ -0,0 +1,104 @@
+"""
+core/tool_stream.py — Incremental tool-call assembly for streamed responses.
+
+llama-server streams a tool call as fragments: the name, then the argument
+JSON a few characters at a time, possibly followed by more calls and
+trailing text. Waiting for the stream to end before running anything means
+the first tool waits on the whole generation.
+
+ToolCallAssembler accumulates the fragments per call index and notices the
+moment a call's argument JSON parses as a complete object. A top-level JSON
+object can't be extended and stay valid, so that call is final. It is then
+handed to a submit callback, which may start executing it while the stream
+carries on. At the end of the stream, finish() returns the finalized call
+list plus the futures already started, keyed by position in that list, for
+_execute_tool_calls to join.
+
+Usage:
+    assembler = ToolCallAssembler(submit=lambda name, args: pool.submit(...) or None)
+    for chunk in stream:
+        for tc_delta in chunk.choices[0].delta.tool_calls or []:
+            assembler.add(tc_delta)
+    tool_calls, started = assembler.finish(finalize)
+"""
+
+import json
+from typing import Callable, Optional
+
+from core.logger import get_logger
+
+log = get_logger('tool_stream')
+
+
+class ToolCallAssembler:
+    """
+    Per-response accumulator for streamed tool-call deltas.
+
+    Args:
+        submit: callback(name, args) → Future | None. Called once per call
+                as soon as its arguments are complete. Return None to leave
+                the call for normal execution after the stream.
+    """
+
+    def __init__(self, submit: Optional[Callable] = None):
+        self._submit  = submit
+        self.pending: dict = {}   # stream index → {'id', 'name', 'arguments'}
+        self._started: dict = {}  # stream index → (future, arguments string at submit)
+
+    def add(self, tc_delta) -> None:
+        """Merge one streamed tool-call delta."""
+        entry = self.pending.setdefault(
+            tc_delta.index, {'id': None, 'name': None, 'arguments': ''}
+        )
+        if tc_delta.id:
+            entry['id'] = tc_delta.id
+        if tc_delta.function:
+            if tc_delta.function.name:
+                entry['name'] = tc_delta.function.name
+            if tc_delta.function.arguments:
+                entry['arguments'] += tc_delta.function.arguments
+                self._maybe_start(tc_delta.index, entry)
+
+    def _maybe_start(self, index: int, entry: dict) -> None:
+        if self._submit is None or index in self._started or not entry['name']:
+            return
+        raw = entry['arguments'].rstrip()
+        if not raw.endswith('}'):
+            return
+        try:
+            args = json.loads(raw)
+        except json.JSONDecodeError:
+            return
+        if not isinstance(args, dict):
+            return
+
+        future = self._submit(entry['name'], args)
+        if future is not None:
+            self._started[index] = (future, entry['arguments'])
+            log.debug("Tool call started mid-stream", extra={'data': f"index={index} name={entry['name']}"})
+
+    def finish(self, finalize: Callable) -> tuple[list, dict]:
+        """
+        Finalize the accumulated calls with finalize(pending) and return
+        (tool_calls, started) where started maps a position in tool_calls to
+        the future already running it.
+
+        A call whose arguments changed after it was started (the model kept
+        writing past a complete object) is not reused — its future is
+        cancelled and the call runs normally with the final arguments.
+        """
+        tool_calls = finalize(self.pending)
+        named      = [i for i in sorted(self.pending) if self.pending[i]['name']]
+        started    = {}
+        for position, index in enumerate(named):
+            if index not in self._started:
+                continue
+            future, submitted_args = self._started[index]
+            if self.pending[index]['arguments'] == submitted_args:
+                started[position] = future
+            else:
+                future.cancel()
+                log.warning("Early tool call superseded", extra={'data': (
+                    f"name={self.pending[index]['name']} raw={self.pending[index]['arguments']!r}"
+                )})
+        return tool_calls, started
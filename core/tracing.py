@@ -0,0 +1,172 @@
+"""
+core/tracing.py — Per-turn latency spans, written as JSONL.
+
+The _elapsed log lines show when things happened inside core.py, but not
+where the seconds between the end of speech and the first audio go. A Trace
+follows one turn through the whole pipeline: the interface, the core, the
+backend and the tools. It collects named spans with start offsets from the
+start of the turn. On finish() the whole turn is written as one JSON line to
+a rotating file. scripts/trace_summary.py turns that file into per-stage
+percentiles.
+
+A voice turn starts its trace at the end of speech and stores it on the
+core session (KEY_TRACE), so spans recorded by the core land in the same
+trace. A turn that arrives without one (text interfaces, headless) gets a
+trace from process_input().
+
+Spans:
+    vad_silence      end of speech → silence timeout fired
+    asr              Whisper transcription
+    speaker_id_wait  collecting the speaker ID result
+    system_prompt    create_system_message()
+    history_budget   history compaction
+    turn_context     per-turn context providers
+    llm_admit        waiting for the LLM scheduler
+    llm_ttft         request sent → first chunk (per round)
+    llm_stream       request sent → stream finished (per round)
+    tool:<name>      each tool execution
+    tts              Piper synthesis of one sentence
+    first_sentence   (mark) first sentence handed to Piper
+    first_audio      (mark) first audio frame delivered
+
+Times are time.monotonic() seconds. Marks are spans of zero length.
+
+Usage:
+    tracer = Tracer(config.tracing)
+    trace  = tracer.start(interface='speaker', endpoint='kitchen')
+
+    with span(trace, 'asr'):
+        ...
+    trace.mark('first_audio')
+    trace.finish()
+
+    with span(None, 'asr'):     # tracing off — a no-op
+        ...
+
+File location: data/traces/traces.jsonl (rotated; a relative tracing.path is
+resolved against the project root, like the other data/ stores)
+"""
+
+import contextlib
+import json
+import logging
+import logging.handlers
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+from core.logger import get_logger
+
+log = get_logger('tracing')
+
+
+class Trace:
+    """Spans for one turn. Thread-safe — tools and the interface record concurrently."""
+
+    def __init__(self, tracer: 'Tracer', attrs: dict, t0: float = None):
+        self.trace_id = uuid.uuid4().hex[:12]
+        self.t0       = t0 if t0 is not None else time.monotonic()
+        self.attrs    = attrs
+        self._tracer  = tracer
+        self._lock    = threading.Lock()
+        self._spans:  list = []
+        self._marks:  set  = set()
+        self._done    = False
+        self._wall0   = time.time() - (time.monotonic() - self.t0)
+
+    def add(self, name: str, start: float, end: float = None, **attrs) -> None:
+        """Record a span from monotonic start to end (now if omitted)."""
+        end  = end if end is not None else time.monotonic()
+        span = {'name': name, 'at_ms': round((start - self.t0) * 1000, 2),
+                'dur_ms': round((end - start) * 1000, 2)}
+        if attrs:
+            span.update(attrs)
+        with self._lock:
+            self._spans.append(span)
+
+    def mark(self, name: str, **attrs) -> bool:
+        """Record a zero-length span at now, once per trace. False if already marked."""
+        with self._lock:
+            if name in self._marks:
+                return False
+            self._marks.add(name)
+        now = time.monotonic()
+        self.add(name, now, now, **attrs)
+        return True
+
+    def has(self, name: str) -> bool:
+        with self._lock:
+            return name in self._marks
+
+    @contextlib.contextmanager
+    def span(self, name: str, **attrs):
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add(name, start, **attrs)
+
+    def finish(self, **attrs) -> None:
+        """Write the trace. Later calls are ignored."""
+        with self._lock:
+            if self._done:
+                return
+            self._done = True
+            spans = sorted(self._spans, key=lambda s: s['at_ms'])
+        self.attrs.update(attrs)
+        self._tracer.write({
+            'trace_id': self.trace_id,
+            'ts':       datetime.fromtimestamp(self._wall0, timezone.utc).isoformat(timespec='milliseconds'),
+            'total_ms': round((time.monotonic() - self.t0) * 1000, 2),
+            **self.attrs,
+            'spans':    spans,
+        })
+
+
+class Tracer:
+    """Creates traces and owns the rotating JSONL writer."""
+
+    def __init__(self, config):
+        self.enabled = config.enabled
+        self._writer = None
+        if not self.enabled:
+            return
+
+        path = config.path
+        if not os.path.isabs(path):
+            project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            path = os.path.join(project_root, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # A private, non-propagating logger gives us thread-safe appends and
+        # size-based rotation without a handler of our own
+        handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=config.max_bytes, backupCount=config.backup_count, encoding='utf-8',
+        )
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        self._writer = logging.getLogger('supernova_traces')
+        self._writer.propagate = False
+        self._writer.setLevel(logging.INFO)
+        self._writer.handlers = [handler]
+        log.info("Tracing enabled", extra={'data': path})
+
+    def start(self, t0: float = None, **attrs) -> Trace | None:
+        """New trace starting at monotonic t0 (now if omitted), or None with tracing off."""
+        if not self.enabled:
+            return None
+        return Trace(self, attrs, t0)
+
+    def write(self, record: dict) -> None:
+        try:
+            self._writer.info(json.dumps(record, default=str))
+        except Exception as e:
+            log.warning("Trace write failed", extra={'data': str(e)})
+
+
+def span(trace: Trace | None, name: str, **attrs):
+    """trace.span(name) if there is a trace, otherwise a no-op context manager."""
+    if trace is None:
+        return contextlib.nullcontext()
+    return trace.span(name, **attrs)
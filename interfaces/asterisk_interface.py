@@ -52,6 +52,8 @@ class AsteriskInterface(BaseVoiceInterface):
     Asterisk ARI voice interface. One call at a time.
     """
 
+    wire_rate = WIRE_RATE
+
     def __init__(self, core_processor, config, transcriber=None, vad=None, piper_voice=None):
         super().__init__(
             core_processor          = core_processor,
@@ -63,6 +65,7 @@ class AsteriskInterface(BaseVoiceInterface):
             whisper_model_size      = 'base.en',
             piper_max_concurrent    = 1,
             whisper_max_concurrent  = 1,
+            vad_service             = vad,
         )
         self.config = config
 
@@ -0,0 +1,102 @@
+"""
+audio_buffer.py — Preallocated float32 audio buffers for the voice pipeline.
+
+VoiceContext used to grow its utterance, lookback and VAD pre-buffer with
+np.concatenate on every chunk. That copies the whole utterance each time,
+O(n²) over a long utterance, and allocates on the event loop for every
+100 ms of audio from every satellite. AudioBuffer keeps one float32 arena
+per buffer and writes each chunk into it in place:
+
+  - append() copies only the new samples. When the arena is full it is
+    doubled (utterances) or the live samples are moved to the front
+    (FIFO / trailing-window use), so the cost per sample is amortised O(1).
+  - view() returns the live samples as a zero-copy numpy view.
+  - consume(n) hands back the first n samples as a view and drops them.
+    This is the VAD pre-buffer's pop.
+  - max_len keeps only the newest max_len samples (the lookback window).
+    The arena is 2 × max_len, so the trim-and-move happens once per
+    max_len samples appended, not on every chunk.
+
+Views alias the arena. They hold until the next append(), consume() or
+clear() on the same buffer, which is all the event-loop code needs. A view
+handed to another thread (speaker ID reads ctx.frames_np while recording)
+stays valid as long as the owner only appends. Growth moves to a new arena
+and leaves the old one untouched, and a plain append writes past the
+view's end. That is why VoiceContext.reset_audio() swaps in a fresh buffer
+instead of clearing the old one in place.
+
+Usage:
+    buf = AudioBuffer(capacity=16000)
+    buf.append(chunk)
+    window = buf.consume(1600)        # zero-copy, valid until the next append
+    audio  = buf.view()               # zero-copy view of everything held
+
+    lookback = AudioBuffer(max_len=16000)   # keeps the newest second
+"""
+
+from typing import Optional
+
+import numpy as np
+
+
+class AudioBuffer:
+    """Growable float32 arena with an optional trailing-window limit. Not thread-safe."""
+
+    def __init__(self, capacity: int = 16000, max_len: Optional[int] = None):
+        self.max_len = max_len
+        if max_len is not None:
+            capacity = max(capacity, 2 * max_len)
+        self._buf   = np.empty(max(1, capacity), dtype=np.float32)
+        self._start = 0
+        self._end   = 0
+
+    @property
+    def size(self) -> int:
+        return self._end - self._start
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def view(self) -> np.ndarray:
+        """Live samples, oldest first. Zero-copy."""
+        return self._buf[self._start:self._end]
+
+    def append(self, chunk: np.ndarray) -> None:
+        n = chunk.size
+        if n == 0:
+            return
+        if self.max_len is not None and n >= self.max_len:
+            # The chunk alone fills the window
+            self._buf[:self.max_len] = chunk.reshape(-1)[-self.max_len:]
+            self._start, self._end = 0, self.max_len
+            return
+        if self._end + n > self._buf.size:
+            self._make_room(n)
+        self._buf[self._end:self._end + n] = chunk.reshape(-1)
+        self._end += n
+        if self.max_len is not None and self.size > self.max_len:
+            self._start = self._end - self.max_len
+
+    def consume(self, n: int) -> np.ndarray:
+        """Drop the first n samples and return them as a view (valid until the next append)."""
+        n = min(n, self.size)
+        out = self._buf[self._start:self._start + n]
+        self._start += n
+        if self._start == self._end:
+            self._start = self._end = 0
+        return out
+
+    def clear(self) -> None:
+        """Forget everything, keeping the arena. Outstanding views will see new audio."""
+        self._start = self._end = 0
+
+    def _make_room(self, n: int) -> None:
+        live = self.size
+        if live + n <= self._buf.size // 2 or (self.max_len is not None and live + n <= self._buf.size):
+            # Plenty of room once the consumed front is reclaimed
+            self._buf[:live] = self._buf[self._start:self._end]
+        else:
+            grown = np.empty(max(2 * self._buf.size, live + n), dtype=np.float32)
+            grown[:live] = self._buf[self._start:self._end]
+            self._buf = grown
+        self._start, self._end = 0, live
@@ -10,6 +10,10 @@ Subclass contract
 Must implement:
     async def _deliver_audio(self, ctx: VoiceContext, audio_f32: np.ndarray, sample_rate: int) -> None
 
+May set:
+    wire_rate = 16000      # rate _deliver_audio sends at; cached phrases are stored
+                           # pre-resampled to it (None = Piper's native rate)
+
 May override (all are no-ops in the base):
     async def on_vad_triggered(self, ctx)       # voice onset detected
     async def on_vad_silence_timeout(self, ctx) # silence crossed — about to transcribe
@@ -29,6 +33,16 @@ The base handles VAD, lookback, accumulation, silence timeout, and
 transcription trigger. The subclass is responsible for any codec conversion
 (e.g. ulaw → PCM, 8kHz → 16kHz) before calling _process_audio_chunk.
 
+Incremental transcription
+─────────────────────────
+With voice.incremental_asr on, Whisper doesn't wait for the end of the
+utterance. Each time the speaker pauses for asr_commit_gap_s, the audio up
+to that pause is decoded on the whisper pool while they carry on talking
+(or while the vad_timeout silence runs out) and its text is committed. At
+end of utterance only the uncommitted tail is decoded, with the committed
+text as Whisper's prompt, so post-speech ASR cost tracks the last phrase
+rather than the whole utterance.
+
 Context object
 ──────────────
 Each active call/connection is represented by a VoiceContext dataclass.
@@ -48,7 +62,6 @@ import wave
 from dataclasses import dataclass, field
 from typing import Optional
 from datetime import datetime
-import queue
 
 import numpy as np
 import resampy
@@ -56,15 +69,17 @@ import resampy
 from piper import PiperVoice, SynthesisConfig
 from faster_whisper import WhisperModel
 
-from interfaces.vad import VoiceActivityDetector
+from interfaces.audio_buffer import AudioBuffer
+from interfaces.tts_cache import TTSCache, voice_id
+from interfaces.vad import BatchedVAD, VADStream, VoiceActivityDetector
 
 from core.interface_mode import InterfaceMode
 from core.session_state import (
-    KEY_INTERFACE_MODE,
+    KEY_INTERFACE_MODE, KEY_TRACE,
     hangup_requested, clear_hangup,
-    get_response_queue,
 )
 from core.speaker_id import SpeakerIdentifier, load_profiles
+from core.tracing import Trace, span
 
 from core.logger import get_logger
 log = get_logger('base_voice')
@@ -75,6 +90,7 @@ INTERNAL_RATE    = 16000   # sample rate for all internal audio (Whisper + Piper
 VAD_MIN_SAMPLES  = 1600    # minimum chunk size for Silero VAD at 16kHz (~100ms)
 LOOKBACK_SECONDS = 1.0     # lookback buffer duration — prepended on voice onset
                             # so the start of an utterance is never clipped
+UTTERANCE_SECONDS = 10.0   # initial utterance buffer — grows (doubling) past this
 
 
 # ── Inference pool ────────────────────────────────────────────────────────────
@@ -88,20 +104,219 @@ class _InferencePool:
 
     Blocks until a slot is available. max_concurrent=1 serialises all
     inference, which is correct for low-traffic single-GPU use.
+
+    waiting / busy are only touched from the event loop thread, so they
+    need no lock — /metrics reads them as queue depth and utilisation.
     """
 
     def __init__(self, model, max_concurrent: int = 1):
-        self.model = model
-        self._sem  = asyncio.Semaphore(max_concurrent)
+        self.model   = model
+        self._sem    = asyncio.Semaphore(max_concurrent)
+        self.waiting = 0
+        self.busy    = 0
 
     async def __aenter__(self):
-        await self._sem.acquire()
+        self.waiting += 1
+        try:
+            await self._sem.acquire()
+        finally:
+            self.waiting -= 1
+        self.busy += 1
         return self.model
 
     async def __aexit__(self, *_):
+        self.busy -= 1
         self._sem.release()
 
 
+# ── TTS pipeline ──────────────────────────────────────────────────────────────
+
+class _SpeechPipeline:
+    """
+    One utterance of TTS, with synthesis running ahead of playback.
+
+        speech = self._speech_pipeline(ctx)
+        speech.submit("First sentence.")     # returns at once
+        speech.submit("Second sentence.")
+        await speech.finish()                # everything played, or barge-in
+
+    Two tasks per pipeline. The synth task takes sentences in order and
+    runs Piper on the piper pool, handing each chunk over as Piper yields
+    it. The play task passes those chunks to _deliver_audio as they
+    arrive, so sentence N plays while N+1 is synthesised. At most
+    `lookahead` sentences wait ahead of the one playing. submit() never
+    blocks, so the LLM stream keeps being read while audio plays.
+    Short sentences found in the TTS phrase cache (interfaces/tts_cache.py)
+    skip Piper and arrive already at the transport's wire rate.
+
+    Barge-in (ctx.interrupt_event) stops playback at the next chunk and
+    drops everything queued. A Piper call already running finishes its
+    current chunk in the background and keeps its pool slot until then,
+    so two threads never share the model.
+    """
+
+    def __init__(self, iface, ctx: 'VoiceContext', lookahead: int):
+        self.iface  = iface
+        self.ctx    = ctx
+        self.trace  = ctx.trace
+        self._sentences: asyncio.Queue = asyncio.Queue()
+        self._audio:     asyncio.Queue = asyncio.Queue(maxsize=max(1, lookahead))
+        self._stop      = threading.Event()
+        self._synth_task: Optional[asyncio.Task] = None
+        self._play_task:  Optional[asyncio.Task] = None
+        self._stores:     set = set()   # background TTSCache.put tasks
+        self._speaking  = False
+        self._prev_rx_paused = ctx.rx_paused
+
+    def submit(self, text: str) -> None:
+        """Queue a sentence for synthesis. Ignored after barge-in."""
+        text = self.iface._markdown_strip.sub('', text).strip()
+        if not text or self.ctx.interrupt_event.is_set() or self._stop.is_set():
+            return
+        if self._play_task is None:
+            self.ctx.rx_paused = True
+            self._synth_task = asyncio.create_task(self._synthesise())
+            self._play_task  = asyncio.create_task(self._play())
+        self._sentences.put_nowait(text)
+
+    async def finish(self) -> None:
+        """Wait until everything submitted has been played, or barge-in cuts it short."""
+        if self._play_task is None:
+            return
+        self._sentences.put_nowait(None)
+        interrupt = asyncio.create_task(self.ctx.interrupt_event.wait())
+        try:
+            await asyncio.wait({self._play_task, interrupt}, return_when=asyncio.FIRST_COMPLETED)
+            if self._play_task.done():
+                self._play_task.result()   # surface transport errors
+        finally:
+            interrupt.cancel()
+            await self.cancel()
+
+    async def cancel(self) -> None:
+        """Stop now: drop queued sentences, stop playback. Safe to call twice."""
+        if self._play_task is None or self._stop.is_set():
+            return
+        self._stop.set()
+        self._synth_task.cancel()   # lets go of its pool slot once Piper's current chunk is done
+        self._play_task.cancel()
+        await asyncio.gather(self._play_task, return_exceptions=True)
+        self.ctx.rx_paused = self._prev_rx_paused
+        if self._speaking:
+            await self.iface.on_speaking_end(self.ctx)
+
+    def _halted(self) -> bool:
+        return self._stop.is_set() or self.ctx.interrupt_event.is_set()
+
+    async def _synthesise(self) -> None:
+        while (text := await self._sentences.get()) is not None:
+            if self._halted():
+                break
+            chunks: asyncio.Queue = asyncio.Queue()
+            await self._audio.put(chunks)   # waits while `lookahead` sentences are ahead of playback
+            await self._synthesise_one(text, chunks)
+        await self._audio.put(None)
+
+    async def _synthesise_one(self, text: str, chunks: asyncio.Queue) -> None:
+        """Run Piper for one sentence, streaming chunks into `chunks`. Always ends it with None."""
+        loop  = asyncio.get_running_loop()
+        cache = self.iface._tts_cache
+        rate  = self.iface._tts_rate()
+        key   = cache.key(text)
+        try:
+            audio = cache.get(key, rate)
+            if audio is None and key is not None:
+                # Disk lookup — even the exists() check stays off the loop
+                audio = await asyncio.to_thread(cache.load, key, rate)
+            if audio is not None:
+                with span(self.trace, 'tts', chars=len(text), cached=True):
+                    chunks.put_nowait((rate, audio))
+                return
+
+            keep = cache.repeated(key)
+            with span(self.trace, 'tts', chars=len(text)):
+                async with self.iface._piper_pool as voice:
+                    def synth():
+                        parts, src_rate = [], rate
+                        for chunk in voice.synthesize(text, syn_config=self.iface.piper_syn_config):
+                            if self._halted():
+                                return None
+                            audio_f32 = chunk.audio_float_array.copy()
+                            loop.call_soon_threadsafe(chunks.put_nowait, (chunk.sample_rate, audio_f32))
+                            if keep:
+                                parts.append(audio_f32)
+                                src_rate = chunk.sample_rate
+                        return (np.concatenate(parts), src_rate) if parts else None
+                    job = asyncio.ensure_future(asyncio.to_thread(synth))
+                    try:
+                        synthesised = await asyncio.shield(job)
+                    except asyncio.CancelledError:
+                        # Hold the pool slot until the thread is off the model
+                        await asyncio.wait({job})
+                        raise
+            # Resample and write in the background, with the pool slot already
+            # handed on and the next sentence free to start
+            if synthesised is not None:
+                task = asyncio.create_task(self._cache_store(key, rate, *synthesised))
+                self._stores.add(task)
+                task.add_done_callback(self._stores.discard)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            log.error("Piper synthesis error", exc_info=True)
+        finally:
+            chunks.put_nowait(None)
+
+    async def _cache_store(self, key: str, rate: int, audio_f32: np.ndarray, src_rate: int) -> None:
+        try:
+            await asyncio.to_thread(self.iface._tts_cache.put, key, rate, audio_f32, src_rate)
+        except Exception:
+            log.error("TTS cache store failed", exc_info=True)
+
+    async def _play(self) -> None:
+        while (chunks := await self._audio.get()) is not None:
+            while (item := await chunks.get()) is not None:
+                if self._halted():
+                    return
+                sr, audio_f32 = item
+                audio_f32 = np.asarray(audio_f32, dtype=np.float32).reshape(-1)
+                # Trust Piper's own normalisation, just hard-limit the peaks
+                audio_f32 = np.clip(audio_f32, -1.0, 1.0)
+
+                if not self._speaking:
+                    self._speaking = True
+                    await self.iface.on_speaking_start(self.ctx)
+                await self.iface._deliver_audio(self.ctx, audio_f32, sr)
+                # Only the reply counts — not a slow-response notice played before it
+                if self.trace is not None and self.trace.has('first_sentence'):
+                    self.trace.mark('first_audio')
+
+
+# ── Incremental ASR state ─────────────────────────────────────────────────────
+
+@dataclass
+class PartialTranscript:
+    """
+    Committed part of the utterance being recorded (incremental_asr).
+
+    Offsets are sample indices into ctx.frames_np. A fresh instance is made
+    at voice onset; reset_audio() drops it, so a decode still in flight for
+    a discarded utterance commits into an orphan and is ignored.
+    """
+    committed:  int                      = 0      # frames_np[:committed] is transcribed
+    texts:      list                     = field(default_factory=list)
+    cut:        int                      = 0      # end of the latest pause — decodable up to here
+    voice_end:  int                      = 0      # end of the last voiced chunk
+    task:       Optional[asyncio.Task]   = None   # partial decode in flight
+
+    def text(self) -> str:
+        return " ".join(self.texts)
+
+
+def _utterance_buffer() -> AudioBuffer:
+    return AudioBuffer(int(UTTERANCE_SECONDS * INTERNAL_RATE))
+
+
 # ── Per-call context ──────────────────────────────────────────────────────────
 
 @dataclass
@@ -126,14 +341,21 @@ class VoiceContext:
     session_id:         Optional[str]   = None   # set by base on first LLM dispatch
 
     # ── Audio accumulation ────────────────────────────────────────────────────
-    frames_np:          np.ndarray      = field(default_factory=lambda: np.array([], dtype=np.float32))
-    lookback:           np.ndarray      = field(default_factory=lambda: np.array([], dtype=np.float32))
-    vad_buffer:         np.ndarray      = field(default_factory=lambda: np.array([], dtype=np.float32))
+    # Preallocated arenas (interfaces/audio_buffer.py) — chunks are written
+    # in place; read the utterance through frames_np, a zero-copy view.
+    frames:             AudioBuffer     = field(default_factory=_utterance_buffer)
+    lookback:           AudioBuffer     = field(default_factory=lambda: AudioBuffer(max_len=int(LOOKBACK_SECONDS * INTERNAL_RATE)))
+    vad_buffer:         AudioBuffer     = field(default_factory=lambda: AudioBuffer(2 * VAD_MIN_SAMPLES))
     recording:          bool            = False
     last_voice_ts:      Optional[float] = None
 
+    # Incremental ASR — None unless voice.incremental_asr and recording
+    asr:                Optional[PartialTranscript] = None
+
     # ── VAD (one instance per context — preserves LSTM state per call) ────────
-    vad:                Optional[VoiceActivityDetector] = None
+    # VADStream on the shared BatchedVAD, or a VoiceActivityDetector of its own
+    # when voice.vad_batching is off
+    vad:                Optional[VADStream | VoiceActivityDetector] = None
 
     # ── Flow control ──────────────────────────────────────────────────────────
     # True while the system is speaking or processing — base sets this;
@@ -165,26 +387,34 @@ class VoiceContext:
     speaker_id:         Optional[SpeakerIdentifier] = None
     identified_speaker: Optional[str]               = None
 
+    # ── Latency tracing ───────────────────────────────────────────────────────
+    # Started at end of speech, handed to the core session for the turn,
+    # finished once the reply has been spoken. None when tracing is off.
+    trace:              Optional[Trace]             = None
+
     # ── Helpers ───────────────────────────────────────────────────────────────
 
+    @property
+    def frames_np(self) -> np.ndarray:
+        """The utterance so far — a zero-copy view, valid while recording continues."""
+        return self.frames.view()
+
     def reset_audio(self):
-        self.frames_np     = np.array([], dtype=np.float32)
+        # A fresh arena rather than clear(): speaker ID may still hold a view
+        # of this utterance on its thread, and clear() would overwrite it
+        if self.frames.size:
+            self.frames = _utterance_buffer()
         self.recording     = False
         self.last_voice_ts = None
         self.silence_samples = 0
+        self.asr           = None
 
     def add_frames(self, chunk: np.ndarray):
-        if self.frames_np.size == 0:
-            self.frames_np = chunk.copy()
-        else:
-            self.frames_np = np.concatenate((self.frames_np, chunk))
+        self.frames.append(chunk)
 
     def update_lookback(self, chunk: np.ndarray):
         """Maintain a rolling window of the last LOOKBACK_SECONDS of audio."""
-        max_samples = int(LOOKBACK_SECONDS * INTERNAL_RATE)
-        self.lookback = np.concatenate((self.lookback, chunk))
-        if len(self.lookback) > max_samples:
-            self.lookback = self.lookback[-max_samples:]
+        self.lookback.append(chunk)
 
     def clear_interrupt(self):
         if self.interrupt_event.is_set():
@@ -201,6 +431,8 @@ class BaseVoiceInterface:
     feedback hooks. Everything else — VAD, ASR, LLM, TTS — is handled here.
     """
 
+    wire_rate: Optional[int] = None   # subclass: the rate _deliver_audio sends at
+
     def __init__(
         self,
         core_processor,
@@ -212,6 +444,7 @@ class BaseVoiceInterface:
         whisper_model_size:     str   = 'base.en',
         piper_max_concurrent:   int   = 1,
         whisper_max_concurrent: int   = 1,
+        vad_service:            Optional[BatchedVAD] = None,
     ):
         self.core_processor = core_processor
         self.vad_threshold  = vad_threshold
@@ -252,6 +485,10 @@ class BaseVoiceInterface:
             noise_scale=1.0, noise_w_scale=1.0,
             normalize_audio=True,
         )
+        self._tts_cache = TTSCache(
+            core_processor.config.tts_cache,
+            voice_id(core_processor.config.voice.model_path, self.piper_syn_config),
+        )
 
         # ── Whisper ASR ───────────────────────────────────────────────────────
         if transcriber is not None:
@@ -263,6 +500,17 @@ class BaseVoiceInterface:
         self._whisper_max_concurrent = whisper_max_concurrent
         self._whisper_pool: Optional[_InferencePool] = None  # initialised in run()
 
+        # ── VAD ───────────────────────────────────────────────────────────────
+        # One batched Silero session for every context (shared across
+        # interfaces when main passes one in), run off the event loop
+        voice_cfg = core_processor.config.voice
+        if not voice_cfg.vad_batching:
+            self._vad_service = None
+        elif isinstance(vad_service, BatchedVAD):
+            self._vad_service = vad_service
+        else:
+            self._vad_service = BatchedVAD(threshold=vad_threshold, max_batch=voice_cfg.vad_max_batch)
+
         # ── Speaker profiles ──────────────────────────────────────────────────
         config_dir = os.path.join(os.path.dirname(__file__), '../config')
         self._speaker_profiles = load_profiles(config_dir)
@@ -272,6 +520,33 @@ class BaseVoiceInterface:
 
         log.info("BaseVoiceInterface ready")
 
+    def _tts_rate(self) -> int:
+        """Rate cached phrases are stored at — the transport's wire rate, or Piper's own."""
+        return self.wire_rate or self._piper_voice_instance.config.sample_rate
+
+    async def _prewarm_tts_cache(self) -> None:
+        """Make sure every tts_cache.prewarm phrase is cached at this transport's rate."""
+        cache, rate = self._tts_cache, self._tts_rate()
+        done = 0
+        for phrase in self.core_processor.config.tts_cache.prewarm:
+            key = cache.key(self._markdown_strip.sub('', phrase).strip())
+            if key is None or cache.get(key, rate) is not None:
+                continue
+            if await asyncio.to_thread(cache.load, key, rate) is not None:
+                continue
+            try:
+                async with self._piper_pool as voice:
+                    def synth():
+                        return list(voice.synthesize(phrase, syn_config=self.piper_syn_config))
+                    parts = await asyncio.to_thread(synth)
+                if parts:
+                    audio = np.concatenate([c.audio_float_array for c in parts])
+                    await asyncio.to_thread(cache.put, key, rate, audio, parts[0].sample_rate)
+                done += 1
+            except Exception:
+                log.error("TTS cache prewarm failed", extra={'data': repr(phrase)}, exc_info=True)
+        log.info("TTS cache warm", extra={'data': f"{type(self).__name__} rate={rate} synthesised={done}"})
+
     def _init_pools(self):
         """
         Initialise async inference pools. Must be called inside a running event
@@ -280,6 +555,22 @@ class BaseVoiceInterface:
         self._piper_pool   = _InferencePool(self._piper_voice_instance,  self._piper_max_concurrent)
         self._whisper_pool = _InferencePool(self._whisper_instance, self._whisper_max_concurrent)
 
+        owner   = type(self).__name__
+        metrics = self.core_processor.metrics
+        pools   = {'piper': self._piper_pool, 'whisper': self._whisper_pool}
+        metrics.add_collector(
+            'supernova_inference_queue_depth', "Requests waiting for a Whisper/Piper pool slot",
+            lambda: [({'pool': name, 'owner': owner}, pool.waiting) for name, pool in pools.items()])
+        metrics.add_collector(
+            'supernova_inference_busy', "Whisper/Piper pool slots in use",
+            lambda: [({'pool': name, 'owner': owner}, pool.busy) for name, pool in pools.items()])
+        metrics.add_collector(
+            'supernova_tts_cache_hits', "Sentences played from the TTS phrase cache",
+            lambda: [({'owner': owner}, self._tts_cache.hits)])
+
+        # Background — the first utterances just synthesise as before until it's done
+        self._prewarm_task = asyncio.get_running_loop().create_task(self._prewarm_tts_cache())
+
     def make_context(self, **kwargs) -> VoiceContext:
         """
         Create a fresh VoiceContext with a per-call VAD instance and
@@ -289,7 +580,7 @@ class BaseVoiceInterface:
         caller_number, interface_mode).
         """
         ctx = VoiceContext(
-            vad        = VoiceActivityDetector(threshold=self.vad_threshold),
+            vad        = self._new_vad(),
             speaker_id = SpeakerIdentifier(self._speaker_profiles, threshold=self.speaker_id_threshold),
             **kwargs,
         )
@@ -301,16 +592,24 @@ class BaseVoiceInterface:
         Called at session open (WAKE) and session close so no flags, buffers,
         or VAD internal state leak between sessions.
         """
-        ctx.frames_np       = np.array([], dtype=np.float32)
-        ctx.vad_buffer      = np.array([], dtype=np.float32)
-        ctx.lookback        = np.array([], dtype=np.float32)
+        if ctx.frames.size:
+            ctx.frames      = _utterance_buffer()
+        ctx.vad_buffer.clear()
+        ctx.lookback.clear()
         ctx.recording       = False
         ctx.last_voice_ts   = None
         ctx.silence_samples = 0
+        ctx.asr             = None
         ctx.clear_interrupt()
-        # Fresh VAD instance — Silero carries LSTM state across calls and
+        # Fresh VAD state — Silero carries LSTM state across calls and
         # misbehaves when resumed on a new stream.
-        ctx.vad = VoiceActivityDetector(threshold=self.vad_threshold)
+        ctx.vad = self._new_vad()
+
+    def _new_vad(self) -> VADStream | VoiceActivityDetector:
+        """VAD for one context: a stream on the batched service, or a detector of its own."""
+        if self._vad_service is not None:
+            return self._vad_service.stream(self.vad_threshold)
+        return VoiceActivityDetector(threshold=self.vad_threshold)
 
     # ── Feedback hooks ────────────────────────────────────────────────────────
     # All no-ops in the base. Subclasses override what they need.
@@ -339,6 +638,10 @@ class BaseVoiceInterface:
 
     # ── TTS ───────────────────────────────────────────────────────────────────
 
+    def _speech_pipeline(self, ctx: VoiceContext) -> _SpeechPipeline:
+        """New TTS pipeline for ctx — see _SpeechPipeline."""
+        return _SpeechPipeline(self, ctx, self.core_processor.config.voice.tts_lookahead)
+
     async def _speak_text(self, ctx: VoiceContext, text: str) -> None:
         """
         Synthesise text via Piper and deliver via _deliver_audio().
@@ -346,47 +649,12 @@ class BaseVoiceInterface:
         Strips markdown before synthesis. Holds rx_paused for the duration
         so the transport's audio input loop discards incoming audio while
         speaking (half-duplex). Respects ctx.interrupt_event for barge-in.
+        Multi-sentence replies go through one _speech_pipeline() instead,
+        so the next sentence is synthesised while this one plays.
         """
-        text = self._markdown_strip.sub('', text).strip()
-        if not text:
-            return
-
-        prev_rx_paused = ctx.rx_paused
-        ctx.rx_paused  = True
-
-        await self.on_speaking_start(ctx)
-
-        try:
-            async with self._piper_pool as voice:
-                def synth_all_chunks():
-                    return [
-                        (chunk.sample_rate, chunk.audio_float_array.copy())
-                        for chunk in voice.synthesize(text, syn_config=self.piper_syn_config)
-                    ]
-                try:
-                    piper_chunks = await asyncio.to_thread(synth_all_chunks)
-                except Exception:
-                    log.error("Piper synthesis error", exc_info=True)
-                    return
-
-            for sr, audio_f32 in piper_chunks:
-                if ctx.interrupt_event.is_set():
-                    return
-                audio_f32 = np.asarray(audio_f32, dtype=np.float32).reshape(-1)
-
-                # Normalise to consistent RMS - no longer using, we'll trust Piper's internal normalisation and just hard limit the peaks. If we find some voices are too quiet we can revisit this.
-                #rms = float(np.sqrt(np.mean(audio_f32 ** 2))) if audio_f32.size else 0.0
-                #if rms > 1e-8:
-                #    audio_f32 *= (0.2 / rms)
-                audio_f32 = np.clip(audio_f32, -1.0, 1.0)
-
-                await self._deliver_audio(ctx, audio_f32, sr)
-                if ctx.interrupt_event.is_set():
-                    return
-
-        finally:
-            ctx.rx_paused = prev_rx_paused
-            await self.on_speaking_end(ctx)
+        speech = self._speech_pipeline(ctx)
+        speech.submit(text)
+        await speech.finish()
 
     # ── LLM dispatch ─────────────────────────────────────────────────────────
 
@@ -405,6 +673,23 @@ class BaseVoiceInterface:
 
         Returns True if the session was closed (hangup requested by tool).
         """
+        # Turns not started by the VAD (announcements, forced input) are
+        # traced from here instead of from end of speech
+        if ctx.trace is None:
+            ctx.trace = self._start_trace(ctx)
+        try:
+            return await self._run_turn(ctx, input_text, silent_start)
+        finally:
+            trace, ctx.trace = ctx.trace, None
+            if trace is not None:
+                core_session = self.core_processor.get_session(ctx.session_id) if ctx.session_id else None
+                if core_session is not None and core_session.get(KEY_TRACE) is trace:
+                    core_session.pop(KEY_TRACE, None)
+                trace.finish(session=ctx.session_id, speaker=ctx.identified_speaker,
+                             interrupted=ctx.interrupt_event.is_set())
+
+    async def _run_turn(self, ctx: VoiceContext, input_text: str, silent_start: bool) -> bool:
+        """Body of _contact_core() — one LLM turn spoken back to the endpoint."""
         if ctx.session_id is None:
             ctx.session_id  = str(uuid.uuid4())
             core_session    = self.core_processor.create_session(ctx.session_id)
@@ -416,56 +701,67 @@ class BaseVoiceInterface:
 
         log.info("Sending to core", extra={'data': f"{ctx.endpoint_id} {input_text!r}"})
 
-        thread = threading.Thread(
-            target=self.core_processor.process_input,
-            kwargs={"input_text": input_text, "session_id": ctx.session_id},
-            daemon=True,
-        )
-        thread.start()
-
         core_session = self.core_processor.get_session(ctx.session_id)
         if core_session is None:
             # Session was closed externally (e.g. hangup during processing)
             return True
 
-        buffer       = ""
+        buffer        = ""
         ctx.rx_paused = True
-
-        response_q      = get_response_queue(core_session)
-        first_chunk_in  = False
-        notice_spoken   = False
-        notice_deadline = time.monotonic() + self.slow_response_notice_s
-
-        while True:
+        trace         = ctx.trace
+        if trace is not None:
+            core_session[KEY_TRACE] = trace
+
+        # Spoken reassurance if nothing arrives for a while. Runs alongside
+        # the stream; the first chunk cancels the wait, or — if the notice
+        # is already playing — waits for it so speech doesn't overlap.
+        first_chunk = asyncio.Event()
+        watchdog    = None
+        if not silent_start:
+            watchdog = asyncio.create_task(self._slow_response_notice(ctx, first_chunk))
+
+        # Sentences are queued as they complete and synthesised while
+        # earlier ones play; the stream is never held up by TTS
+        speech = self._speech_pipeline(ctx)
+        try:
             try:
-                # Short blocking poll. Timeout raises Empty WITHOUT consuming,
-                # so no chunk can be lost to an orphaned to_thread worker —
-                # which is why this isn't asyncio.wait_for around a plain get.
-                chunk = await asyncio.to_thread(response_q.get, True, 0.25)
-            except queue.Empty:
-                if (not first_chunk_in and not notice_spoken
-                        and not silent_start
-                        and time.monotonic() >= notice_deadline):
-                    notice_spoken = True
-                    await self._speak_text(ctx, self.slow_response_notice_text)
-                continue
-
-            first_chunk_in = True
-            if chunk is None:
-                break
-
-            buffer += chunk
-            sentences = self.sentence_endings.split(buffer)
-            for sent in sentences[:-1]:
-                sent = sent.strip()
-                if sent and not ctx.interrupt_event.is_set():
-                    await self._speak_text(ctx, sent)
-            buffer = sentences[-1]
-
-        if ctx.interrupt_event.is_set():
-            buffer = ""
-        if buffer.strip():
-            await self._speak_text(ctx, buffer.strip())
+                async for chunk in self.core_processor.process_input_async(
+                    input_text = input_text,
+                    session_id = ctx.session_id,
+                ):
+                    if watchdog is not None:
+                        first_chunk.set()
+                        await watchdog
+                        watchdog = None
+
+                    buffer += chunk
+                    sentences = self.sentence_endings.split(buffer)
+                    for sent in sentences[:-1]:
+                        sent = sent.strip()
+                        if sent and not ctx.interrupt_event.is_set():
+                            if trace is not None:
+                                trace.mark('first_sentence')
+                            speech.submit(sent)
+                    buffer = sentences[-1]
+
+                # Turn produced nothing — let a notice already playing finish
+                if watchdog is not None:
+                    first_chunk.set()
+                    await watchdog
+                    watchdog = None
+            finally:
+                if watchdog is not None:
+                    watchdog.cancel()
+
+            if ctx.interrupt_event.is_set():
+                buffer = ""
+            if buffer.strip():
+                if trace is not None:
+                    trace.mark('first_sentence')
+                speech.submit(buffer.strip())
+            await speech.finish()
+        finally:
+            await speech.cancel()
 
         # Re-fetch — session may have been closed while we were speaking
         core_session = self.core_processor.get_session(ctx.session_id)
@@ -481,6 +777,13 @@ class BaseVoiceInterface:
         ctx.rx_paused = False
         return False
 
+    async def _slow_response_notice(self, ctx: VoiceContext, first_chunk: asyncio.Event) -> None:
+        """Speak slow_response_notice_text unless first_chunk is set within slow_response_notice_s."""
+        try:
+            await asyncio.wait_for(first_chunk.wait(), timeout=self.slow_response_notice_s)
+        except asyncio.TimeoutError:
+            await self._speak_text(ctx, self.slow_response_notice_text)
+
     def _configure_session(self, ctx: VoiceContext, core_session: dict) -> None:
         """
         Populate core session metadata from context. Subclasses can override
@@ -503,6 +806,29 @@ class BaseVoiceInterface:
         ctx.rx_paused = False
         await self.on_session_close(ctx)
 
+    def _start_trace(self, ctx: VoiceContext, t0: float = None) -> Optional[Trace]:
+        """New turn trace for this context, starting at monotonic t0 (default now)."""
+        return self.core_processor.tracer.start(
+            t0        = t0,
+            interface = ctx.interface_mode.value,
+            endpoint  = ctx.endpoint_id,
+        )
+
+    def _start_prefill(self, ctx: VoiceContext) -> None:
+        """
+        Warm the LLM's KV cache with this session's prompt while the user is
+        still speaking. Fire-and-forget — a miss just means the turn pays
+        for its own prefill as before. Needs an existing core session, so
+        the first utterance of a call is skipped.
+        """
+        if ctx.session_id is None or not self.core_processor.config.voice.speculative_prefill:
+            return
+        threading.Thread(
+            target = self.core_processor.prefill,
+            args   = (ctx.session_id,),
+            daemon = True,
+        ).start()
+
     # ── Transcription ─────────────────────────────────────────────────────────
 
     async def _transcribe_buffer(self, ctx: VoiceContext) -> None:
@@ -510,8 +836,14 @@ class BaseVoiceInterface:
         Transcribe accumulated audio, run speaker ID, dispatch to LLM.
 
         Takes a snapshot of ctx.frames_np before clearing, so debug WAV
-        saving and Whisper operate on the same consistent buffer.
+        saving and Whisper operate on the same consistent buffer. Under
+        incremental ASR only the audio after the last committed pause is
+        decoded here; the rest was transcribed while the user was speaking.
         """
+        # Held back from ctx until the utterance turns out to be a real turn,
+        # so a discarded buffer doesn't leave a stale trace behind
+        trace, ctx.trace = ctx.trace, None
+
         if ctx.frames_np.size == 0:
             ctx.rx_paused = False
             return
@@ -526,6 +858,7 @@ class BaseVoiceInterface:
 
         # Snapshot before clearing so nothing races with incoming audio
         audio_snapshot = ctx.frames_np.copy()
+        partial        = ctx.asr
         ctx.reset_audio()
         ctx.rx_paused = True
 
@@ -533,28 +866,27 @@ class BaseVoiceInterface:
         if self.core_processor.config.debug.record_audio:
             self._save_debug_wav(ctx, audio_snapshot)
 
-        # Transcribe
+        # A partial decode still running covers audio the tail won't — wait for it
+        if partial is not None and partial.task is not None:
+            with span(trace, 'asr_partial_wait'):
+                await asyncio.shield(partial.task)
+
+        # Transcribe (just the uncommitted tail, under incremental ASR)
+        committed = partial.committed if partial is not None else 0
+        prefix    = partial.text() if partial is not None else ""
+        tail      = audio_snapshot[committed:]
+        # Nothing voiced since the last commit — the tail is the silence timeout
+        tail_silent = partial is not None and committed > 0 and partial.voice_end <= committed
         try:
-            async with self._whisper_pool as whisper:
-                def do_transcribe():
-                    return whisper.transcribe(
-                        audio_snapshot,
-                        language                  = 'en',
-                        no_speech_threshold       = None,
-                        log_prob_threshold        = None,
-                        compression_ratio_threshold = None,
-                    )
-                segments, _ = await asyncio.to_thread(do_transcribe)
+            with span(trace, 'asr', audio_s=round(tail.size / INTERNAL_RATE, 2),
+                      committed_s=round(committed / INTERNAL_RATE, 2)):
+                tail_text = "" if tail_silent else await self._whisper_text(tail, prompt=prefix)
         except Exception:
             log.error("ASR error", exc_info=True)
             ctx.rx_paused = False
             return
 
-        if not segments:
-            ctx.rx_paused = False
-            return
-
-        text = " ".join(seg.text for seg in segments).strip()
+        text = " ".join(t for t in (prefix, tail_text) if t).strip()
         log.info("Transcription", extra={'data': f"{ctx.endpoint_id} {text!r}"})
 
         if not text or re.fullmatch(r'[\s.…]+', text):
@@ -569,13 +901,67 @@ class BaseVoiceInterface:
         await self.on_thinking(ctx)
 
         # Collect speaker ID result (started at voice onset)
-        ctx.identified_speaker = ctx.speaker_id.result(timeout=0)
+        with span(trace, 'speaker_id_wait'):
+            ctx.identified_speaker = ctx.speaker_id.result(timeout=0)
         if ctx.identified_speaker:
             log.info("Speaker identified",
                      extra={'data': f"{ctx.endpoint_id} {ctx.identified_speaker!r}"})
 
+        ctx.trace = trace
         await self._contact_core(ctx, text)
 
+    async def _whisper_text(self, audio: np.ndarray, prompt: str = "") -> str:
+        """Decode audio on the whisper pool and return the joined segment text."""
+        async with self._whisper_pool as whisper:
+            def do_transcribe():
+                segments, _ = whisper.transcribe(
+                    audio,
+                    language                  = 'en',
+                    initial_prompt            = prompt or None,
+                    no_speech_threshold       = None,
+                    log_prob_threshold        = None,
+                    compression_ratio_threshold = None,
+                )
+                # segments is a lazy generator — decode here, not on the event loop
+                return " ".join(seg.text for seg in segments).strip()
+            return await asyncio.to_thread(do_transcribe)
+
+    # ── Incremental ASR ───────────────────────────────────────────────────────
+
+    def _mark_asr_cut(self, ctx: VoiceContext) -> None:
+        """
+        The speaker has paused for asr_commit_gap_s: everything recorded so
+        far ends in silence and can be decoded now. Starts a partial decode
+        unless one is already running (it picks up the new cut when done).
+        """
+        partial = ctx.asr
+        partial.cut = ctx.frames_np.size
+        if partial.task is None:
+            partial.task = asyncio.create_task(self._partial_asr(ctx, partial))
+
+    async def _partial_asr(self, ctx: VoiceContext, partial: PartialTranscript) -> None:
+        """Decode and commit frames_np[committed:cut] until caught up with the last pause."""
+        min_samples = int(self.core_processor.config.voice.asr_min_segment_s * INTERNAL_RATE)
+        try:
+            while ctx.asr is partial and partial.cut - partial.committed >= min_samples:
+                start, end = partial.committed, partial.cut
+                audio      = ctx.frames_np[start:end].copy()
+                t0         = time.monotonic()
+                try:
+                    text = await self._whisper_text(audio, prompt=partial.text())
+                except Exception:
+                    log.error("Partial ASR error", exc_info=True)
+                    return   # the end-of-utterance decode covers it
+                if text and not re.fullmatch(r'[\s.…]+', text):
+                    partial.texts.append(text)
+                partial.committed = end
+                log.debug("Partial transcription", extra={'data': (
+                    f"{ctx.endpoint_id} {(end - start) / INTERNAL_RATE:.1f}s "
+                    f"in {time.monotonic() - t0:.2f}s {text!r}"
+                )})
+        finally:
+            partial.task = None
+
     def _save_debug_wav(self, ctx: VoiceContext, audio: np.ndarray) -> None:
         cfg        = self.core_processor.config.debug
         record_dir = cfg.record_dir
@@ -606,6 +992,7 @@ class BaseVoiceInterface:
         if ctx.recording and ctx.frames_np.size > 0:
             ctx.recording     = False
             ctx.last_voice_ts = None
+            ctx.trace         = self._start_trace(ctx)
             await self._transcribe_buffer(ctx)
 
     async def _process_audio_chunk(self, ctx: VoiceContext, chunk_f32: np.ndarray) -> None:
@@ -623,39 +1010,51 @@ class BaseVoiceInterface:
         # Discard incoming audio while speaking/processing, but keep the
         # buffers clean so we don't dump stale audio on the next utterance.
         if ctx.rx_paused:
-            ctx.vad_buffer = np.array([], dtype=np.float32)
+            ctx.vad_buffer.clear()
             ctx.reset_audio()
             return
 
         # Pre-buffer to VAD_MIN_SAMPLES before feeding Silero
-        ctx.vad_buffer = np.concatenate((ctx.vad_buffer, chunk_f32))
-        if len(ctx.vad_buffer) < VAD_MIN_SAMPLES:
+        ctx.vad_buffer.append(chunk_f32)
+        if ctx.vad_buffer.size < VAD_MIN_SAMPLES:
             return
 
-        vad_chunk      = ctx.vad_buffer[:VAD_MIN_SAMPLES]
-        ctx.vad_buffer = ctx.vad_buffer[VAD_MIN_SAMPLES:]
+        # Zero-copy window — only this context's next chunk can overwrite it,
+        # and that isn't fed in until this call returns
+        vad_chunk = ctx.vad_buffer.consume(VAD_MIN_SAMPLES)
 
-        voice_detected = ctx.vad(audio_frame=vad_chunk)
+        if self._vad_service is not None:
+            voice_detected = await ctx.vad.detect(vad_chunk)
+            if ctx.rx_paused:
+                return   # a turn started while the batch ran
+        else:
+            voice_detected = ctx.vad(audio_frame=vad_chunk)
+        self.core_processor.metrics.vad_chunks.labels(interface=ctx.interface_mode.value).inc()
 
         if voice_detected:
             if not ctx.recording:
                 ctx.recording = True
                 ctx.clear_interrupt()
+                if self.core_processor.config.voice.incremental_asr:
+                    ctx.asr = PartialTranscript()
 
                 # Prepend lookback so we don't lose the onset of the utterance
                 if ctx.lookback.size > 0:
-                    ctx.add_frames(ctx.lookback)
+                    ctx.add_frames(ctx.lookback.view())
 
                 # Start speaker ID as soon as voice begins
                 ctx.speaker_id.start(
                     get_frames   = lambda: ctx.frames_np,
                     is_recording = lambda: ctx.recording,
                 )
+                self._start_prefill(ctx)
                 await self.on_vad_triggered(ctx)
 
             ctx.last_voice_ts = time.monotonic()
             ctx.silence_samples = 0
             ctx.add_frames(vad_chunk)
+            if ctx.asr is not None:
+                ctx.asr.voice_end = ctx.frames_np.size
 
         elif ctx.recording:
             # Continue accumulating during brief silences — this preserves
@@ -665,7 +1064,17 @@ class BaseVoiceInterface:
             ctx.silence_samples += len(vad_chunk)
             silence_s = ctx.silence_samples / INTERNAL_RATE
 
+            if ctx.asr is not None:
+                gap = int(self.core_processor.config.voice.asr_commit_gap_s * INTERNAL_RATE)
+                if ctx.silence_samples - len(vad_chunk) < gap <= ctx.silence_samples:
+                    self._mark_asr_cut(ctx)
+
             if silence_s > self.vad_timeout:
+                # The turn's clock starts where speech ended, not where we noticed
+                now       = time.monotonic()
+                ctx.trace = self._start_trace(ctx, t0=now - silence_s)
+                if ctx.trace is not None:
+                    ctx.trace.add('vad_silence', ctx.trace.t0, now)
                 await self.on_vad_silence_timeout(ctx)
                 ctx.recording     = False
                 ctx.last_voice_ts = None
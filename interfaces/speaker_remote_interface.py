@@ -109,6 +109,8 @@ class SpeakerRemoteInterface(BaseVoiceInterface):
         sri.send_relay_message(endpoint_id, message)
     """
 
+    wire_rate = INTERNAL_RATE
+
     def __init__(
         self,
         core_processor,
@@ -129,6 +131,7 @@ class SpeakerRemoteInterface(BaseVoiceInterface):
             whisper_model_size      = whisper_model_size,
             piper_max_concurrent    = piper_max_concurrent,
             whisper_max_concurrent  = whisper_max_concurrent,
+            vad_service             = vad,
         )
 
         # ── Endpoint registry ─────────────────────────────────────────────────
@@ -1,10 +1,9 @@
 import asyncio
 import aiohttp
 import uuid
-import threading
 import base64
 from core.interface_mode import InterfaceMode
-from core.session_state import KEY_INTERFACE_MODE, get_response_queue, DISCARD_ACCUMULATED
+from core.session_state import KEY_INTERFACE_MODE, DISCARD_ACCUMULATED
 from core.session_reaper import SessionReaper
 
 from core.logger import get_logger
@@ -168,33 +167,7 @@ class TelegramInterface:
             self._last_typing[chat_id] = now
 
             # ── LLM processing ────────────────────────────────────────────────────
-            thread = threading.Thread(
-                target=self.core_processor.process_input,
-                kwargs={
-                    "input_text": text,
-                    "session_id": session_id,
-                },
-                daemon=True,
-            )
-            thread.start()
-
-            # Drain the response queue, refreshing the typing indicator as chunks
-            # arrive so Telegram keeps showing it throughout generation.
-            core_session = self.core_processor.get_session(session_id)
-            response     = []
-            while True:
-                chunk = await asyncio.to_thread(get_response_queue(core_session).get)
-                if chunk is None:
-                    break
-                if chunk == DISCARD_ACCUMULATED:
-                    response.clear()   # pre-tool text already sent as its own message
-                    continue
-                response.append(chunk)
-                await self._maybe_send_typing(chat_id)
-
-            full_response = "".join(response).strip()
-            if full_response:
-                await self.send_message(chat_id, full_response)
+            await self._run_turn(chat_id, session_id, text)
 
     async def _handle_photo(self, chat_id: str, photo: list, caption: str):
         """Download photo and route through core with image content."""
@@ -222,32 +195,32 @@ class TelegramInterface:
             await self._send_typing(chat_id)
             self._last_typing[chat_id] = asyncio.get_event_loop().time()
 
-            thread = threading.Thread(
-                target=self.core_processor.process_input,
-                kwargs={
-                    "input_text": prompt,
-                    "session_id": session_id,
-                    "images":     [base64.b64encode(image_bytes).decode('ascii')],
-                },
-                daemon=True,
+            await self._run_turn(
+                chat_id, session_id, prompt,
+                images=[base64.b64encode(image_bytes).decode('ascii')],
             )
-            thread.start()
 
-            core_session = self.core_processor.get_session(session_id)
-            response     = []
-            while True:
-                chunk = await asyncio.to_thread(get_response_queue(core_session).get)
-                if chunk is None:
-                    break
-                if chunk == DISCARD_ACCUMULATED:
-                    response.clear()   # pre-tool text already sent as its own message
-                    continue
-                response.append(chunk)
-                await self._maybe_send_typing(chat_id)
-
-            full_response = "".join(response).strip()
-            if full_response:
-                await self.send_message(chat_id, full_response)
+    async def _run_turn(self, chat_id: str, session_id: str, text: str, images: list = None):
+        """
+        Stream one turn from core and send the reply as a single message,
+        refreshing the typing indicator as chunks arrive so Telegram keeps
+        showing it throughout generation.
+        """
+        response = []
+        async for chunk in self.core_processor.process_input_async(
+            input_text = text,
+            session_id = session_id,
+            images     = images,
+        ):
+            if chunk == DISCARD_ACCUMULATED:
+                response.clear()   # pre-tool text already sent as its own message
+                continue
+            response.append(chunk)
+            await self._maybe_send_typing(chat_id)
+
+        full_response = "".join(response).strip()
+        if full_response:
+            await self.send_message(chat_id, full_response)
 
     async def _download_photo(self, file_id: str) -> bytes | None:
         """Download a photo from Telegram, return raw bytes."""
@@ -0,0 +1,204 @@
+"""
+tts_cache.py — Synthesised-phrase audio cache for Piper.
+
+The same short phrases are spoken over and over: the phone greeting, the
+slow-response notice, tool acknowledgements, "Done.", "Timer set.". Each
+one used to cost a full Piper run (plus a resample to the wire rate)
+before the first sample went out. TTSCache keeps their audio, already
+resampled to the rate the transport sends, so they play at once.
+
+Content-addressed: the key is a hash of the normalised text (whitespace
+collapsed, case kept, since Piper reads "US" and "us" differently), the
+voice model file and the SynthesisConfig. Changing any of them misses
+rather than replaying stale audio. Audio is stored per wire rate
+(16 kHz for satellites, 8 kHz for the phone line), so a hit goes straight
+to _deliver_audio with nothing left to resample.
+
+Two tiers:
+  - memory: LRU of float32 arrays, memory_entries long.
+  - disk:   <dir>/<key>_<rate>.npy as int16, survives restarts. Kept to
+            disk_entries files, oldest dropped first, on every write. A
+            relative dir is resolved against the project root (default
+            data/tts_cache).
+
+Only sentences up to max_chars are cached, and only from the second time
+one is spoken: most LLM sentences never come back, and storing each one
+would cost a resample and a disk write for nothing. Phrases in `prewarm`
+are synthesised (or loaded from disk) in the background when the
+interface starts.
+
+Usage:
+    cache = TTSCache(config.tts_cache, voice_id(config.voice.model_path, syn_config))
+    key   = cache.key("Timer set.")            # None if not cacheable
+    audio = cache.get(key, 16000)              # memory only, safe on the event loop
+    if audio is None:
+        audio = cache.load(key, 16000)         # file I/O, None if absent — call from a thread
+    if cache.repeated(key):                    # after synthesising: worth keeping?
+        cache.put(key, 16000, audio_f32, 22050)   # resamples, stores both tiers
+"""
+
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict, deque
+from dataclasses import asdict, is_dataclass
+from typing import Optional
+
+import numpy as np
+import resampy
+
+from core.logger import get_logger
+log = get_logger('tts_cache')
+
+
+def voice_id(model_path: str, syn_config) -> str:
+    """Identity of a voice + synthesis settings, for cache keys."""
+    try:
+        stat  = os.stat(model_path)
+        model = f"{os.path.abspath(model_path)}:{stat.st_size}:{int(stat.st_mtime)}"
+    except OSError:
+        model = os.path.abspath(model_path)
+    settings = asdict(syn_config) if is_dataclass(syn_config) else vars(syn_config)
+    return f"{model}|{sorted(settings.items())}"
+
+
+class TTSCache:
+    """Memory LRU over an on-disk store. Thread-safe; see module docstring."""
+
+    def __init__(self, config, voice: str):
+        self.config  = config
+        self.voice   = voice
+        self._memory: OrderedDict = OrderedDict()   # (key, rate) -> float32 array
+        self._seen:   OrderedDict = OrderedDict()   # key -> times synthesised, bounded
+        self._files:  deque       = deque()         # cache file paths, oldest first
+        self._lock   = threading.Lock()
+        self.hits    = 0
+        self.misses  = 0
+        self.dir     = config.dir
+        if not os.path.isabs(self.dir):
+            project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            self.dir     = os.path.join(project_root, self.dir)
+        if config.enabled:
+            os.makedirs(self.dir, exist_ok=True)
+            self._scan_disk()
+
+    # ── Keys ──────────────────────────────────────────────────────────────────
+
+    def key(self, text: str) -> Optional[str]:
+        """Cache key for text, or None if caching is off or the text is too long."""
+        text = re.sub(r'\s+', ' ', text).strip()
+        if not self.config.enabled or not text or len(text) > self.config.max_chars:
+            return None
+        return hashlib.sha1(f"{self.voice}|{text}".encode()).hexdigest()
+
+    def _path(self, key: str, rate: int) -> str:
+        return os.path.join(self.dir, f"{key}_{rate}.npy")
+
+    # ── Lookup ────────────────────────────────────────────────────────────────
+
+    def get(self, key: Optional[str], rate: int) -> Optional[np.ndarray]:
+        """Audio at rate from memory, or None. Never touches disk."""
+        if key is None:
+            return None
+        with self._lock:
+            audio = self._memory.get((key, rate))
+            if audio is None:
+                self.misses += 1
+                return None
+            self._memory.move_to_end((key, rate))
+            self.hits += 1
+        return audio
+
+    def load(self, key: Optional[str], rate: int) -> Optional[np.ndarray]:
+        """
+        Read audio from disk into memory, or None if it isn't there.
+        Blocking — call off the event loop.
+        """
+        if key is None:
+            return None
+        try:
+            audio = np.load(self._path(key, rate)).astype(np.float32) / 32767.0
+        except FileNotFoundError:
+            return None
+        except Exception:
+            log.warning("Unreadable TTS cache entry", extra={'data': self._path(key, rate)})
+            return None
+        self._remember(key, rate, audio)
+        return audio
+
+    # ── Store ─────────────────────────────────────────────────────────────────
+
+    def repeated(self, key: Optional[str]) -> bool:
+        """
+        Count one synthesis of key. True from the second one on — the
+        phrase has come back, so put() it. Cheap, safe on the event loop.
+        """
+        if key is None:
+            return False
+        with self._lock:
+            count = self._seen.pop(key, 0) + 1
+            self._seen[key] = count
+            while len(self._seen) > 4 * self.config.memory_entries:
+                self._seen.popitem(last=False)
+        return count > 1
+
+    def put(self, key: Optional[str], rate: int, audio_f32: np.ndarray, src_rate: int) -> Optional[np.ndarray]:
+        """
+        Resample audio to rate and store it in both tiers. Blocking — call
+        off the event loop. Returns the stored array.
+        """
+        if key is None or audio_f32.size == 0:
+            return None
+        audio = np.asarray(audio_f32, dtype=np.float32).reshape(-1)
+        if src_rate != rate:
+            audio = resampy.resample(audio, src_rate, rate).astype(np.float32)
+        audio = np.clip(audio, -1.0, 1.0)
+        self._remember(key, rate, audio)
+
+        path = self._path(key, rate)
+        tmp  = f"{path}.tmp.npy"
+        try:
+            np.save(tmp, (audio * 32767.0).astype(np.int16))
+            os.replace(tmp, path)
+        except OSError:
+            log.warning("TTS cache write failed", extra={'data': path}, exc_info=True)
+            return audio
+        with self._lock:
+            if path not in self._files:
+                self._files.append(path)
+            excess = [self._files.popleft() for _ in range(len(self._files) - self.config.disk_entries)]
+        for old in excess:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+        return audio
+
+    def _remember(self, key: str, rate: int, audio: np.ndarray) -> None:
+        with self._lock:
+            self._memory[(key, rate)] = audio
+            self._memory.move_to_end((key, rate))
+            while len(self._memory) > self.config.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _scan_disk(self) -> None:
+        """Index the files already on disk, oldest first, pruned to disk_entries."""
+        try:
+            files = [os.path.join(self.dir, f) for f in os.listdir(self.dir) if f.endswith('.npy')]
+            files.sort(key=lambda p: os.path.getmtime(p))
+        except OSError:
+            return
+        excess = max(0, len(files) - self.config.disk_entries)
+        for path in files[:excess]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self._files.extend(files[excess:])
+        if excess:
+            log.info("TTS cache pruned", extra={'data': f"{excess} files"})
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'entries': len(self._memory), 'hits': self.hits, 'misses': self.misses}
@@ -12,8 +12,25 @@ Public API is backwards-compatible with the original VoiceActivityDetector:
 
 The lower-level SileroVAD class is also importable if you need direct access
 to the ONNX session (e.g. for batch inference or state management).
+
+Batched service
+───────────────
+With several satellites and a phone call streaming at once, one ONNX run
+per window per stream on the event loop adds up. BatchedVAD shares one
+session between every stream. Each stream keeps its own LSTM state, so a
+batch is just the streams' states stacked along the batch axis. Windows
+submitted in the same event-loop tick are run together in one
+session.run on a worker thread, and the loop never blocks on inference.
+Windows that arrive while a batch is running go into the next one.
+
+    service = BatchedVAD(threshold=0.5)          # one per process
+    stream  = service.stream()                   # one per call / connection
+    is_speech: bool = await stream.detect(window)
+    stream.reset()                               # between utterances / speakers
 """
 
+import asyncio
+import concurrent.futures
 import os
 import subprocess
 import numpy as np
@@ -102,16 +119,25 @@ class SileroVAD:
                 f"(minimum {min_samples} @ {sample_rate} Hz)"
             )
 
+        out, self._h, self._c = self.run_batch(x, self._h, self._c, sample_rate)
+
+        # out shape: (1, 1) — scalar speech probability
+        return float(out[0, 0])
+
+    def run_batch(self, x: np.ndarray, h: np.ndarray, c: np.ndarray, sample_rate: int):
+        """
+        Stateless inference over a batch: x is (batch, samples), h and c are
+        (2, batch, 64). Returns (probabilities (batch, 1), h, c). Doesn't
+        touch this instance's own state, so it's safe to share between streams.
+        """
         ort_inputs = {
             'input': x,
-            'h':     self._h,
-            'c':     self._c,
+            'h':     h,
+            'c':     c,
             'sr':    np.array(sample_rate, dtype=np.int64),
         }
-        out, self._h, self._c = self.session.run(None, ort_inputs)
-
-        # out shape: (1, 1) — scalar speech probability
-        return float(out[0, 0])
+        out, h, c = self.session.run(None, ort_inputs)
+        return out, h, c
 
 
 class VoiceActivityDetector:
@@ -150,4 +176,118 @@ class VoiceActivityDetector:
             True if speech probability exceeds self.threshold.
         """
         prob = self._model(audio_frame, self.frame_rate)
-        return prob > self.threshold
\ No newline at end of file
+        return prob > self.threshold
+
+# ── Batched service ───────────────────────────────────────────────────────────
+
+class VADStream:
+    """
+    One audio stream's view of a BatchedVAD: its own LSTM state and
+    threshold, sharing the service's ONNX session. Feed windows one at a
+    time (await each detect() before the next), as the voice pipeline does.
+    """
+
+    def __init__(self, service: 'BatchedVAD', threshold: float):
+        self.service   = service
+        self.threshold = threshold
+        self._gen      = 0
+        self.reset()
+
+    def reset(self) -> None:
+        """Zero the LSTM state. A batch already in flight won't write its state back."""
+        self._h   = np.zeros((2, 1, 64), dtype=np.float32)
+        self._c   = np.zeros((2, 1, 64), dtype=np.float32)
+        self._gen += 1
+
+    async def probability(self, audio_frame: np.ndarray) -> float:
+        return await self.service.submit(self, audio_frame)
+
+    async def detect(self, audio_frame: np.ndarray) -> bool:
+        """True if the window's speech probability exceeds the threshold."""
+        return await self.service.submit(self, audio_frame) > self.threshold
+
+
+class BatchedVAD:
+    """
+    Silero VAD for many streams at once: windows queued in the same
+    event-loop tick run as one batch on a single worker thread.
+    """
+
+    def __init__(
+        self,
+        threshold:  float = 0.5,
+        frame_rate: int   = 16000,
+        max_batch:  int   = 32,
+        force_cpu:  bool  = True,
+    ):
+        self.threshold  = threshold
+        self.frame_rate = frame_rate
+        self.max_batch  = max(1, max_batch)
+        self._model     = SileroVAD(force_cpu=force_cpu)
+        self._executor  = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='vad')
+        self._pending   = []      # (stream, window, generation, future)
+        self._draining  = False
+        self.batches    = 0
+        self.windows    = 0
+
+    def stream(self, threshold: float = None) -> VADStream:
+        return VADStream(self, self.threshold if threshold is None else threshold)
+
+    async def submit(self, stream: VADStream, audio_frame: np.ndarray) -> float:
+        """Queue one window for stream and wait for its speech probability."""
+        loop   = asyncio.get_running_loop()
+        future = loop.create_future()
+        # Copied: the caller's window may be a view into a buffer it reuses
+        window = np.array(audio_frame, dtype=np.float32).reshape(-1)
+        self._pending.append((stream, window, stream._gen, future))
+        if not self._draining:
+            self._draining = True
+            loop.create_task(self._drain())
+        return await future
+
+    async def _drain(self) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while self._pending:
+                # One tick so every stream with a window ready this tick joins the batch
+                await asyncio.sleep(0)
+                batch = self._take_batch()
+                x = np.stack([window for _, window, _, _ in batch])
+                h = np.concatenate([stream._h for stream, _, _, _ in batch], axis=1)
+                c = np.concatenate([stream._c for stream, _, _, _ in batch], axis=1)
+                try:
+                    probs, h, c = await loop.run_in_executor(
+                        self._executor, self._model.run_batch, x, h, c, self.frame_rate)
+                except Exception as e:
+                    for _, _, _, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+
+                self.batches += 1
+                self.windows += len(batch)
+                for i, (stream, _, gen, future) in enumerate(batch):
+                    if stream._gen == gen:
+                        stream._h = h[:, i:i + 1].copy()
+                        stream._c = c[:, i:i + 1].copy()
+                    if not future.done():
+                        future.set_result(float(probs[i, 0]))
+        finally:
+            self._draining = False
+
+    def _take_batch(self) -> list:
+        """
+        Up to max_batch pending windows of equal length, one per stream
+        (a stream's next window needs the state its previous one produces).
+        """
+        batch, rest, seen = [], [], set()
+        size = self._pending[0][1].size
+        for item in self._pending:
+            stream, window = item[0], item[1]
+            if len(batch) < self.max_batch and id(stream) not in seen and window.size == size:
+                seen.add(id(stream))
+                batch.append(item)
+            else:
+                rest.append(item)
+        self._pending = rest
+        return batch
@@ -1,9 +1,8 @@
 import gradio as gr
 import uuid
-import threading
 import time
 from core.interface_mode import InterfaceMode
-from core.session_state import KEY_INTERFACE_MODE, get_response_queue
+from core.session_state import KEY_INTERFACE_MODE
 from core.session_reaper import SessionReaper
 
 
@@ -107,25 +106,16 @@ class WebInterface:
 
         choices = self._user_choices()
 
-        def process_message(message, history, token):
+        async def process_message(message, history, token):
             if not token:
                 token = str(uuid.uuid4())   # defensive: load event missed
             session_id = self._ensure_session(token)
 
-            t = threading.Thread(
-                target = self.core_processor.process_input,
-                kwargs = {"input_text": message, "session_id": session_id},
-                daemon = True,
-            )
-            t.start()
-
-            session            = self.core_processor.get_session(session_id)
             assistant_response = ""
-
-            while True:
-                chunk = get_response_queue(session).get()
-                if chunk is None:
-                    return
+            async for chunk in self.core_processor.process_input_async(
+                input_text = message,
+                session_id = session_id,
+            ):
                 assistant_response += chunk
                 yield {"role": "assistant", "content": assistant_response}
 
@@ -17,7 +17,7 @@ from interfaces.telegram_interface import TelegramInterface
 # Shared inference instances — created once here so no interface loads its own.
 # Both Whisper and VAD are passed into whichever interfaces need them.
 from faster_whisper import WhisperModel
-from interfaces.vad import VoiceActivityDetector
+from interfaces.vad import BatchedVAD
 from piper import PiperVoice
 
 if __name__ == "__main__":
@@ -32,7 +32,7 @@ if __name__ == "__main__":
 
     # Shared inference instances — created once, passed into all interfaces
     whisper_model = WhisperModel(model_size_or_path="base.en")
-    vad           = VoiceActivityDetector(threshold=0.5, frame_rate=16000)
+    vad           = BatchedVAD(threshold=0.5, frame_rate=16000, max_batch=config.voice.vad_max_batch)
     piper_voice   = PiperVoice.load(
         config.voice.model_path,
         use_cuda=config.voice.use_cuda,
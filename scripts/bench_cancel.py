@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+bench_cancel.py — How long does a barge-in leave the LLM slot busy?
+
+Streams a chat completion from the mock server (scripts/mock_llm_server.py,
+started in-process) through the same client setup as CoreProcessor: an
+openai client whose httpx hook attaches each response to a StreamHandle.
+It cancels partway through and reports how long the server kept the slot
+after the cancel.
+
+Two ways of cancelling are compared:
+    abort  — StreamHandle.abort(), what cancel_active_response() does now
+    flag   — the old behaviour: the read loop stops at the next chunk and
+             leaves the HTTP response open
+
+Each is tried during prompt processing and mid-generation.
+
+Usage:
+    python3 scripts/bench_cancel.py
+    python3 scripts/bench_cancel.py --runs 10 --ttft-ms 800 --tps 30
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+import openai
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from core.stream_handle import StreamHandle
+from mock_llm_server import serve
+
+
+def run_once(client, local, base: str, mode: str, cancel_after_s: float) -> float | None:
+    """One streamed request cancelled after cancel_after_s. Returns seconds the slot stayed busy."""
+    requests.post(f"{base}/mock/reset", timeout=5)
+    cancel = threading.Event()
+    handle = StreamHandle()
+    kept   = []   # flag mode: keep the abandoned stream referenced, as the old code did
+
+    def stream():
+        local.handle = handle
+        try:
+            s = client.chat.completions.create(
+                model='mock', messages=[{'role': 'user', 'content': 'hi'}],
+                stream=True, extra_body={'id_slot': 0},
+            )
+            handle.stream = s
+            kept.append(s)
+            for _ in s:
+                if cancel.is_set():
+                    break
+            if mode == 'abort':
+                handle.close()
+        except Exception:
+            handle.close()   # abort() cut the connection — expected
+        finally:
+            local.handle = None
+
+    worker = threading.Thread(target=stream, daemon=True)
+    worker.start()
+    time.sleep(cancel_after_s)
+
+    t_cancel = time.time()
+    cancel.set()
+    if mode == 'abort':
+        handle.abort()
+
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        records = requests.get(f"{base}/mock/requests", timeout=5).json()
+        if records and records[0]['freed'] is not None:
+            worker.join(timeout=5)
+            return records[0]['freed'] - t_cancel
+        time.sleep(0.002)
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port',      type=int,   default=8089)
+    parser.add_argument('--runs',      type=int,   default=5)
+    parser.add_argument('--ttft-ms',   type=float, default=500)
+    parser.add_argument('--tps',       type=float, default=40)
+    args = parser.parse_args()
+
+    serve(args.port, slots=1, ttft_ms=args.ttft_ms, tps=args.tps)
+    base  = f"http://127.0.0.1:{args.port}"
+    local = threading.local()
+
+    def hook(response):
+        handle = getattr(local, 'handle', None)
+        if handle is not None:
+            handle.attach(response)
+
+    client = openai.OpenAI(
+        base_url    = f"{base}/v1",
+        api_key     = "not-needed",
+        http_client = openai.DefaultHttpxClient(event_hooks={'response': [hook]}),
+    )
+
+    points = {
+        'prompt': args.ttft_ms / 2000,
+        'tokens': args.ttft_ms / 1000 + 10 / args.tps,
+    }
+
+    print(f"{'mode':<6} {'cancel during':<14} {'slot busy after cancel (ms)':>28}")
+    for mode in ('abort', 'flag'):
+        for label, after in points.items():
+            busy = [run_once(client, local, base, mode, after) for _ in range(args.runs)]
+            done = [b * 1000 for b in busy if b is not None]
+            if not done:
+                print(f"{mode:<6} {label:<14} {'timed out':>28}")
+                continue
+            print(f"{mode:<6} {label:<14} {statistics.median(done):>14.1f} median  {max(done):>7.1f} max")
+
+
+if __name__ == '__main__':
+    main()
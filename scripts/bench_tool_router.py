@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+bench_tool_router.py — What does the tool router save, and what does it cost?
+
+Loads the real tools the way CoreProcessor does, then plays scripted
+conversations through ToolRouter.select(). Nothing is sent to an LLM. For
+each turn it records:
+
+    tools / tokens   tools offered and the size of their schema JSON
+                     (tokens estimated with history.chars_per_token), against
+                     the full get_tools() list
+    route_ms         time in select(): query embedding plus ranking
+    changed          whether the offered set differs from the previous turn.
+                     Each change invalidates the KV cache behind the tools block
+    hit              whether the tool the turn obviously needs was offered.
+                     Turns whose expected tool isn't loaded are skipped
+
+--embedder mock starts scripts/mock_llm_server.py in-process and uses its
+hashed bag-of-words embeddings. That is good enough to check the plumbing
+and the stickiness, but it says nothing about real ranking quality. Use
+chromadb (local) or a real ollama/openai embeddings server for hit rates.
+
+Usage:
+    python3 scripts/bench_tool_router.py
+    python3 scripts/bench_tool_router.py --embedder ollama --host http://localhost:11434 --model nomic-embed-text
+    python3 scripts/bench_tool_router.py --embedder mock --top-k 4 --interface speaker
+"""
+
+import argparse
+import json
+import math
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(__file__))
+
+from core.core import CoreProcessor
+from core.interface_mode import InterfaceMode
+from core.session_state import KEY_HISTORY, KEY_INTERFACE_MODE
+from core.settings import load_config
+from core.tool_router import ToolRouter
+
+HASS = {'HassTurnOn', 'HassTurnOff', 'HassLightSet', 'HassGetState'}
+
+# Each conversation is one session: (user input, tools that would do, or None)
+CONVERSATIONS = [
+    [
+        ("What's the weather like tomorrow?",               {'check_weather'}),
+        ("Will I need an umbrella in the afternoon?",       {'check_weather'}),
+        ("Add bread and milk to the shopping list",         {'add_to_list'}),
+        ("Actually take the milk off",                      {'remove_from_list'}),
+        ("Thanks, that's all",                              None),
+    ],
+    [
+        ("When's the next train into the city?",            {'get_next_train_departures'}),
+        ("I need to be at Flinders Street by nine",         {'get_train_departures_by_arrival', 'get_next_train_departures'}),
+        ("Set a timer for ten minutes",                     {'set_timer'}),
+        ("Turn off the kitchen lights",                     HASS),
+    ],
+    [
+        ("Find me a recipe for a quick vegetarian curry",   {'search_recipes'}),
+        ("Show me the full method for the first one",       {'get_recipe'}),
+        ("Put the ingredients on the shopping list",        {'add_to_list'}),
+        ("Remember that Sam doesn't eat coriander",         {'store_memory'}),
+        ("What did we talk about last week?",               {'recall_conversations', 'search_memory'}),
+    ],
+    [
+        ("Search the web for reviews of the new Pixel phone", {'perform_search'}),
+        ("Open the first review",                           {'open_website'}),
+        ("Email me a summary of it",                        {'send_email', 'contact_user'}),
+        ("Switch to deep research mode",                    {'switch_agent_mode'}),
+    ],
+]
+
+
+def percentile(values: list, p: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(p / 100 * len(ordered))) - 1]
+
+
+def build(args):
+    config = load_config()
+    config.jobs.enabled    = False
+    config.metrics.enabled = False
+    config.tracing.enabled = False
+
+    router_cfg = config.tool_router
+    router_cfg.enabled          = False   # the bench drives its own router
+    router_cfg.embedder         = args.embedder
+    router_cfg.top_k            = args.top_k
+    router_cfg.max_tools        = args.max_tools
+    router_cfg.context_messages = args.context_messages
+    if args.host:
+        router_cfg.host = args.host
+    if args.model:
+        router_cfg.model = args.model
+    if args.embedder == 'mock':
+        from mock_llm_server import serve
+        serve(args.port, slots=1, ttft_ms=0, tps=0)
+        router_cfg.embedder = 'ollama'
+        router_cfg.host     = f"http://127.0.0.1:{args.port}"
+        router_cfg.model    = 'mock'
+
+    core   = CoreProcessor(config)
+    router = ToolRouter(router_cfg, core.tool_loader)
+    if not router.available:
+        sys.exit(f"Embedder {args.embedder!r} is not available")
+    return config, core, router
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--embedder',         default='chromadb', choices=['chromadb', 'ollama', 'openai', 'mock'])
+    parser.add_argument('--host',             default='')
+    parser.add_argument('--model',            default='')
+    parser.add_argument('--port',             type=int, default=8091, help="mock embedder port")
+    parser.add_argument('--top-k',            type=int, default=6)
+    parser.add_argument('--max-tools',        type=int, default=14)
+    parser.add_argument('--context-messages', type=int, default=2)
+    parser.add_argument('--interface',        default='general', choices=[m.value for m in InterfaceMode])
+    parser.add_argument('--runs',             type=int, default=5, help="passes over the script (latency samples)")
+    parser.add_argument('--verbose',          action='store_true', help="print each turn's selection")
+    args = parser.parse_args()
+
+    config, core, router = build(args)
+    mode  = InterfaceMode.from_str(args.interface)
+    tools = core.tool_loader.get_tools(interface_mode=mode)
+    names = {fn.__name__ for fn in tools}
+
+    schema_chars = {fn.__name__: len(json.dumps(core._tool_to_openai_schema(fn), ensure_ascii=False))
+                    for fn in tools}
+    cpt         = config.history.chars_per_token
+    full_tokens = sum(schema_chars.values()) / cpt
+
+    t0 = time.perf_counter()
+    router.warm(tools)
+    warm_ms = (time.perf_counter() - t0) * 1000
+
+    route_ms, offered, token_counts = [], [], []
+    changes = turns = hits = judged = 0
+    for run in range(args.runs):
+        for convo in CONVERSATIONS:
+            session  = {KEY_HISTORY: [], KEY_INTERFACE_MODE: mode}
+            previous = None
+            for text, expected in convo:
+                session[KEY_HISTORY].append({'role': 'user', 'content': text})
+                t = time.perf_counter()
+                chosen = router.select(session, tools, text)
+                route_ms.append((time.perf_counter() - t) * 1000)
+                chosen_names = [fn.__name__ for fn in chosen]
+                session[KEY_HISTORY].append({'role': 'assistant', 'content': "Done."})
+
+                if run:
+                    continue   # selections are deterministic — count them once
+                turns += 1
+                offered.append(len(chosen))
+                token_counts.append(sum(schema_chars[n] for n in chosen_names) / cpt)
+                if previous is not None and chosen_names != previous:
+                    changes += 1
+                previous = chosen_names
+                hit = None
+                if expected and expected & names:
+                    judged += 1
+                    hit = bool(expected & set(chosen_names))
+                    hits += hit
+                if args.verbose:
+                    mark = {None: ' ', True: '✓', False: '✗'}[hit]
+                    print(f"{mark} {text[:48]:<48} {len(chosen):>3} tools  {', '.join(chosen_names)}")
+
+    print(f"\ntools loaded           {len(tools)} ({args.interface}), ~{full_tokens:.0f} tokens of schema")
+    print(f"offered per turn       mean {statistics.mean(offered):.1f}   max {max(offered)}")
+    print(f"schema tokens per turn mean {statistics.mean(token_counts):.0f}   "
+          f"({100 * (1 - statistics.mean(token_counts) / full_tokens):.0f}% saved)")
+    print(f"tool set changes       {changes} in {turns - len(CONVERSATIONS)} follow-up turns "
+          f"(each one re-prefills the prompt)")
+    print(f"expected tool offered  {hits}/{judged}" if judged else "expected tool offered  n/a (none loaded)")
+    print(f"route_ms               p50 {percentile(route_ms, 50):.2f}   p99 {percentile(route_ms, 99):.2f}   "
+          f"(warm-up {warm_ms:.0f} ms for {len(tools)} descriptions)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+bench_turns.py — End-to-end turn benchmark for CoreProcessor.
+
+Runs the real core (prompt assembly, history budget, tool loop, scheduler,
+streaming) against scripts/mock_llm_server.py in a subprocess. Backend
+timing is therefore fixed and known, and what's left is our own overhead.
+Tools are swapped for one benchmark tool, bench_lookup, that sleeps
+--tool-ms, so no real tool touches the network or your data.
+
+Scenarios (each --turns turns, after --warmup discarded ones):
+    text      plain reply, no tools
+    tool      one scripted bench_lookup call, then the reply
+    parallel  two bench_lookup calls in one round, then the reply
+    headless  run_headless() with a plain prompt
+
+Reported per scenario, p50 / p99 / mean:
+    ttft_ms      process_input() call → first text chunk on the response queue
+    wall_ms      call → turn finished
+    overhead_ms  wall time when neither the backend nor a tool was busy —
+                 prompt building, tool dispatch, queueing (the tool-loop
+                 overhead for tool scenarios)
+    cpu_ms       process CPU time used by the turn (the mock runs elsewhere)
+
+Results are written as JSON (default data/bench/turns-<time>-<commit>.json).
+Pass --compare to print the change against an earlier run.
+
+Usage:
+    python3 scripts/bench_turns.py
+    python3 scripts/bench_turns.py --backend ollama --turns 50 --ttft-ms 150 --tps 60
+    python3 scripts/bench_turns.py --compare data/bench/turns-20260101-120000-abc1234.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+
+import requests
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from core.core import CoreProcessor
+from core.interface_mode import InterfaceMode
+from core.session_state import KEY_INTERFACE_MODE, get_response_queue
+from core.settings import load_config
+from core.tool_loader import ToolLoader
+
+BENCH_TOOL = '''
+import time
+from core.tool_base import ToolBase
+
+CALLS = []   # (start, end) wall-clock seconds — read by bench_turns.py
+
+
+def bench_lookup(query: str) -> str:
+    """Look up a fact. Benchmark tool — sleeps for delay_ms and echoes the query."""
+    ...
+
+
+def execute(tool_args: dict, session, core, tool_config: dict) -> str:
+    start = time.time()
+    time.sleep(tool_config.get('delay_ms', 0) / 1000)
+    CALLS.append((start, time.time()))
+    return ToolBase.result(core, 'bench_lookup', {"result": ToolBase.params(tool_args).get('query', '')})
+'''
+
+PROMPTS = {
+    'text':     "Tell me something interesting.",
+    'tool':     'Look this up. <<call bench_lookup {"query": "first"}>>',
+    'parallel': 'Look both up. <<call bench_lookup {"query": "first"}>> <<call bench_lookup {"query": "second"}>>',
+    'headless': "Summarise the benefits of tea in two sentences.",
+}
+
+
+# ── Setup ─────────────────────────────────────────────────────────────────────
+
+def start_mock(args) -> subprocess.Popen:
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, 'scripts', 'mock_llm_server.py'),
+         '--port', str(args.port), '--slots', str(args.slots),
+         '--ttft-ms', str(args.ttft_ms), '--tps', str(args.tps)],
+        stdout=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            requests.get(f"http://127.0.0.1:{args.port}/slots", timeout=1)
+            return proc
+        except requests.ConnectionError:
+            time.sleep(0.05)
+    proc.kill()
+    sys.exit("Mock server didn't start")
+
+
+def build_core(args, tool_dir: str) -> CoreProcessor:
+    config = load_config()
+    host   = f"http://127.0.0.1:{args.port}"
+
+    config.backend      = args.backend
+    config.ollama.host  = host
+    config.jobs.enabled = False
+    config.metrics.enabled = False   # don't take the live instance's port
+    config.tracing.enabled = False   # ...or add bench turns to its traces
+    config.debug.log_prompts = False
+    if config.llama_server is not None:
+        config.llama_server.host          = host
+        config.llama_server.prewarm_slots = False
+        config.llama_server.persist_slots = False
+    elif args.backend == 'llama_server':
+        sys.exit("backend llama_server needs a llama_server block in core_config.yaml")
+
+    core = CoreProcessor(config)
+
+    # Only the benchmark tool — real tools would hit the network and your data
+    with open(os.path.join(tool_dir, 'tools', 'bench_lookup.py'), 'w') as f:
+        f.write(BENCH_TOOL)
+    with open(os.path.join(tool_dir, 'config', 'bench_lookup.yaml'), 'w') as f:
+        f.write(f"parallel_safe: true\ndelay_ms: {args.tool_ms}\n")
+    core.tool_loader = ToolLoader(os.path.join(tool_dir, 'tools'), os.path.join(tool_dir, 'config'), config)
+    core._tool_schema_cache.clear()
+    core._system_message_cache.clear()
+    return core
+
+
+# ── Measurement ───────────────────────────────────────────────────────────────
+
+def busy_seconds(intervals: list, lo: float, hi: float) -> float:
+    """Length of the union of (start, end) intervals, clipped to [lo, hi]."""
+    total, cur_start, cur_end = 0.0, None, None
+    for start, end in sorted((max(s, lo), min(e, hi)) for s, e in intervals if e > lo and s < hi):
+        if cur_end is None or start > cur_end:
+            if cur_end is not None:
+                total += cur_end - cur_start
+            cur_start, cur_end = start, end
+        else:
+            cur_end = max(cur_end, end)
+    if cur_end is not None:
+        total += cur_end - cur_start
+    return total
+
+
+def run_turn(core, args, scenario: str, session_id: str) -> dict:
+    """One measured turn. Returns {'ttft', 'wall', 'cpu', 'start', 'end'} in seconds."""
+    prompt = PROMPTS[scenario]
+    cpu0   = time.process_time()
+    start  = time.time()
+    t0     = time.perf_counter()
+
+    if scenario == 'headless':
+        core.run_headless(prompt)
+        wall = time.perf_counter() - t0
+        return {'ttft': None, 'wall': wall, 'cpu': time.process_time() - cpu0, 'start': start, 'end': time.time()}
+
+    session = core.get_session(session_id)
+    q       = get_response_queue(session)
+    worker  = threading.Thread(target=core.process_input, args=(prompt, session_id), daemon=True)
+    worker.start()
+
+    ttft = None
+    while True:
+        chunk = q.get(timeout=60)
+        if chunk is None:
+            break
+        if ttft is None and isinstance(chunk, str) and chunk.strip():
+            ttft = time.perf_counter() - t0
+    worker.join(timeout=60)
+    wall = time.perf_counter() - t0
+    return {'ttft': ttft, 'wall': wall, 'cpu': time.process_time() - cpu0, 'start': start, 'end': time.time()}
+
+
+def run_scenario(core, args, scenario: str) -> list:
+    mode    = InterfaceMode.coerce(args.interface)
+    results = []
+    session_id = None
+    for i in range(args.warmup + args.turns):
+        if scenario != 'headless' and i % args.turns_per_session == 0:
+            if session_id:
+                drop_session(core, session_id)
+            session_id = f"bench-{uuid.uuid4().hex[:8]}"
+            session    = core.create_session(session_id)
+            session[KEY_INTERFACE_MODE] = mode
+            session['interface']        = args.interface
+            session['endpoint_id']      = session_id
+
+        result = run_turn(core, args, scenario, session_id)
+        if i >= args.warmup:
+            results.append(result)
+    if session_id:
+        drop_session(core, session_id)
+    return results
+
+
+def drop_session(core, session_id: str) -> None:
+    """Remove a bench session without running session-end hooks."""
+    core.sessions.pop(session_id, None)
+    if core.slot_manager is not None:
+        core.slot_manager.forget(session_id)
+
+
+def attribute_overhead(results: list, backend_calls: list, tool_calls: list) -> None:
+    """Add 'overhead' to each turn: wall time with neither backend nor tools busy."""
+    intervals = backend_calls + tool_calls
+    for r in results:
+        r['overhead'] = (r['end'] - r['start']) - busy_seconds(intervals, r['start'], r['end'])
+
+
+# ── Reporting ─────────────────────────────────────────────────────────────────
+
+def percentile(values: list, p: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1))]
+
+
+def summarise(results: list) -> dict:
+    summary = {'n': len(results)}
+    for key in ('ttft', 'wall', 'overhead', 'cpu'):
+        values = [r[key] * 1000 for r in results if r.get(key) is not None]
+        if values:
+            summary[f"{key}_ms"] = {
+                'p50':  round(percentile(values, 50), 2),
+                'p99':  round(percentile(values, 99), 2),
+                'mean': round(statistics.mean(values), 2),
+            }
+    return summary
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, timeout=10).stdout.strip() or 'unknown'
+    except Exception:
+        return 'unknown'
+
+
+def print_report(report: dict, baseline: dict = None) -> None:
+    print(f"\nbackend={report['meta']['backend']} commit={report['meta']['commit']} "
+          f"ttft_ms={report['meta']['mock']['ttft_ms']} tps={report['meta']['mock']['tps']}")
+    print(f"{'scenario':<10} {'metric':<12} {'p50':>9} {'p99':>9} {'mean':>9}" + ("   Δp50    Δp99" if baseline else ""))
+    for name, summary in report['scenarios'].items():
+        for metric in ('ttft_ms', 'wall_ms', 'overhead_ms', 'cpu_ms'):
+            stats = summary.get(metric)
+            if not stats:
+                continue
+            line = f"{name:<10} {metric:<12} {stats['p50']:>9.1f} {stats['p99']:>9.1f} {stats['mean']:>9.1f}"
+            old = ((baseline or {}).get('scenarios', {}).get(name) or {}).get(metric)
+            if old:
+                line += f" {stats['p50'] - old['p50']:>+7.1f} {stats['p99'] - old['p99']:>+7.1f}"
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backend',   choices=['llama_server', 'ollama'], default='llama_server')
+    parser.add_argument('--scenarios', default='text,tool,parallel,headless')
+    parser.add_argument('--turns',     type=int,   default=30)
+    parser.add_argument('--warmup',    type=int,   default=3)
+    parser.add_argument('--turns-per-session', type=int, default=5)
+    parser.add_argument('--interface', default='general', help="interface mode for the bench sessions")
+    parser.add_argument('--port',      type=int,   default=8089)
+    parser.add_argument('--slots',     type=int,   default=4)
+    parser.add_argument('--ttft-ms',   type=float, default=150)
+    parser.add_argument('--tps',       type=float, default=80)
+    parser.add_argument('--tool-ms',   type=float, default=50)
+    parser.add_argument('--out',       default=None, help="results file (default data/bench/turns-<time>-<commit>.json)")
+    parser.add_argument('--compare',   default=None, help="earlier results file to diff against")
+    args = parser.parse_args()
+
+    scenarios = [s.strip() for s in args.scenarios.split(',') if s.strip()]
+    unknown   = [s for s in scenarios if s not in PROMPTS]
+    if unknown:
+        sys.exit(f"Unknown scenarios: {unknown}")
+
+    mock = start_mock(args)
+    try:
+        with tempfile.TemporaryDirectory() as tool_dir:
+            os.makedirs(os.path.join(tool_dir, 'tools'))
+            os.makedirs(os.path.join(tool_dir, 'config'))
+            core = build_core(args, tool_dir)
+            tool_module = sys.modules['_supernova_tool_bench_lookup']
+
+            report = {
+                'meta': {
+                    'commit':    git_commit(),
+                    'timestamp': datetime.now().isoformat(timespec='seconds'),
+                    'backend':   args.backend,
+                    'python':    platform.python_version(),
+                    'machine':   platform.machine(),
+                    'mock':      {'ttft_ms': args.ttft_ms, 'tps': args.tps, 'tool_ms': args.tool_ms},
+                    'turns':     args.turns,
+                    'interface': args.interface,
+                },
+                'scenarios': {},
+            }
+
+            for scenario in scenarios:
+                requests.post(f"http://127.0.0.1:{args.port}/mock/reset", timeout=5)
+                tool_module.CALLS.clear()
+                print(f"Running {scenario} ({args.warmup}+{args.turns} turns)...", file=sys.stderr)
+                # The core echoes tokens to stdout — keep the report readable
+                with contextlib.redirect_stdout(io.StringIO()):
+                    results = run_scenario(core, args, scenario)
+
+                records = requests.get(f"http://127.0.0.1:{args.port}/mock/requests", timeout=5).json()
+                backend = [(r['started'], r['freed']) for r in records if r['freed']]
+                attribute_overhead(results, backend, list(tool_module.CALLS))
+                report['scenarios'][scenario] = summarise(results)
+    finally:
+        mock.terminate()
+        mock.wait(timeout=5)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    out = args.out or os.path.join(
+        ROOT, 'data', 'bench',
+        f"turns-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{report['meta']['commit']}.json",
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved {out}")
+
+
+if __name__ == '__main__':
+    main()
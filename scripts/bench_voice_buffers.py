@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+bench_voice_buffers.py — Per-chunk cost of VoiceContext's audio buffering.
+
+Replays the buffer work _process_audio_chunk does for every incoming
+chunk: VAD pre-buffer, 1600-sample window pop, lookback window, utterance
+accumulation. It runs over many satellites at once, each recording one
+long utterance, with chunks interleaved the way the event loop sees them.
+No VAD or Whisper runs; only the buffering is timed.
+
+Two implementations are compared:
+    concat  — the old code: np.concatenate / slicing on every chunk
+    arena   — interfaces/audio_buffer.AudioBuffer, as VoiceContext uses now
+
+For each one it prints the mean and p99 cost per chunk, bucketed by how
+far into the utterance the chunk arrived. With concat the cost climbs with
+utterance length (every append copies the whole utterance). With arena it
+should stay flat.
+
+Usage:
+    python3 scripts/bench_voice_buffers.py
+    python3 scripts/bench_voice_buffers.py --satellites 16 --seconds 30 --chunk 512
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from interfaces.audio_buffer import AudioBuffer
+
+RATE          = 16000
+VAD_SAMPLES   = 1600
+LOOKBACK      = RATE
+
+
+class ConcatStream:
+    """The pre-AudioBuffer VoiceContext fields and their per-chunk updates."""
+
+    def __init__(self):
+        self.frames   = np.array([], dtype=np.float32)
+        self.lookback = np.array([], dtype=np.float32)
+        self.vad      = np.array([], dtype=np.float32)
+
+    def feed(self, chunk: np.ndarray) -> None:
+        self.vad = np.concatenate((self.vad, chunk))
+        if len(self.vad) < VAD_SAMPLES:
+            return
+        window   = self.vad[:VAD_SAMPLES]
+        self.vad = self.vad[VAD_SAMPLES:]
+        window.sum()   # stands in for the VAD reading the window
+        self.frames = window.copy() if self.frames.size == 0 else np.concatenate((self.frames, window))
+        self.lookback = np.concatenate((self.lookback, window))
+        if len(self.lookback) > LOOKBACK:
+            self.lookback = self.lookback[-LOOKBACK:]
+        self.frames[-1:]   # speaker ID's get_frames()
+
+    def samples(self) -> int:
+        return self.frames.size
+
+
+class ArenaStream:
+    """The same work on AudioBuffer, as VoiceContext now does it."""
+
+    def __init__(self):
+        self.frames   = AudioBuffer(10 * RATE)
+        self.lookback = AudioBuffer(max_len=LOOKBACK)
+        self.vad      = AudioBuffer(2 * VAD_SAMPLES)
+
+    def feed(self, chunk: np.ndarray) -> None:
+        self.vad.append(chunk)
+        if self.vad.size < VAD_SAMPLES:
+            return
+        window = self.vad.consume(VAD_SAMPLES)
+        window.sum()
+        self.frames.append(window)
+        self.lookback.append(window)
+        self.frames.view()[-1:]
+
+    def samples(self) -> int:
+        return self.frames.size
+
+
+def run(stream_cls, args) -> dict:
+    """Seconds-into-utterance bucket → list of per-chunk costs in µs."""
+    rng     = np.random.default_rng(0)
+    chunks  = [rng.standard_normal(args.chunk).astype(np.float32) * 0.1 for _ in range(64)]
+    streams = [stream_cls() for _ in range(args.satellites)]
+    buckets = {}
+    n_chunks = int(args.seconds * RATE / args.chunk)
+
+    for i in range(n_chunks):
+        chunk = chunks[i % len(chunks)]
+        for stream in streams:
+            t = time.perf_counter_ns()
+            stream.feed(chunk)
+            cost = (time.perf_counter_ns() - t) / 1000
+            bucket = int(stream.samples() / RATE // args.bucket_s * args.bucket_s)
+            buckets.setdefault(bucket, []).append(cost)
+    return buckets
+
+
+def report(name: str, buckets: dict, args) -> None:
+    print(f"\n{name}")
+    print(f"  {'utterance':>12}  {'mean µs':>9}  {'p99 µs':>9}  {'chunks':>7}")
+    for start in sorted(buckets):
+        costs = sorted(buckets[start])
+        p99   = costs[min(len(costs) - 1, int(len(costs) * 0.99))]
+        label = f"{start:g}–{start + args.bucket_s:g}s"
+        print(f"  {label:>12}  {statistics.mean(costs):>9.2f}  {p99:>9.2f}  {len(costs):>7}")
+    total = [c for costs in buckets.values() for c in costs]
+    print(f"  {'all':>12}  {statistics.mean(total):>9.2f}  "
+          f"{'':>9}  {len(total):>7}  (~{sum(total) / 1000 / args.seconds:.1f} ms of loop time per second of audio)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--satellites', type=int,   default=8,   help="concurrent streams")
+    parser.add_argument('--seconds',    type=float, default=30,  help="utterance length")
+    parser.add_argument('--chunk',      type=int,   default=512, help="samples per incoming chunk")
+    parser.add_argument('--bucket-s',   type=float, default=5,   help="report bucket width in seconds")
+    args = parser.parse_args()
+
+    print(f"{args.satellites} satellites × {args.seconds:g}s utterance, {args.chunk}-sample chunks")
+    for name, cls in (('concat', ConcatStream), ('arena', ArenaStream)):
+        report(name, run(cls, args), args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""
+mock_llm_server.py — Stand-in for Ollama / llama-server when measuring the core.
+
+Speaks enough of both backends' APIs for CoreProcessor to run against it:
+
+    POST /api/chat              Ollama chat — NDJSON stream, or one object with stream=false
+    POST /v1/chat/completions   OpenAI-style chat — SSE stream, or one object (honours id_slot)
+    GET  /slots                 [{id, is_processing}, ...]
+    POST /slots/{id}?action=save|restore   llama-server slot persistence (kept in memory)
+    POST /api/embed             Ollama embeddings
+    POST /v1/embeddings         OpenAI-style embeddings
+    GET  /mock/requests         per-request timings (wall clock, seconds)
+    POST /mock/reset            forget recorded requests
+
+Every request waits ttft_ms ("prompt processing"), then streams a fixed
+reply at tps tokens per second. Like llama-server, it checks for a dropped
+client between tokens and during prompt processing, and frees the slot as
+soon as the client goes away.
+
+Scripted tool calls: if the last message is a user turn containing
+<<call NAME {json args}>>, the reply is those tool calls instead of text.
+Put several directives in one message to get several calls in one round.
+Once the tool results come back (last message is a tool message), the model
+answers in text as usual. --tool-call NAME='{json}' scripts a call for
+every user turn that has no directive of its own, if the request offers
+that tool.
+
+Embeddings are hashed bags of words: stable and instant, and texts that
+share words score as similar. That is enough to exercise the tool router.
+They are not a stand-in for a real model's ranking quality.
+
+Usage:
+    python3 scripts/mock_llm_server.py                              # :8089
+    python3 scripts/mock_llm_server.py --port 8089 --slots 4 --ttft-ms 300 --tps 40
+    python3 scripts/mock_llm_server.py --tool-call check_weather='{"location": "Melbourne"}'
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import re
+import select
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+REPLY = (
+    "Sure. Here is a reasonably long answer so that there is plenty of "
+    "streaming left to interrupt, one short word at a time, the way a "
+    "real model would produce it when asked something open ended."
+)
+
+CALL_DIRECTIVE = re.compile(r'<<call\s+(\w+)\s*(\{.*?\})?\s*>>', re.DOTALL)
+
+EMBED_DIMS = 256
+
+
+class MockState:
+    def __init__(self, slots: int, ttft_ms: float, tps: float, tool_calls: dict = None, reply: str = REPLY):
+        self.ttft_s     = ttft_ms / 1000
+        self.token_s    = 1 / tps if tps > 0 else 0.0
+        self.tool_calls = tool_calls or {}   # name → args, scripted for plain user turns
+        self.reply      = reply
+        self.lock       = threading.Lock()
+        self.busy       = {i: False for i in range(slots)}
+        self.saved:     set  = set()
+        self.requests:  list = []
+
+    def take_slot(self, wanted) -> int | None:
+        with self.lock:
+            if wanted is not None and wanted in self.busy and not self.busy[wanted]:
+                self.busy[wanted] = True
+                return wanted
+            for slot, busy in self.busy.items():
+                if not busy:
+                    self.busy[slot] = True
+                    return slot
+        return None
+
+    def free_slot(self, slot: int) -> None:
+        with self.lock:
+            self.busy[slot] = False
+
+    def scripted_calls(self, body: dict) -> list:
+        """[(name, args), ...] the model should call for this request, or []."""
+        messages = body.get('messages') or []
+        if not messages or messages[-1].get('role') != 'user':
+            return []
+        content = messages[-1].get('content') or ''
+        if isinstance(content, list):   # OpenAI multi-part content
+            content = ' '.join(p.get('text', '') for p in content if isinstance(p, dict))
+
+        calls = [(name, json.loads(args or '{}')) for name, args in CALL_DIRECTIVE.findall(content)]
+        if calls:
+            return calls
+        offered = {
+            (t.get('function') or {}).get('name') for t in body.get('tools') or [] if isinstance(t, dict)
+        }
+        return [(name, args) for name, args in self.tool_calls.items() if name in offered]
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    state: MockState = None
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def handle(self):
+        # A client hanging up mid-response (a barge-in, a timeout) is routine
+        # here — one line, not socketserver's traceback
+        try:
+            super().handle()
+        except (ConnectionResetError, BrokenPipeError) as e:
+            self._client_aborted(e)
+
+    def _client_aborted(self, error: Exception) -> None:
+        print(f"client {self.client_address[0]}:{self.client_address[1]} went away "
+              f"({type(error).__name__}) on {self.command} {self.path}", flush=True)
+
+    # ── Routing ───────────────────────────────────────────────────────────────
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == '/slots':
+            with self.state.lock:
+                body = [{'id': s, 'is_processing': b} for s, b in self.state.busy.items()]
+            return self._json(200, body)
+        if path == '/mock/requests':
+            with self.state.lock:
+                return self._json(200, list(self.state.requests))
+        self._json(404, {'error': 'not found'})
+
+    def do_POST(self):
+        url    = urlparse(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        body   = json.loads(self.rfile.read(length) or b'{}')
+
+        if url.path == '/api/chat':
+            return self._chat(body, slot_hint=None, dialect='ollama')
+        if url.path == '/v1/chat/completions':
+            return self._chat(body, slot_hint=body.get('id_slot'), dialect='openai')
+        if url.path.startswith('/slots/'):
+            return self._slot_action(int(url.path.rsplit('/', 1)[1]),
+                                     parse_qs(url.query).get('action', [''])[0], body)
+        if url.path == '/api/embed':
+            return self._json(200, {'model': body.get('model', 'mock'),
+                                    'embeddings': [embed(t) for t in _inputs(body)]})
+        if url.path == '/v1/embeddings':
+            return self._json(200, {'object': 'list', 'model': body.get('model', 'mock'),
+                                    'data': [{'object': 'embedding', 'index': i, 'embedding': embed(t)}
+                                             for i, t in enumerate(_inputs(body))]})
+        if url.path == '/mock/reset':
+            with self.state.lock:
+                self.state.requests.clear()
+            return self._json(200, {'ok': True})
+        self._json(404, {'error': 'not found'})
+
+    # ── Slots ─────────────────────────────────────────────────────────────────
+
+    def _slot_action(self, slot: int, action: str, body: dict):
+        filename = body.get('filename', '')
+        if action == 'save':
+            with self.state.lock:
+                self.state.saved.add(filename)
+            return self._json(200, {'id_slot': slot, 'filename': filename, 'n_saved': 1024,
+                                    'timings': {'save_ms': 5.0}})
+        if action == 'restore':
+            with self.state.lock:
+                known = filename in self.state.saved
+            if not known:
+                return self._json(400, {'error': {'message': 'failed to restore slot'}})
+            return self._json(200, {'id_slot': slot, 'filename': filename, 'n_restored': 1024,
+                                    'timings': {'restore_ms': 5.0}})
+        self._json(400, {'error': {'message': f'unknown action {action!r}'}})
+
+    # ── Chat ──────────────────────────────────────────────────────────────────
+
+    def _chat(self, body: dict, slot_hint, dialect: str):
+        slot = self.state.take_slot(slot_hint)
+        if slot is None:
+            return self._json(503, {'error': 'no free slot'})
+
+        calls  = self.state.scripted_calls(body)
+        words  = [] if calls else self.state.reply.split(' ')
+        limit  = body.get('max_tokens') or (body.get('options') or {}).get('num_predict')
+        if limit and limit > 0:
+            words = words[:limit]
+        stream = body.get('stream', dialect == 'ollama')   # Ollama streams unless told not to
+
+        record = {'id': uuid.uuid4().hex[:8], 'api': dialect, 'slot': slot, 'stream': bool(stream),
+                  'started': time.time(), 'first_token': None, 'freed': None,
+                  'reason': None, 'tokens': 0, 'tool_calls': len(calls)}
+        with self.state.lock:
+            self.state.requests.append(record)
+
+        emit = OllamaEmitter(self, body) if dialect == 'ollama' else OpenAIEmitter(self, body)
+        try:
+            if stream:
+                emit.start()
+            if not self._wait(self.state.ttft_s):
+                record['reason'] = 'disconnected'
+                return
+
+            for word in words:
+                if stream and self._client_gone():
+                    record['reason'] = 'disconnected'
+                    return
+                if stream:
+                    emit.token(word + ' ')
+                record['first_token'] = record['first_token'] or time.time()
+                record['tokens'] += 1
+                if self.state.token_s:
+                    time.sleep(self.state.token_s)
+
+            if stream:
+                emit.tool_calls(calls)
+                emit.finish(calls, record['tokens'])
+            else:
+                emit.whole(' '.join(words), calls, record['tokens'])
+            record['reason'] = 'done'
+        except (ConnectionResetError, BrokenPipeError) as e:
+            record['reason'] = 'disconnected'
+            self._client_aborted(e)
+        finally:
+            record['freed'] = time.time()
+            self.state.free_slot(slot)
+            if record['reason'] != 'done':
+                self.close_connection = True
+
+    def _wait(self, seconds: float) -> bool:
+        """Prompt processing. False if the client went away meanwhile."""
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            if self._client_gone():
+                return False
+            time.sleep(0.002)
+        return True
+
+    def _client_gone(self) -> bool:
+        """True once the client has closed or shut down its end."""
+        try:
+            readable, _, _ = select.select([self.connection], [], [], 0)
+            if not readable:
+                return False
+            return self.connection.recv(1, socket.MSG_PEEK) == b''
+        except OSError:
+            return True
+
+    # ── Output ────────────────────────────────────────────────────────────────
+
+    def start_chunked(self, content_type: str) -> None:
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        self.wfile.flush()
+
+    def write_chunk(self, data: bytes) -> None:
+        """One HTTP/1.1 chunk (b'' ends the body)."""
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _json(self, status: int, payload) -> None:
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+# ── Embeddings ────────────────────────────────────────────────────────────────
+
+def _inputs(body: dict) -> list:
+    texts = body.get('input', [])
+    return [texts] if isinstance(texts, str) else list(texts)
+
+
+def embed(text: str) -> list:
+    """Unit-length hashed bag of words, crudely singularised."""
+    vec = [0.0] * EMBED_DIMS
+    for word in re.findall(r'[a-z]{3,}', text.lower()):
+        word = word[:-1] if word.endswith('s') and len(word) > 3 else word
+        vec[int.from_bytes(hashlib.md5(word.encode()).digest()[:4], 'little') % EMBED_DIMS] += 1.0
+    norm = math.sqrt(sum(x * x for x in vec)) or 1.0
+    return [x / norm for x in vec]
+
+
+# ── Wire formats ──────────────────────────────────────────────────────────────
+
+class OllamaEmitter:
+    """Ollama /api/chat — one JSON object per line, tool calls whole."""
+
+    def __init__(self, handler: Handler, body: dict):
+        self.h     = handler
+        self.model = body.get('model', 'mock')
+
+    def _line(self, message: dict, done: bool, **extra) -> bytes:
+        obj = {'model': self.model, 'created_at': datetime.now(timezone.utc).isoformat(),
+               'message': message, 'done': done, **extra}
+        return (json.dumps(obj) + '\n').encode()
+
+    def start(self):
+        self.h.start_chunked('application/x-ndjson')
+
+    def token(self, text: str):
+        self.h.write_chunk(self._line({'role': 'assistant', 'content': text}, False))
+
+    def tool_calls(self, calls: list):
+        if calls:
+            self.h.write_chunk(self._line({'role': 'assistant', 'content': '', 'tool_calls': [
+                {'function': {'name': name, 'arguments': args}} for name, args in calls
+            ]}, False))
+
+    def finish(self, calls: list, tokens: int):
+        self.h.write_chunk(self._line({'role': 'assistant', 'content': ''}, True,
+                                      done_reason='stop', eval_count=tokens))
+        self.h.write_chunk(b'')
+
+    def whole(self, text: str, calls: list, tokens: int):
+        message = {'role': 'assistant', 'content': text}
+        if calls:
+            message['tool_calls'] = [{'function': {'name': n, 'arguments': a}} for n, a in calls]
+        self.h._json(200, json.loads(self._line(message, True, done_reason='stop', eval_count=tokens)))
+
+
+class OpenAIEmitter:
+    """OpenAI /v1/chat/completions — SSE chunks, tool-call arguments in fragments."""
+
+    def __init__(self, handler: Handler, body: dict):
+        self.h     = handler
+        self.model = body.get('model', 'mock')
+        self.id    = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+
+    def _event(self, delta: dict, finish_reason: str = None) -> bytes:
+        obj = {'id': self.id, 'object': 'chat.completion.chunk', 'created': int(time.time()),
+               'model': self.model,
+               'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}]}
+        return f"data: {json.dumps(obj)}\n\n".encode()
+
+    def start(self):
+        self.h.start_chunked('text/event-stream')
+
+    def token(self, text: str):
+        self.h.write_chunk(self._event({'content': text}))
+
+    def tool_calls(self, calls: list):
+        for index, (name, args) in enumerate(calls):
+            self.h.write_chunk(self._event({'tool_calls': [{
+                'index': index, 'id': f"call_{uuid.uuid4().hex[:8]}", 'type': 'function',
+                'function': {'name': name, 'arguments': ''},
+            }]}))
+            raw = json.dumps(args)
+            for i in range(0, len(raw), 8):
+                self.h.write_chunk(self._event({'tool_calls': [{
+                    'index': index, 'function': {'arguments': raw[i:i + 8]},
+                }]}))
+
+    def finish(self, calls: list, tokens: int):
+        self.h.write_chunk(self._event({}, 'tool_calls' if calls else 'stop'))
+        self.h.write_chunk(b'data: [DONE]\n\n')
+        self.h.write_chunk(b'')
+
+    def whole(self, text: str, calls: list, tokens: int):
+        message = {'role': 'assistant', 'content': text}
+        if calls:
+            message['tool_calls'] = [
+                {'id': f"call_{uuid.uuid4().hex[:8]}", 'type': 'function',
+                 'function': {'name': n, 'arguments': json.dumps(a)}} for n, a in calls
+            ]
+        self.h._json(200, {
+            'id': self.id, 'object': 'chat.completion', 'created': int(time.time()), 'model': self.model,
+            'choices': [{'index': 0, 'message': message,
+                         'finish_reason': 'tool_calls' if calls else 'stop'}],
+            'usage': {'prompt_tokens': 0, 'completion_tokens': tokens, 'total_tokens': tokens},
+        })
+
+
+# ── Entry points ──────────────────────────────────────────────────────────────
+
+def serve(port: int = 8089, slots: int = 2, ttft_ms: float = 300, tps: float = 40,
+          tool_calls: dict = None) -> ThreadingHTTPServer:
+    """Start the mock in a background thread and return the server."""
+    Handler.state = MockState(slots, ttft_ms, tps, tool_calls)
+    server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True, name='mock-llm').start()
+    return server
+
+
+def _parse_tool_call(spec: str) -> tuple[str, dict]:
+    name, _, args = spec.partition('=')
+    return name.strip(), json.loads(args) if args else {}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port',      type=int,   default=8089)
+    parser.add_argument('--slots',     type=int,   default=2)
+    parser.add_argument('--ttft-ms',   type=float, default=300, help="prompt processing time before the first token")
+    parser.add_argument('--tps',       type=float, default=40,  help="tokens per second after the first (0 = no delay)")
+    parser.add_argument('--tool-call', action='append', default=[], metavar="NAME='{json}'",
+                        help="tool call to script for plain user turns (repeatable)")
+    args = parser.parse_args()
+
+    serve(args.port, args.slots, args.ttft_ms, args.tps, dict(_parse_tool_call(s) for s in args.tool_call))
+    print(f"Mock LLM server on http://127.0.0.1:{args.port} — Ctrl-C to stop", flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+trace_summary.py — Per-stage latency percentiles from data/traces/traces.jsonl.
+
+Reads the turn traces written by core/tracing.py, including rotated files
+(traces.jsonl.1, .2, ...). For each span name it prints how many turns had
+it, where in the turn it usually starts (median offset from the start of
+the turn), and p50/p90/p99 of its duration. Spans that occur more than once
+in a turn (llm_ttft per round, tts per sentence, tool:*) are counted per
+occurrence. The first llm_ttft in a turn is also reported on its own as
+llm_ttft#1.
+
+Voice traces start at end of speech, so the first_audio row's offset is
+the end-of-speech to first-audio latency the user actually hears. It is
+broken out in the headline.
+
+Usage:
+    python3 scripts/trace_summary.py
+    python3 scripts/trace_summary.py --interface speaker --last 200
+    python3 scripts/trace_summary.py --since 2026-10-01T00:00 --json
+    python3 scripts/trace_summary.py --path /tmp/traces.jsonl
+"""
+
+import argparse
+import glob
+import json
+import math
+import os
+import statistics
+import sys
+from collections import defaultdict
+
+PROJECT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+def percentile(values: list, p: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank    = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def load_traces(path: str) -> list:
+    """All traces from path and its rotated backups, oldest first."""
+    backups = [f for f in glob.glob(path + '.*') if f.rsplit('.', 1)[1].isdigit()]
+    files   = sorted(backups, key=lambda f: int(f.rsplit('.', 1)[1]), reverse=True)
+    if os.path.exists(path):
+        files.append(path)
+
+    traces = []
+    for name in files:
+        with open(name, encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    traces.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue   # torn line from a crash mid-write
+    traces.sort(key=lambda t: t.get('ts', ''))
+    return traces
+
+
+def summarise(traces: list) -> dict:
+    """Per span name: count, median start offset, duration percentiles (ms)."""
+    durations = defaultdict(list)
+    offsets   = defaultdict(list)
+    turns     = defaultdict(int)
+
+    for trace in traces:
+        seen = set()
+        for s in trace.get('spans', []):
+            name = s['name']
+            durations[name].append(s['dur_ms'])
+            offsets[name].append(s['at_ms'])
+            if name not in seen:
+                seen.add(name)
+                turns[name] += 1
+                if name == 'llm_ttft':
+                    durations['llm_ttft#1'].append(s['dur_ms'])
+                    offsets['llm_ttft#1'].append(s['at_ms'])
+                    turns['llm_ttft#1'] += 1
+        durations['total'].append(trace.get('total_ms', 0.0))
+        offsets['total'].append(0.0)
+        turns['total'] += 1
+
+    rows = {}
+    for name, values in durations.items():
+        rows[name] = {
+            'turns': turns[name],
+            'count': len(values),
+            'at_ms': statistics.median(offsets[name]),
+            'p50':   percentile(values, 50),
+            'p90':   percentile(values, 90),
+            'p99':   percentile(values, 99),
+        }
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--path',      default=os.path.join(PROJECT_ROOT, 'data', 'traces', 'traces.jsonl'))
+    parser.add_argument('--interface', help="only traces from this interface (speaker, phone, general)")
+    parser.add_argument('--endpoint',  help="only traces from this endpoint")
+    parser.add_argument('--since',     help="only traces at or after this ISO timestamp (UTC)")
+    parser.add_argument('--last',      type=int, help="only the newest N traces (after other filters)")
+    parser.add_argument('--headless',  action='store_true', help="include headless runs")
+    parser.add_argument('--json',      action='store_true', help="print the summary as JSON")
+    args = parser.parse_args()
+
+    traces = load_traces(args.path)
+    if not args.headless:
+        traces = [t for t in traces if not t.get('headless')]
+    if args.interface:
+        traces = [t for t in traces if t.get('interface') == args.interface]
+    if args.endpoint:
+        traces = [t for t in traces if t.get('endpoint') == args.endpoint]
+    if args.since:
+        traces = [t for t in traces if t.get('ts', '') >= args.since]
+    if args.last:
+        traces = traces[-args.last:]
+
+    if not traces:
+        print(f"No traces in {args.path}", file=sys.stderr)
+        sys.exit(1)
+
+    rows = summarise(traces)
+
+    if args.json:
+        print(json.dumps({'traces': len(traces), 'spans': rows}, indent=2))
+        return
+
+    print(f"{len(traces)} turns  {traces[0].get('ts', '?')} → {traces[-1].get('ts', '?')}\n")
+    if 'first_audio' in rows:
+        r = rows['first_audio']
+        offsets = [s['at_ms'] for t in traces for s in t.get('spans', []) if s['name'] == 'first_audio']
+        print(f"end of speech → first audio: p50 {percentile(offsets, 50):.0f} ms   "
+              f"p90 {percentile(offsets, 90):.0f} ms   p99 {percentile(offsets, 99):.0f} ms   "
+              f"({r['turns']} turns)\n")
+
+    print(f"{'span':<24} {'turns':>6} {'count':>6} {'at p50':>9} {'dur p50':>9} {'p90':>9} {'p99':>9}")
+    for name, r in sorted(rows.items(), key=lambda kv: (kv[0] == 'total', kv[1]['at_ms'])):
+        print(f"{name:<24} {r['turns']:>6} {r['count']:>6} {r['at_ms']:>9.1f} "
+              f"{r['p50']:>9.1f} {r['p90']:>9.1f} {r['p99']:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -35,6 +35,9 @@ hook functions by the tool loader. All fields are optional.
     requires_config:       ""     # skip if AppConfig doesn't have this attribute
     context_priority:      50     # position in system prompt — lower = earlier
     turn_context_priority: 50     # position in per-turn injection order — lower = earlier
+    defer_session_end:     false  # queue session-end work until the system is idle
+    router_pinned:         false  # always offered when the tool router (tool_router:) is on
+    digest_max_chars:      1500   # answered results over this size shrink to a digest (0 = never)
 
     # Any extra fields are yours — passed to execute() and all hook functions
     my_setting: "some value"
@@ -70,6 +73,12 @@ PLUGIN HOOKS (all optional — delete any you don't need):
         Use for: capability descriptions, persistent rules, known entities.
         Controlled by context_priority in yaml.
 
+    context_version(core, tool_config, session) -> hashable | None
+        Cheap token that changes whenever provide_context's output would
+        (file mtime, interface mode, ...). While it's unchanged the loader
+        reuses the last text instead of calling provide_context. Return
+        None to have provide_context called as normal.
+
     provide_turn_context(core, tool_config, session, user_input) -> str | None
         Injects dynamic text as a system message just before the user message.
         Fires every turn. Return None to inject nothing.
@@ -80,6 +89,20 @@ PLUGIN HOOKS (all optional — delete any you don't need):
         Fires when a session closes cleanly (hangup, timeout, reset).
         Runs in a daemon thread — never blocks the interface.
         Use for: summaries, flushing logs, persisting session state.
+
+    on_session_end_batch(core, tool_config, sessions) -> None
+        Deferred form of on_session_end. With defer_session_end: true the
+        job queue calls it once the system is idle, with several closed
+        sessions at a time (JSON snapshots: ids, identity, history text).
+        Raise to have the batch retried later.
+
+    digest_result(core, tool_config, result) -> dict | str | None
+        Shrinks one of this tool's results once the model has answered from
+        it (end of turn, results over digest_max_chars / tool_results.max_chars).
+        Gets the parsed result payload; return the part worth keeping in
+        history. The original stays retrievable via get_tool_result.
+        Return None for the default digest (long fields cut, lists counted).
+        Multi-tool files can set 'digest' per TOOLS entry instead.
 ─────────────────────────────────────────────────────────────────────────────
 """
 
@@ -143,6 +166,15 @@ def provide_context(core, tool_config: dict, session: dict) -> str:
     return f"[MY TOOL]\nSome context the LLM should always know: {some_setting}"
 
 
+# Optional companion to provide_context. The text above only depends on
+# tool_config, and a config edit reloads the tool (clearing the memo), so a
+# constant token is enough. Key on file mtimes / session fields if yours reads them.
+
+def context_version(core, tool_config: dict, session: dict):
+    """Return a token that changes whenever provide_context's output would."""
+    return 'static'
+
+
 # ── Per-turn injection (optional) ─────────────────────────────────────────────
 # Called every turn, injected as a system message just before the user message.
 # Unlike provide_context, this can vary based on user_input.
@@ -172,6 +204,20 @@ def on_session_end(core, tool_config: dict, session: dict):
     pass
 
 
+# ── History digest (optional) ─────────────────────────────────────────────────
+# Called at the end of a turn for each of this tool's results that is over
+# digest_max_chars and that the model has already answered from. Whatever
+# you return replaces the full result in history (the original can still be
+# fetched with get_tool_result). Return None for the default digest.
+# Remove this function if not needed.
+
+def digest_result(core, tool_config: dict, result) -> dict | None:
+    """Keep just enough of an answered result for later turns."""
+    if not isinstance(result, dict):
+        return None
+    return {"status": result.get("status"), "result": str(result.get("result", ""))[:200]}
+
+
 # ── Executor ──────────────────────────────────────────────────────────────────
 # Called when the LLM invokes this tool. Receives:
 #   tool_args   — {'name': 'my_tool', 'parameters': {'required_param': '...', ...}}
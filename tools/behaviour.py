@@ -15,6 +15,10 @@ Context provider:
     Filters rules by current interface_mode so voice-only rules don't appear in
     text sessions and vice versa.
 
+    context_version(core, tool_config, session) -> tuple
+    Rules file mtime + interface_mode — the loader reuses the last text until
+    either changes.
+
 Storage:
     data/behaviour/behaviours.json       — live editable rules list
     personality/default_behaviours.json  — factory defaults, seeded on first run
@@ -180,6 +184,13 @@ def _save():
 
 # ── Context provider ──────────────────────────────────────────────────────────
 
+def context_version(core, tool_config: dict, session: dict) -> tuple:
+    """Changes whenever provide_context's output would — rules reloaded or different interface."""
+    with _state.lock:
+        _ensure_loaded()
+        return (_state.mtime, get_interface_mode(session).value)
+
+
 def provide_context(core, tool_config: dict, session: dict) -> str:
     """
     Called by the tool loader on every request to inject active behaviour
@@ -0,0 +1,60 @@
+"""
+get_tool_result tool — fetches back the full text of a digested tool result.
+
+Once the model has answered from a big tool result, core/result_digest.py
+replaces it in history with a short digest carrying a result_id. This tool
+returns the stored original for that id, so nothing is lost by digesting.
+The returned payload is itself digested again (under the same id) at the
+end of the turn.
+
+Config (config/get_tool_result.yaml):
+    enabled: true
+"""
+
+import json
+from typing import Annotated
+from pydantic import Field
+from core.tool_base import ToolBase
+
+log = ToolBase.logger('get_tool_result')
+
+TOOL_NAME = 'get_tool_result'
+
+
+# ── Schema function ───────────────────────────────────────────────────────────
+
+def get_tool_result(
+    result_id: Annotated[str, Field(
+        description="The result_id from a shortened tool result, e.g. 'r3'.",
+    )],
+) -> str:
+    """
+    Get the full content of an earlier tool result that was shortened to a
+    digest. Use only when the digest doesn't have the detail you need — it's
+    cheaper than calling the original tool again.
+    """
+    ...
+
+
+# ── Executor ──────────────────────────────────────────────────────────────────
+
+def execute(tool_args: dict, session, core, tool_config: dict) -> str:
+    result_id = (ToolBase.params(tool_args).get('result_id') or '').strip()
+    entry     = core.result_digester.lookup(session, result_id)
+    log.info("Fetching stored tool result", extra={'data': f"id={result_id!r} found={entry is not None}"})
+
+    if entry is None:
+        return ToolBase.error(core, TOOL_NAME, (
+            f"No stored result {result_id!r} — it may have expired. "
+            "Call the original tool again instead."
+        ))
+
+    try:
+        content = json.loads(entry['content'])
+    except ValueError:
+        content = entry['content']
+    return ToolBase.result(core, TOOL_NAME, {
+        "result_id": result_id,
+        "tool":      entry['tool'],
+        "content":   content,
+    })
@@ -404,6 +404,11 @@ def _make_executor(ha_tool_name: str, allowed_params: set,
 
 # ── Context provider ──────────────────────────────────────────────────────────
 
+def context_version(core, tool_config: dict, session: dict) -> tuple:
+    """The text only depends on the discovered tool names."""
+    return tuple(t.name for t in _ha_tools)
+
+
 def provide_context(core, tool_config: dict, session: dict) -> str:
     """Inject available HA tool names and usage rules into the system prompt."""
     if not _ha_tools:
@@ -16,6 +16,11 @@ Combines two concerns that belong together:
    result feedback rather than relying on the live LLM to call store_memory.
    Tools: store_memory, search_memory, delete_memory
 
+Both session-end passes are deferred by default (defer_session_end in
+memory.yaml): closed sessions queue up in core.job_queue and are processed
+a few at a time once nobody has spoken to the assistant for a while, so the
+headless passes never evict a live conversation's KV cache.
+
 The live LLM can still call store_memory directly if the user explicitly
 asks it to remember something. The session-end extractor is the primary
 accumulation path.
@@ -177,6 +182,11 @@ def _debug_collection(collection: chromadb.Collection):
 # SECTION 1 — SYSTEM PROMPT & TURN CONTEXT INJECTION
 # ══════════════════════════════════════════════════════════════════════════════
 
+def context_version(core, tool_config: dict, session: dict) -> str:
+    """Static text — only a config reload changes it, and that clears the loader's memo."""
+    return 'static'
+
+
 def provide_context(core, tool_config: dict, session: dict) -> str:
     """
     Injects a static description of the memory system into the system prompt.
@@ -475,6 +485,20 @@ def _store_session_summary(session_id: str, session: dict, summary: str, core=No
         log.error("Failed to store summary", extra={'data': str(e)})
 
 
+def _has_session_summary(session_id: str) -> bool:
+    """True if a summary is already stored — a retried batch skips phase 1 for it."""
+    try:
+        conn = _get_db()
+        row  = conn.execute(
+            "SELECT 1 FROM turns WHERE session_id = ? AND role = 'summary' LIMIT 1", (session_id,)
+        ).fetchone()
+        conn.close()
+        return row is not None
+    except Exception as e:
+        log.error("Failed to check for summary", extra={'data': str(e)})
+        return False
+
+
 # ── Time parser (for recall tool) ─────────────────────────────────────────────
 
 def _parse_since(since: str) -> str:
@@ -519,86 +543,173 @@ def _parse_since(since: str) -> str:
 def on_session_end(core, tool_config: dict, session: dict):
     """
     Fires when a session closes cleanly via CoreProcessor.close_session().
+    With defer_session_end set in memory.yaml the job queue calls
+    on_session_end_batch() later instead — this is the same work for one session.
+    """
+    on_session_end_batch(core, tool_config, [session])
+
+
+def on_session_end_batch(core, tool_config: dict, sessions: list[dict]):
+    """
+    Session-end processing for one or more closed sessions.
 
     Phase 1 — Summary:
-        A headless LLM pass generates a 2-4 sentence summary of the session
-        and stores it in SQLite alongside the transcript.
+        A headless LLM pass generates a 2-4 sentence summary of each session
+        and stores it in SQLite alongside the transcript. Several sessions
+        share one pass, up to batch_max_chars of transcript.
 
     Phase 2 — Fact extraction:
-        A second focused headless pass reads the transcript and is offered
-        only the store_memory tool. It extracts memorable facts and stores
-        them into ChromaDB. Conflict resolution happens via tool result
-        feedback — if a similar fact already exists, the executor returns
-        a conflict notice and the LLM decides whether to overwrite or skip.
+        A second focused headless pass per user reads that user's
+        transcripts and is offered only the store_memory tool. It extracts
+        memorable facts and stores them into ChromaDB. Conflict resolution
+        happens via tool result feedback — if a similar fact already exists,
+        the executor returns a conflict notice and the LLM decides whether
+        to overwrite or skip.
+
+    A headless pass the backend failed raises, so the deferred job
+    queue retries the batch. Sessions whose summary was already stored are
+    not summarised again.
     """
     if not tool_config.get('enabled', True):
         return
-    
-    # Relay sessions are short-lived intermediary conversations — they contain
-    # system framing, relay instructions, and another user's words rather than
-    # a real conversation with the session owner. Skip both phases entirely.
-    if session.get('relay_caller_session_id'):
-        log.debug("on_session_end — skipping relay session",
-                extra={'data': f"session={get_session_id(session)[:8]}"})
-        return
-    
+
     # ability to disable post session processing if desired (limited memory on device etc ruining KV cache for main conversations)
     if tool_config.get('disable_session_processing', False):
         log.debug("on_session_end — session processing disabled",
-                  extra={'data': f"session={get_session_id(session)[:8]}"})
+                  extra={'data': f"sessions={len(sessions)}"})
         return
 
-    session_id = get_session_id(session)
-    history    = get_history(session)
-    user_id    = _get_user_id(session, core)
+    pending = []   # (session, transcript)
+    for session in sessions:
+        # Relay sessions are short-lived intermediary conversations — they contain
+        # system framing, relay instructions, and another user's words rather than
+        # a real conversation with the session owner. Skip both phases entirely.
+        if session.get('relay_caller_session_id'):
+            log.debug("on_session_end — skipping relay session",
+                      extra={'data': f"session={get_session_id(session)[:8]}"})
+            continue
+
+        transcript = _session_transcript(session)
+        if not transcript:
+            log.debug("on_session_end — no turns to process",
+                      extra={'data': f"session={get_session_id(session)[:8]}"})
+            continue
+        pending.append((session, transcript))
+
+    if not pending:
+        return
+
+    # ── Phase 1: Summary ──────────────────────────────────────────────────────
+    unsummarised = [p for p in pending if not _has_session_summary(get_session_id(p[0]))]
+    for chunk in _chunk_by_chars(unsummarised, tool_config.get('batch_max_chars', 16000)):
+        _summarise_sessions(core, tool_config, chunk)
+
+    # ── Phase 2: Fact extraction ──────────────────────────────────────────────
+    # Only run for sessions with a known user (no point storing facts for
+    # 'unknown' — they'd never be retrievable in a useful way).
+    known = set(core.presence_registry.all_users()) \
+        if hasattr(core, 'presence_registry') else set()
+
+    by_user: dict[str, list] = {}
+    for session, transcript in pending:
+        user_id = _get_user_id(session, core)
+        if user_id not in known:
+            log.info("Phase 2: skipping fact extraction — not a canonical user",
+                     extra={'data': f"session={get_session_id(session)[:8]} user_id={user_id!r}"})
+            continue
+        by_user.setdefault(user_id, []).append((session, transcript))
+
+    for user_id, user_sessions in by_user.items():
+        for chunk in _chunk_by_chars(user_sessions, tool_config.get('batch_max_chars', 16000)):
+            _extract_facts(core, tool_config, user_id, chunk)
+
 
-    # Build plain-text transcript from user/assistant turns only
+def _session_transcript(session: dict) -> str:
+    """Plain-text transcript from user/assistant turns only."""
     lines = []
-    for msg in history:
+    for msg in get_history(session):
         role    = msg.get('role', '')
         content = msg.get('content', '')
         if role in ('user', 'assistant') and content:
             lines.append(f"{role.capitalize()}: {content}")
-
-    if not lines:
-        log.debug("on_session_end — no turns to process",
-                  extra={'data': f"session={session_id[:8]}"})
-        return
-
-    transcript = "\n".join(lines)
-
-    # ── Phase 1: Summary ──────────────────────────────────────────────────────
-    summary_prompt = (
-        "Summarise the following conversation in ideally 2 sentences, 4 maximum. "
+    return "\n".join(lines)
+
+
+def _chunk_by_chars(items: list, max_chars: int) -> list[list]:
+    """Split (session, transcript) pairs into runs of at most max_chars of transcript."""
+    chunks, current, size = [], [], 0
+    for item in items:
+        if current and size + len(item[1]) > max_chars:
+            chunks.append(current)
+            current, size = [], 0
+        current.append(item)
+        size += len(item[1])
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _summarise_sessions(core, tool_config: dict, chunk: list):
+    """Phase 1 for a run of sessions — one headless pass, per-session fallback."""
+    instructions = (
         "Focus on what was discussed, any decisions made, and any important "
         "facts mentioned. Be concise and factual. Speak in the third person. "
         "If nothing more than testing or simple time checks happen, summarise "
-        "very simply as routine detail.\n\n"
-        f"Transcript:\n{transcript}"
+        "very simply as routine detail."
     )
 
-    try:
-        log.info("Phase 1: generating session summary",
-                 extra={'data': f"session={session_id[:8]} turns={len(lines)}"})
-        summary = core.run_headless(
-            summary_prompt,
+    summaries: dict[int, str] = {}
+    if len(chunk) > 1:
+        numbered = "\n\n".join(
+            f"Conversation {i}:\n{transcript}" for i, (_, transcript) in enumerate(chunk, 1)
+        )
+        batch_prompt = (
+            f"Summarise each of the following {len(chunk)} conversations separately, "
+            f"in ideally 2 sentences, 4 maximum, each. {instructions}\n\n"
+            "Reply with only a JSON object mapping each conversation number to "
+            'its summary, e.g. {"1": "...", "2": "..."}.\n\n'
+            f"{numbered}"
+        )
+        log.info("Phase 1: generating batched session summaries",
+                 extra={'data': f"sessions={len(chunk)}"})
+        # A backend failure raises out of here — only a bad reply falls back
+        reply = core.run_headless(
+            batch_prompt,
             model=tool_config.get('summary_model'),
             num_ctx=tool_config.get('summary_num_ctx'),
+            raise_on_error=True,
+        )
+        try:
+            parsed = json.loads(reply[reply.index('{'):reply.rindex('}') + 1])
+            summaries = {int(k): str(v).strip() for k, v in parsed.items() if str(v).strip()}
+        except Exception as e:
+            log.warning("Batched summary unusable — summarising one by one",
+                        extra={'data': str(e)})
+
+    for i, (session, transcript) in enumerate(chunk, 1):
+        session_id = get_session_id(session)
+        summary    = summaries.get(i)
+        if not summary:
+            summary_prompt = (
+                "Summarise the following conversation in ideally 2 sentences, 4 maximum. "
+                f"{instructions}\n\n"
+                f"Transcript:\n{transcript}"
             )
+            log.info("Phase 1: generating session summary",
+                     extra={'data': f"session={session_id[:8]} chars={len(transcript)}"})
+            summary = core.run_headless(
+                summary_prompt,
+                model=tool_config.get('summary_model'),
+                num_ctx=tool_config.get('summary_num_ctx'),
+                raise_on_error=True,
+            ).strip()
         if summary:
             _store_session_summary(session_id, session, summary, core)
-    except Exception as e:
-        log.error("Session summary failed", extra={'data': str(e)})
 
-    # ── Phase 2: Fact extraction ──────────────────────────────────────────────
-    # Only run if this session had a known user (no point storing facts for
-    # 'unknown' — they'd never be retrievable in a useful way).
-    known = set(core.presence_registry.all_users()) \
-        if hasattr(core, 'presence_registry') else set()
-    if user_id not in known:
-        log.info("Phase 2: skipping fact extraction — not a canonical user",
-                 extra={'data': f"session={session_id[:8]} user_id={user_id!r}"})
-        return
+
+def _extract_facts(core, tool_config: dict, user_id: str, chunk: list):
+    """Phase 2 for one user's run of sessions — a single headless pass."""
+    session = chunk[-1][0]
 
     # Pass identity into the headless session so _get_user_id resolves correctly
     speaker    = get_speaker(session)
@@ -612,6 +723,13 @@ def on_session_end(core, tool_config: dict, session: dict):
     friendly = core.presence_registry.get_friendly_name(user_id) \
         if hasattr(core, 'presence_registry') else user_id
 
+    if len(chunk) == 1:
+        transcripts = f"Transcript:\n{chunk[0][1]}\n"
+    else:
+        transcripts = "".join(
+            f"Transcript {i}:\n{transcript}\n\n" for i, (_, transcript) in enumerate(chunk, 1)
+        )
+
     extraction_prompt = (
         "You are a memory extraction assistant. Read the transcript and store "
         "durable facts about the user with the store_memory tool. Most "
@@ -639,23 +757,28 @@ def on_session_end(core, tool_config: dict, session: dict):
         "A good fact will still be true and useful in six months. If unsure, "
         "do not store it. Store at most 3 facts per conversation.\n\n"
         "Do not explain yourself — this is a headless session; only act via tools.\n\n"
-        f"Transcript:\n{transcript}\n"
+        f"{transcripts}"
     )
 
+    sessions_label = ",".join(get_session_id(s)[:8] for s, _ in chunk)
+    log.info("Phase 2: extracting facts from session",
+             extra={'data': f"sessions={sessions_label} user={user_id}"})
     try:
-        log.info("Phase 2: extracting facts from session",
-                 extra={'data': f"session={session_id[:8]} user={user_id}"})
         core.run_headless(
             prompt            = extraction_prompt,
             tools             = [store_memory],      # schema function only — scoped tool set
             session_overrides = overrides,
             model=tool_config.get('summary_model'),
             num_ctx=tool_config.get('summary_num_ctx'),
+            raise_on_error=True,
         )
-        log.info("Phase 2: fact extraction complete",
-                 extra={'data': f"session={session_id[:8]} user={user_id}"})
     except Exception as e:
-        log.error("Fact extraction failed", extra={'data': str(e)})
+        # Raise so the job queue retries — store_memory's conflict check
+        # keeps facts from the first attempt from being stored twice
+        log.error("Fact extraction failed", extra={'data': f"sessions={sessions_label} error={e}"})
+        raise
+    log.info("Phase 2: fact extraction complete",
+             extra={'data': f"sessions={sessions_label} user={user_id}"})
 
 
 # ══════════════════════════════════════════════════════════════════════════════
@@ -324,6 +324,26 @@ def execute(tool_args, session, core, tool_config):
     return ToolBase.result(core, TOOL_NAME, result)
 
 
+# ── History digest ────────────────────────────────────────────────────────────
+
+def digest_result(core, tool_config: dict, result) -> dict | None:
+    """
+    What stays in history once the page has been answered from: which page
+    and chunk it was, and its summary. The page text, links and forms are
+    dropped; the page itself is still in the cache if it's needed again.
+    """
+    if not isinstance(result, dict) or 'url' not in result:
+        return None   # an error payload — the default digest is fine
+    return {
+        "url":          result.get('url', ''),
+        "title":        result.get('title', ''),
+        "page_type":    result.get('page_type', ''),
+        "summary":      (result.get('summary') or '')[:300],
+        "chunk":        result.get('chunk'),
+        "total_chunks": result.get('total_chunks'),
+    }
+
+
 # ── httpx fetch ───────────────────────────────────────────────────────────────
 
 def _fetch_httpx(url: str, timeout: int,
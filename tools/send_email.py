@@ -43,6 +43,11 @@ def send_email(
 
 # ── Context provider ──────────────────────────────────────────────────────────
 
+def context_version(core, tool_config: dict, session: dict) -> tuple:
+    """Contact names come from the yaml — memoize until they change."""
+    return tuple(tool_config.get('contacts', {}) or ())
+
+
 def provide_context(core, tool_config: dict, session: dict) -> str:
     """Inject known contact names into the system prompt so the LLM can use them."""
     contacts = tool_config.get('contacts', {})
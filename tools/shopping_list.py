@@ -22,6 +22,7 @@ from typing import Annotated
 from pydantic import Field
 from core.tool_base import ToolBase
 import json
+import os
 
 log       = ToolBase.logger('shopping_list')
 TOOL_NAME = 'shopping_list'
@@ -72,6 +73,14 @@ def _coerce_items(raw) -> list:
 
 # ── Context injection ─────────────────────────────────────────────────────────
 
+def context_version(core, tool_config: dict, session: dict) -> float | None:
+    """List names only change when lists.json is written — key on its mtime."""
+    try:
+        return os.path.getmtime(ToolBase.data_path(TOOL_NAME, FILENAME))
+    except OSError:
+        return None
+
+
 def provide_context(core, tool_config: dict, session: dict) -> str:
     """
     Inject available list names into the system prompt at session start.